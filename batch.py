@@ -0,0 +1,259 @@
+import argparse
+import glob
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from src.pipeline import CalibrationPipeline
+from src.profiling import Profiler
+from src.report_generator import ReportGenerator, FIGURE_MODES
+from src.results_store import ResultsStore
+
+WORKBOOK_PATTERNS = ('*.xlsx', '*.xls')
+
+
+def find_workbooks(source):
+    """
+    Lista los libros de ensayos a procesar.
+
+    Args:
+        source (str): Directorio (se buscan *.xlsx y *.xls) o patrón glob.
+
+    Returns:
+        list: Rutas ordenadas de los libros encontrados.
+    """
+    source_path = Path(source)
+    if source_path.is_dir():
+        files = [p for pattern in WORKBOOK_PATTERNS for p in source_path.glob(pattern)]
+    else:
+        files = [Path(p) for p in glob.glob(source, recursive=True)]
+    # Ignorar archivos temporales de Excel (~$libro.xlsx)
+    return sorted(p for p in files if p.is_file() and not p.name.startswith('~$'))
+
+
+def output_folders(workbooks, output_dir):
+    """Asigna a cada libro una carpeta de salida única dentro de `output_dir`."""
+    folders = {}
+    used = set()
+    for path in workbooks:
+        name = path.stem
+        suffix = 1
+        while name in used:
+            suffix += 1
+            name = f"{path.stem}_{suffix}"
+        used.add(name)
+        folders[path] = Path(output_dir) / name
+    return folders
+
+
+def process_workbook(file_path, output_dir, cache_dir=None, global_fit=False, fast_plots=False,
+                     report_figures='png', profile=False, profile_memory=False, resample_points=None,
+                     keep_tests=False, incremental=False):
+    """
+    Procesa un libro en un proceso de trabajo.
+
+    Returns:
+        dict: Fila del resumen con el estado y los parámetros calibrados. Los errores se
+        registran en la fila en lugar de propagarse, para no detener el lote. Con
+        `profile`, la clave 'profile' contiene el resumen de `Profiler`, y con
+        `keep_tests`, la clave 'tests' contiene los valores por ensayo
+        (`ResultsStore.test_rows`).
+    """
+    row = {'workbook': str(file_path), 'output_dir': str(output_dir), 'status': 'ok', 'error': None}
+    try:
+        tests, parameters = CalibrationPipeline.run(file_path, output_dir, cache_dir=cache_dir,
+                                                     global_fit=global_fit, fast_plots=fast_plots,
+                                                     report_figures=report_figures, profile=profile,
+                                                     profile_memory=profile_memory,
+                                                     resample_points=resample_points, return_tests=True,
+                                                     incremental=incremental)
+        row.update({name: float(value) for name, value in parameters.items()})
+        if keep_tests:
+            row['tests'] = ResultsStore.test_rows(tests)
+    except Exception as e:
+        row['status'] = 'error'
+        row['error'] = f"{type(e).__name__}: {e}"
+    if profile or profile_memory:
+        profile_file = CalibrationPipeline.profile_dir(output_dir) / 'profile.json'
+        if profile_file.exists():
+            row['profile'] = json.loads(profile_file.read_text(encoding='utf-8'))
+    return row
+
+
+def write_batch_profile(rows, output_dir):
+    """
+    Agrega los perfiles de los libros en `output_dir/profile_summary.json` y une sus
+    trazas en `output_dir/trace.json` (un proceso de la traza por libro).
+    """
+    summaries = [row['profile'] for row in rows if row.get('profile')]
+    if not summaries:
+        return None
+    output_dir = Path(output_dir)
+    aggregated = Profiler.aggregate(summaries)
+    aggregated['workbooks'] = {row['workbook']: row['profile'] for row in rows if row.get('profile')}
+    (output_dir / 'profile_summary.json').write_text(
+        json.dumps(aggregated, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    events = []
+    for pid, row in enumerate(rows):
+        trace_file = CalibrationPipeline.profile_dir(row['output_dir']) / 'trace.json'
+        if row.get('profile') and trace_file.exists():
+            for event in json.loads(trace_file.read_text(encoding='utf-8'))['traceEvents']:
+                events.append(dict(event, pid=pid))
+    (output_dir / 'trace.json').write_text(
+        json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'}, ensure_ascii=False), encoding='utf-8')
+    return aggregated
+
+
+def run_batch(source, output_dir, workers=None, cache_dir=None, global_fit=False, fast_plots=False,
+              report_figures='png', combined_report=False, profile=False,
+              profile_memory=False, resample_points=None, store=None, project=None, reuse=False,
+              incremental=False):
+    """
+    Calibra en paralelo todos los libros de `source` y guarda un resumen.
+
+    Args:
+        source (str): Directorio o patrón glob de libros Excel.
+        output_dir (str): Directorio raíz de salida; cada libro usa su propia subcarpeta.
+        workers (int, optional): Número de procesos (default: número de núcleos).
+        cache_dir (str, optional): Caché binaria compartida de `DataLoader`.
+        global_fit (bool): Ajuste conjunto de E50ref, m y Rf por mínimos cuadrados.
+        fast_plots (bool): Figuras en modo rápido (plantilla reutilizada por proceso y
+            curvas reducidas con LTTB).
+        report_figures (str): Figuras de los informes: 'png', 'cached' o 'vector'.
+        combined_report (bool): Genera además `output_dir/combined_report.pdf` con una
+            tabla resumen y una sección por libro calibrado.
+        profile (bool): Perfil por etapa de cada libro y resumen agregado en
+            `output_dir/profile_summary.json` y `output_dir/trace.json`.
+        profile_memory (bool): Como `profile`, midiendo también la memoria pico.
+        resample_points (int, optional): Preprocesar cada curva y remuestrearla a este
+            número de puntos antes de calibrar (`SignalPreprocessor`).
+        store (str, optional): Base de datos de resultados (`ResultsStore`) donde se
+            guardan los parámetros globales, los valores por ensayo y la procedencia de
+            cada libro calibrado.
+        project (str, optional): Proyecto con el que se guardan los resultados.
+        reuse (bool): Con `store`, no recalibrar los libros cuyo contenido ya está
+            calibrado con las mismas opciones; su fila se toma de la base de datos
+            (sin figuras ni informe nuevos).
+        incremental (bool): En cada libro, omitir las etapas (calibración, figuras,
+            informe) cuyas entradas no cambiaron desde la ejecución anterior en su
+            carpeta de salida.
+
+    Returns:
+        pandas.DataFrame: Resumen con una fila por libro, guardado también en
+        `output_dir/summary.csv`.
+    """
+    workbooks = find_workbooks(source)
+    if not workbooks:
+        raise ValueError(f"No se encontraron libros de ensayos en {source}")
+
+    folders = output_folders(workbooks, output_dir)
+    workers = workers or os.cpu_count() or 1
+    rows = []
+
+    results_store = ResultsStore(store) if store else None
+    options = {'global_fit': global_fit, 'resample_points': resample_points}
+    hashes = {}
+    if results_store is not None:
+        hashes = {str(path): ResultsStore.file_hash(path) for path in folders}
+        if reuse:
+            for path, folder in list(folders.items()):
+                stored = results_store.find(hashes[str(path)], options)
+                if stored is not None:
+                    rows.append({'workbook': str(path), 'output_dir': str(folder), 'status': 'ok', 'error': None,
+                                 'reused': True, **stored['parameters']})
+                    print(f"[reutilizado] {path}")
+                    del folders[path]
+
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(folders)))) as executor:
+        futures = {
+            executor.submit(process_workbook, str(path), str(folder), cache_dir, global_fit, fast_plots,
+                            report_figures, profile, profile_memory, resample_points,
+                            results_store is not None, incremental): path
+            for path, folder in folders.items()
+        }
+        for future in as_completed(futures):
+            row = future.result()
+            rows.append(row)
+            if row['status'] == 'ok':
+                print(f"[ok] {row['workbook']}")
+            else:
+                print(f"[error] {row['workbook']}: {row['error']}")
+
+    rows.sort(key=lambda row: row['workbook'])
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    if profile or profile_memory:
+        write_batch_profile(rows, output_dir)
+    if results_store is not None:
+        calibrated = [row for row in rows if 'tests' in row]
+        results_store.insert_many({
+            'parameters': row, 'tests': row['tests'], 'project': project, 'specimen': Path(row['workbook']).stem,
+            'source': row['workbook'], 'source_hash': hashes[row['workbook']], 'options': options,
+        } for row in calibrated)
+        for row in calibrated:
+            row['reused'] = False
+        results_store.close()
+    summary = pd.DataFrame([{k: v for k, v in row.items() if k not in ('profile', 'tests')} for row in rows])
+    summary.to_csv(Path(output_dir) / 'summary.csv', index=False)
+
+    if combined_report:
+        samples = {}
+        for _, row in summary[summary['status'] == 'ok'].iterrows():
+            paths = CalibrationPipeline.output_paths(row['output_dir'])
+            img_paths = [paths['stress_strain'], paths['stress_path']]
+            # Los libros reutilizados de la base de datos solo tienen figuras si ya se generaron antes
+            if not all(Path(path).exists() for path in img_paths):
+                continue
+            samples[Path(row['workbook']).stem] = {'parameters': row.to_dict(), 'img_paths': img_paths}
+        if samples:
+            # Las figuras ya guardadas de cada libro se incrustan reducidas
+            ReportGenerator.generate_combined_report(
+                samples, str(Path(output_dir) / 'combined_report.pdf'), figures='cached')
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Calibración en lote de libros de ensayos triaxiales (modelo Hardening Soil)")
+    parser.add_argument('source', help="Directorio o patrón glob de libros Excel (p. ej. 'data/*.xlsx')")
+    parser.add_argument('-o', '--output', default='output/batch', help="Directorio de salida")
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help="Número de procesos de trabajo (default: número de núcleos)")
+    parser.add_argument('--cache-dir', default=None, help="Directorio de caché binaria de datos")
+    parser.add_argument('--global-fit', action='store_true',
+                        help="Ajustar E50ref, m y Rf conjuntamente a todas las curvas")
+    parser.add_argument('--fast-plots', action='store_true',
+                        help="Figuras en modo rápido (plantilla reutilizada y curvas reducidas)")
+    parser.add_argument('--report-figures', choices=FIGURE_MODES, default='png',
+                        help="Figuras de los informes: PNG originales, reducidas en caché o vectoriales")
+    parser.add_argument('--combined-report', action='store_true',
+                        help="Generar además un informe combinado con tabla resumen")
+    parser.add_argument('--profile', action='store_true',
+                        help="Registrar tiempo y llamadas por etapa (JSON y traza de Chrome)")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help="Como --profile, midiendo también la memoria pico por etapa")
+    parser.add_argument('--resample', type=int, default=None, metavar='N',
+                        help="Suavizar cada curva y remuestrearla a N deformaciones uniformes antes de calibrar")
+    parser.add_argument('--store', default=None, metavar='DB',
+                        help="Guardar los resultados y su procedencia en esta base de datos SQLite")
+    parser.add_argument('--project', default=None, help="Proyecto con el que se guardan los resultados")
+    parser.add_argument('--reuse', action='store_true',
+                        help="Con --store, reutilizar las calibraciones ya guardadas del mismo libro y opciones")
+    parser.add_argument('--force', action='store_true',
+                        help="Rehacer todas las etapas de cada libro aunque sus entradas no hayan cambiado")
+    args = parser.parse_args()
+
+    summary = run_batch(args.source, args.output, workers=args.workers, cache_dir=args.cache_dir,
+                        global_fit=args.global_fit, fast_plots=args.fast_plots,
+                        report_figures=args.report_figures, combined_report=args.combined_report,
+                        profile=args.profile, profile_memory=args.profile_memory,
+                        resample_points=args.resample, store=args.store, project=args.project,
+                        reuse=args.reuse, incremental=not args.force)
+    failed = (summary['status'] != 'ok').sum()
+    print(f"{len(summary) - failed}/{len(summary)} libros calibrados. Resumen: {Path(args.output) / 'summary.csv'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+
+from src.batch_calibration import BatchCalibrator
+from src.cycles import CycleAnalysis
+from src.data_loader import DataLoader
+from src.parameters import HardeningSoilParameters
+from src.pipeline import CalibrationPipeline
+from src.preprocessing import SignalPreprocessor
+from src.report_generator import ReportGenerator
+from src.synthetic import SyntheticTriaxialData
+from src.visualization import Visualizer
+
+# Tamaños: (muestras, ensayos por muestra, puntos por ensayo)
+SIZES = {
+    'tiny': (1, 3, 100),
+    'small': (10, 3, 1_000),
+    'medium': (100, 3, 10_000),
+    'large': (1_000, 3, 100_000),
+    'xlarge': (3_334, 3, 100_000),  # ~10k ensayos × 100k puntos, generados por bloques
+}
+DEFAULT_SIZES = ('tiny', 'small')
+
+# Puntos generados y calibrados por bloque en los tamaños grandes
+BLOCK_POINTS = 3_000_000
+# Filas máximas de una hoja de Excel (sin encabezado)
+EXCEL_MAX_ROWS = 1_048_575
+# Las figuras y el informe se generan para una muestra mientras tenga a lo sumo estos puntos
+PLOT_MAX_POINTS = 300_000
+
+NOISE = 0.005
+SEED = 20240101
+
+# Tolerancias de recuperación de parámetros (mediana del error sobre las muestras):
+# (parámetro verdadero, parámetro calibrado, tipo de error, tolerancia)
+RECOVERY_TOLERANCES = (
+    ('phi', 'phi', 'abs', 0.5),
+    ('c', 'c', 'abs', 1.0),
+    ('psi', 'psi', 'abs', 0.5),
+    ('m', 'm', 'abs', 0.05),
+    ('Rf', 'Rf', 'rel', 0.10),
+    ('E50ref', 'E50ref_calculated', 'rel', 0.05),
+)
+
+# Importaciones medidas en un proceso nuevo: modo sin gráficas y paquete completo
+IMPORT_STAGES = {
+    'import_headless': "import calibrate",
+    'import_full': "import src; src.Visualizer; src.ReportGenerator",
+}
+
+DEFAULT_BASELINE_FILE = Path(__file__).with_name('baselines.json')
+
+
+def _cpu_model():
+    """Modelo del procesador (de /proc/cpuinfo en Linux, donde `platform.processor()` suele estar vacío)."""
+    try:
+        with open('/proc/cpuinfo', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('model name'):
+                    return line.split(':', 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or 'unknown'
+
+
+def machine_id():
+    """
+    Identificador de la máquina; las líneas base solo se comparan en la misma máquina.
+
+    Se compone del hardware y de la versión de Python (sistema, arquitectura, modelo y
+    número de procesadores), no del nombre del host: contenedores y ejecutores de CI
+    cambian de nombre en cada ejecución sin cambiar de rendimiento.
+    """
+    return (f"{platform.system()}-{platform.machine()}-{_cpu_model()}-{os.cpu_count()}cpu"
+            f"-py{sys.version_info.major}.{sys.version_info.minor}")
+
+
+class _Recorder:
+    """Acumula tiempo y memoria pico por etapa (una etapa puede medirse por bloques)."""
+
+    def __init__(self, memory):
+        self.memory = memory
+        self.stages = {}
+
+    def measure(self, stage, fn, *args, **kwargs):
+        if self.memory:
+            tracemalloc.start()
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            entry = self.stages.setdefault(stage, {'seconds': 0.0, 'peak_mb': 0.0})
+            entry['seconds'] += elapsed
+            if self.memory:
+                peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+                tracemalloc.stop()
+                entry['peak_mb'] = max(entry['peak_mb'], peak)
+
+
+def _import_seconds(statement):
+    """Tiempo de `statement` en un intérprete nuevo (sin módulos ya cargados)."""
+    code = ("import time; start = time.perf_counter(); "
+            f"{statement}; print(time.perf_counter() - start)")
+    output = subprocess.run([sys.executable, '-c', code], cwd=Path(__file__).parent.parent,
+                            capture_output=True, text=True, check=True).stdout
+    return float(output.split()[-1])
+
+
+def _recovery_errors(parameters, truth):
+    """Errores de recuperación (mediana sobre las muestras) de un bloque."""
+    errors = {}
+    for true_name, calibrated_name, kind, _ in RECOVERY_TOLERANCES:
+        expected = truth[true_name].to_numpy()
+        error = np.abs(parameters[calibrated_name] - expected)
+        if kind == 'rel':
+            error = error / np.abs(expected)
+        errors[true_name] = error
+    return errors
+
+
+def _run_once(size, workdir, memory):
+    n_samples, n_tests, n_points = SIZES[size]
+    recorder = _Recorder(memory)
+    block_samples = max(1, BLOCK_POINTS // (n_tests * n_points))
+    pressures = (50.0, 100.0, 200.0, 400.0, 800.0)[:n_tests]
+    errors = []
+    first_block = None
+
+    for stage, statement in IMPORT_STAGES.items():
+        recorder.stages[stage] = {'seconds': _import_seconds(statement), 'peak_mb': None}
+
+    blocks = SyntheticTriaxialData.iter_blocks(
+        n_samples, block_samples=block_samples, seed=SEED, confining_pressures=pressures,
+        n_points=n_points, noise=NOISE)
+    while True:
+        block = recorder.measure('generate', next, blocks, None)
+        if block is None:
+            break
+        arrays, truth = block
+        if first_block is None:
+            first_block = arrays
+
+        _, parameters = recorder.measure(
+            'batch_parameters', BatchCalibrator.calibrate,
+            arrays['strain'], arrays['stress'], arrays['volumetric_strain'], arrays['series_id'],
+            arrays['confining_pressure'], sample_id=arrays['sample_id'])
+        errors.append(_recovery_errors(parameters, truth))
+
+        # Curva del modelo en cada punto, con los parámetros verdaderos de su muestra
+        sample_truth = truth.loc[arrays['sample_id']]
+        recorder.measure(
+            'model', HardeningSoilParameters.model_hyperbolic_curve,
+            arrays['strain'], arrays['confining_pressure'], sample_truth['E50ref'].to_numpy(),
+            sample_truth['c'].to_numpy(), sample_truth['phi'].to_numpy(), sample_truth['m'].to_numpy(),
+            sample_truth['Rf'].to_numpy())
+
+    # Etapas de una sola muestra (la primera)
+    sample_arrays = {name: values[first_block['sample_id'] == 0] for name, values in first_block.items()}
+    frame = SyntheticTriaxialData.to_frame(sample_arrays)
+
+    csv_path = workdir / f'{size}.csv'
+    frame.to_csv(csv_path, index=False)
+    data = recorder.measure('load_csv', lambda: dict(DataLoader.iter_series(csv_path)))
+
+    if len(frame) <= EXCEL_MAX_ROWS:
+        xlsx_path = workdir / f'{size}.xlsx'
+        if not xlsx_path.exists():
+            frame.to_excel(xlsx_path, index=False)
+        data = recorder.measure('load_excel', DataLoader.load_data, xlsx_path)
+
+    tests, parameters = recorder.measure('parameters', CalibrationPipeline.calibrate, data)
+    resampled = recorder.measure('preprocess', SignalPreprocessor.preprocess, data)
+    recorder.measure('parameters_resampled', CalibrationPipeline.calibrate, resampled)
+    # Detección de ciclos sobre el bloque completo concatenado (registro de millones de lecturas)
+    recorder.measure('cycles', CycleAnalysis.segment, first_block['strain'], first_block['stress'])
+
+    if len(frame) <= PLOT_MAX_POINTS:
+        paths = CalibrationPipeline.output_paths(workdir / size)
+        recorder.measure('plot', lambda: (
+            Visualizer.plot_stress_strain(tests, save_path=paths['stress_strain']),
+            Visualizer.plot_stress_path(tests, save_path=paths['stress_path'])))
+        recorder.measure('plot_fast', lambda: (
+            Visualizer.plot_stress_strain(tests, save_path=paths['stress_strain'], fast=True),
+            Visualizer.plot_stress_path(tests, save_path=paths['stress_path'], fast=True)))
+        recorder.measure('report', ReportGenerator.generate_report, parameters,
+                         [paths['stress_strain'], paths['stress_path']], paths['report'])
+
+    recovery = {}
+    for name, _, kind, tolerance in RECOVERY_TOLERANCES:
+        median = float(np.nanmedian(np.concatenate([block[name] for block in errors])))
+        recovery[name] = {'median_error': median, 'kind': kind, 'tolerance': tolerance,
+                          'ok': bool(median <= tolerance)}
+    return recorder.stages, recovery
+
+
+def run_size(size, workdir, repeat=3, memory=True):
+    """
+    Ejecuta las etapas de un tamaño `repeat` veces (se conserva el menor tiempo) y,
+    si `memory`, una vez más con tracemalloc para la memoria pico (tracemalloc
+    distorsiona los tiempos, por eso se mide aparte).
+    """
+    stages, recovery = _run_once(size, workdir, memory=False)
+    for _ in range(repeat - 1):
+        again, _ = _run_once(size, workdir, memory=False)
+        for stage, entry in again.items():
+            stages[stage]['seconds'] = min(stages[stage]['seconds'], entry['seconds'])
+    if memory:
+        traced, _ = _run_once(size, workdir, memory=True)
+        for stage, entry in traced.items():
+            stages[stage]['peak_mb'] = entry['peak_mb']
+    else:
+        for entry in stages.values():
+            entry['peak_mb'] = None
+    return stages, recovery
+
+
+def compare(results, baselines, threshold, memory_threshold, min_seconds=0.01, min_mb=1.0):
+    """
+    Compara los tiempos y la memoria pico con la línea base de esta máquina.
+
+    Una etapa es una regresión de tiempo si tarda más de (1 + threshold) veces su línea
+    base y la diferencia supera `min_seconds`, y de memoria si su pico supera
+    (1 + memory_threshold) veces el de la línea base y la diferencia supera `min_mb`
+    (para ignorar el ruido de etapas muy cortas o pequeñas).
+
+    Retorna:
+    - list: (tamaño, etapa, 'seconds' o 'peak_mb', línea base, valor medido)
+    """
+    machine = baselines.get(machine_id(), {})
+    regressions = []
+    for size, result in results.items():
+        for stage, entry in result['stages'].items():
+            baseline = machine.get(size, {}).get(stage)
+            if isinstance(baseline, (int, float)):
+                # Formato anterior: solo el tiempo
+                baseline = {'seconds': baseline}
+            baseline = baseline or {}
+            entry['baseline'] = baseline.get('seconds')
+            entry['baseline_peak_mb'] = baseline.get('peak_mb')
+
+            if entry['baseline'] is not None:
+                entry['ratio'] = entry['seconds'] / entry['baseline']
+                if (entry['seconds'] > (1 + threshold) * entry['baseline']
+                        and entry['seconds'] - entry['baseline'] > min_seconds):
+                    regressions.append((size, stage, 'seconds', entry['baseline'], entry['seconds']))
+            if entry['baseline_peak_mb'] is not None and entry['peak_mb'] is not None:
+                if (entry['peak_mb'] > (1 + memory_threshold) * entry['baseline_peak_mb']
+                        and entry['peak_mb'] - entry['baseline_peak_mb'] > min_mb):
+                    regressions.append((size, stage, 'peak_mb', entry['baseline_peak_mb'], entry['peak_mb']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmarks de la calibración Hardening Soil con ensayos sintéticos")
+    parser.add_argument('--sizes', default=','.join(DEFAULT_SIZES),
+                        help=f"Tamaños separados por comas ({', '.join(SIZES)})")
+    parser.add_argument('--repeat', type=int, default=3, help="Repeticiones por tamaño (se toma el menor tiempo)")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="Aumento relativo de tiempo que se considera regresión")
+    parser.add_argument('--memory-threshold', type=float, default=0.10,
+                        help="Aumento relativo de la memoria pico que se considera regresión")
+    parser.add_argument('--no-memory', action='store_true', help="No medir la memoria pico")
+    parser.add_argument('--baseline-file', default=str(DEFAULT_BASELINE_FILE), help="Archivo de líneas base")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Guardar los tiempos y la memoria pico obtenidos como línea base de esta máquina")
+    parser.add_argument('--json', default=None, help="Guardar los resultados completos en este archivo JSON")
+    args = parser.parse_args()
+
+    sizes = [size.strip() for size in args.sizes.split(',') if size.strip()]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"Tamaños desconocidos: {unknown}")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            n_samples, n_tests, n_points = SIZES[size]
+            print(f"== {size}: {n_samples} muestras × {n_tests} ensayos × {n_points} puntos")
+            stages, recovery = run_size(size, Path(tmp), repeat=args.repeat, memory=not args.no_memory)
+            results[size] = {'stages': stages, 'recovery': recovery}
+
+    baseline_file = Path(args.baseline_file)
+    baselines = json.loads(baseline_file.read_text()) if baseline_file.exists() else {}
+    regressions = compare(results, baselines, args.threshold, args.memory_threshold)
+
+    failed_recovery = []
+    for size, result in results.items():
+        print(f"\n{size}")
+        print(f"  {'etapa':<22}{'tiempo [s]':>12}{'base [s]':>12}{'ratio':>8}{'pico [MB]':>12}{'base [MB]':>12}")
+        for stage, entry in result['stages'].items():
+            base = '-' if entry.get('baseline') is None else f"{entry['baseline']:.4f}"
+            ratio = '-' if entry.get('ratio') is None else f"{entry['ratio']:.2f}"
+            peak = '-' if entry['peak_mb'] is None else f"{entry['peak_mb']:.1f}"
+            base_peak = '-' if entry.get('baseline_peak_mb') is None else f"{entry['baseline_peak_mb']:.1f}"
+            print(f"  {stage:<22}{entry['seconds']:>12.4f}{base:>12}{ratio:>8}{peak:>12}{base_peak:>12}")
+        print(f"  {'parámetro':<22}{'error':>12}{'tolerancia':>12}")
+        for name, check in result['recovery'].items():
+            status = 'ok' if check['ok'] else 'FALLA'
+            print(f"  {name:<22}{check['median_error']:>12.4g}{check['tolerance']:>12g}  {status}")
+            if not check['ok']:
+                failed_recovery.append((size, name))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({'machine': machine_id(), 'results': results}, indent=2))
+
+    if args.save_baseline:
+        machine = baselines.setdefault(machine_id(), {})
+        for size, result in results.items():
+            machine[size] = {stage: {'seconds': entry['seconds'], 'peak_mb': entry['peak_mb']}
+                             for stage, entry in result['stages'].items()}
+        baseline_file.write_text(json.dumps(baselines, indent=2, sort_keys=True))
+        print(f"\nLínea base guardada en {baseline_file}")
+
+    for size, stage, metric, baseline, value in regressions:
+        unit = 's' if metric == 'seconds' else 'MB'
+        print(f"[regresión] {size}/{stage} ({metric}): {baseline:.4f} {unit} -> {value:.4f} {unit}")
+    for size, name in failed_recovery:
+        print(f"[recuperación] {size}/{name}: fuera de tolerancia")
+    if regressions or failed_recovery:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
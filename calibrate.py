@@ -0,0 +1,147 @@
+import time
+
+_IMPORT_START = time.perf_counter()
+
+import argparse
+import csv
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+from src.data_loader import DataLoader
+from src.pipeline import CalibrationPipeline
+from src.preprocessing import SignalPreprocessor
+from src.results_store import ResultsStore
+
+# Tiempo de importación del modo sin gráficas (no carga matplotlib, seaborn ni reportlab)
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_START
+
+
+def _sources_hash(files):
+    """Hash de un conjunto de archivos reunidos: no depende del orden ni de las rutas."""
+    hashes = sorted(ResultsStore.file_hash(path) for path in files)
+    return hashlib.sha256('\n'.join(hashes).encode()).hexdigest()
+
+
+def calibrate_files(file_paths, cache_dir=None, global_fit=False, resample_points=None, store=None,
+                    project=None, reuse=False, merge=False, io_workers=None):
+    """
+    Calibra cada libro y retorna una fila por libro, sin figuras ni informes. Los
+    directorios se expanden en sus archivos de datos (ver `DataLoader.list_sources`).
+    Con `merge`, todos los archivos se leen en paralelo como un único conjunto de
+    ensayos (`DataLoader.load_sources`, con hasta `io_workers` hilos o procesos) y se calibran una vez.
+    Con `resample_points`, las curvas se preprocesan antes (ver `SignalPreprocessor`).
+
+    Con `store` (un `ResultsStore`), cada calibración se guarda con su procedencia y,
+    si `reuse`, los libros ya calibrados con las mismas opciones se leen de la base de
+    datos en lugar de recalibrarse.
+
+    Returns:
+        tuple: (filas con 'workbook', 'status', 'error' y los parámetros,
+        tiempos {'import', 'load', 'calibrate'} en segundos)
+    """
+    rows = []
+    timings = {'import': IMPORT_SECONDS, 'load': 0.0, 'calibrate': 0.0}
+    options = {'global_fit': global_fit, 'resample_points': resample_points}
+    if merge:
+        jobs = [list(file_paths)]
+    else:
+        jobs = [[path] for source in file_paths
+                for path in (DataLoader.list_sources([source]) if Path(source).is_dir() else [source])]
+    for job in jobs:
+        file_path = job[0] if len(job) == 1 else ', '.join(map(str, job))
+        row = {'workbook': str(file_path), 'status': 'ok', 'error': None}
+        try:
+            source_hash = None
+            if store is not None:
+                source_hash = (_sources_hash(DataLoader.list_sources(job)) if merge
+                               else ResultsStore.file_hash(file_path))
+            stored = store.find(source_hash, options) if store is not None and reuse else None
+            if stored is not None:
+                row.update(stored['parameters'], reused=True)
+                rows.append(row)
+                continue
+
+            start = time.perf_counter()
+            if merge:
+                data, _ = DataLoader.load_sources(job, workers=io_workers, cache_dir=cache_dir)
+            else:
+                data = DataLoader.load_data(file_path, cache_dir=cache_dir)
+            if resample_points:
+                data = SignalPreprocessor.preprocess(data, n_points=resample_points)
+            loaded = time.perf_counter()
+            tests, parameters = CalibrationPipeline.calibrate(data, global_fit=global_fit)
+            timings['load'] += loaded - start
+            timings['calibrate'] += time.perf_counter() - loaded
+            row.update({name: float(value) for name, value in parameters.items()})
+            if store is not None:
+                store.insert(parameters, tests, project=project, specimen='+'.join(Path(p).stem for p in job),
+                             source=file_path, source_hash=source_hash, options=options)
+                row['reused'] = False
+        except Exception as e:
+            row['status'] = 'error'
+            row['error'] = f"{type(e).__name__}: {e}"
+        rows.append(row)
+    return rows, timings
+
+
+def write_rows(rows, output, fmt):
+    if fmt == 'json':
+        json.dump(rows, output, indent=2, ensure_ascii=False)
+        output.write('\n')
+    else:
+        fields = list(dict.fromkeys(key for row in rows for key in row))
+        writer = csv.DictWriter(output, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Calibración sin gráficas ni informes (parámetros en JSON o CSV)")
+    parser.add_argument('files', nargs='+',
+                        help="Libros de ensayos (Excel, CSV o Parquet) o directorios a calibrar")
+    parser.add_argument('-f', '--format', choices=('json', 'csv'), default='json', help="Formato de salida")
+    parser.add_argument('-o', '--output', default=None, help="Archivo de salida (default: salida estándar)")
+    parser.add_argument('--cache-dir', default=None, help="Directorio de caché binaria de datos")
+    parser.add_argument('--global-fit', action='store_true',
+                        help="Ajustar E50ref, m y Rf conjuntamente a todas las curvas")
+    parser.add_argument('--resample', type=int, default=None, metavar='N',
+                        help="Suavizar cada curva y remuestrearla a N deformaciones uniformes antes de calibrar")
+    parser.add_argument('--store', default=None, metavar='DB',
+                        help="Guardar los resultados y su procedencia en esta base de datos SQLite")
+    parser.add_argument('--project', default=None, help="Proyecto con el que se guardan los resultados")
+    parser.add_argument('--reuse', action='store_true',
+                        help="Con --store, reutilizar las calibraciones ya guardadas del mismo libro y opciones")
+    parser.add_argument('--merge', action='store_true',
+                        help="Leer todos los archivos en paralelo como un solo conjunto de ensayos y calibrarlo una vez")
+    parser.add_argument('--io-workers', type=int, default=None,
+                        help="Con --merge, máximo de hilos (CSV, Parquet) y procesos (Excel) de lectura")
+    parser.add_argument('--timings', action='store_true',
+                        help="Mostrar en la salida de errores los tiempos de importación, carga y calibración")
+    args = parser.parse_args()
+
+    store = ResultsStore(args.store) if args.store else None
+    try:
+        rows, timings = calibrate_files(args.files, cache_dir=args.cache_dir, global_fit=args.global_fit,
+                                        resample_points=args.resample, store=store, project=args.project,
+                                        reuse=args.reuse, merge=args.merge, io_workers=args.io_workers)
+    finally:
+        if store is not None:
+            store.close()
+
+    if args.output:
+        with open(args.output, 'w', newline='', encoding='utf-8') as f:
+            write_rows(rows, f, args.format)
+    else:
+        write_rows(rows, sys.stdout, args.format)
+
+    if args.timings:
+        print(' '.join(f"{name}={seconds:.3f}s" for name, seconds in timings.items()), file=sys.stderr)
+    if any(row['status'] != 'ok' for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import argparse
+import asyncio
+
+from src.service import CalibrationService
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Servicio HTTP local de calibración del modelo Hardening Soil")
+    parser.add_argument('--host', default='127.0.0.1', help="Dirección de escucha (default: solo esta máquina)")
+    parser.add_argument('--port', type=int, default=8765, help="Puerto de escucha")
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help="Procesos de calibración (default: número de núcleos)")
+    parser.add_argument('--cache-size', type=int, default=128,
+                        help="Resultados guardados en la caché LRU (0 la desactiva)")
+    parser.add_argument('--max-pending', type=int, default=None,
+                        help="Calibraciones simultáneas antes de responder 503 (default: 4 por proceso)")
+    parser.add_argument('--max-body-mb', type=float, default=64,
+                        help="Tamaño máximo de los datos de una solicitud en MB")
+    args = parser.parse_args()
+
+    service = CalibrationService(workers=args.workers, cache_size=args.cache_size,
+                                 max_pending=args.max_pending,
+                                 max_body_bytes=int(args.max_body_mb * 1024 ** 2))
+    print(f"Servicio de calibración en http://{args.host}:{args.port} "
+          f"({service.workers} procesos, caché de {service.cache_size} resultados)")
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
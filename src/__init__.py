@@ -1,3 +1,38 @@
-from .visualization import Visualizer
-from .report_generator import ReportGenerator
-from .parameters import HardeningSoilParameters 
\ No newline at end of file
+import importlib
+
+# Clases públicas y el submódulo que las define. Se importan en el primer acceso
+# (p. ej. `from src import Visualizer`), de modo que una calibración sin gráficas ni
+# informes no carga matplotlib, seaborn ni reportlab.
+_EXPORTS = {
+    'Visualizer': 'visualization',
+    'ReportGenerator': 'report_generator',
+    'HardeningSoilParameters': 'parameters',
+    'BatchCalibrator': 'batch_calibration',
+    'HardeningSoilIntegrator': 'element_tests',
+    'BootstrapAnalysis': 'uncertainty',
+    'HardeningSoilMaterial': 'material',
+    'IncrementalCalibration': 'incremental',
+    'OnlineCalibrator': 'online',
+    'SignalPreprocessor': 'preprocessing',
+    'CalibrationService': 'service',
+    'ResultsStore': 'results_store',
+    'ParameterSweep': 'sweep',
+    'CycleAnalysis': 'cycles',
+    'TestSet': 'test_set',
+    'HardeningSurrogate': 'surrogate',
+    'StageTracker': 'stages',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
\ No newline at end of file
@@ -0,0 +1,211 @@
+import numpy as np
+
+from .regression import segment_first_true, segment_linregress, segment_sum
+
+
+class BatchCalibrator:
+    """
+    Calibración vectorizada de muchas series triaxiales a la vez.
+
+    Replica la cadena de `HardeningSoilParameters` usada en `main()`
+    (calculate_phi_and_c, calculate_E50ref, calculate_qa, calculate_qf,
+    calculate_psi, calculate_m) pero operando sobre arrays concatenados
+    de curvas de distinta longitud identificadas por un id de serie.
+    Varias series que comparten `sample_id` forman un juego de ensayos
+    del que se obtiene un conjunto de parámetros globales.
+    """
+
+    @staticmethod
+    def calibrate(strain, stress, volumetric_strain, series_id, confining_pressure,
+                  sample_id=None, p_ref=100, v_ur=0.2):
+        """
+        Calibra todas las series en una sola pasada vectorizada.
+
+        Parámetros:
+        - strain, stress, volumetric_strain: Arrays concatenados con los puntos de todas las series
+        - series_id: Id de serie (ensayo) de cada punto. El orden de los puntos dentro de
+          cada serie se conserva.
+        - confining_pressure: Presión de confinamiento (σ3) de cada punto [kPa]
+        - sample_id: Id del juego de ensayos de cada punto (default: un único juego)
+        - p_ref: Presión de referencia (default 100 kPa)
+        - v_ur: Coeficiente de Poisson en descarga-recarga (default 0.2)
+
+        Retorna:
+        - tests: dict de arrays por serie ('series', 'sample', 'confining_pressure', 'E50ref',
+          'Eur_ref', 'Eoed_ref', 'psi', 'qf', 'qa', 'Rf')
+        - parameters: dict de arrays por juego con las mismas claves que `parameters` en
+          `main()`, más 'sample' y 'E50ref_calculated'
+
+        Notas:
+        - A diferencia de `calculate_qa`, una serie con transformación hiperbólica inválida
+          no lanza ValueError: su qa y Rf quedan en NaN y se excluye del promedio de Rf.
+        """
+        strain = np.asarray(strain, dtype=float)
+        stress = np.asarray(stress, dtype=float)
+        volumetric_strain = np.asarray(volumetric_strain, dtype=float)
+        series_id = np.asarray(series_id)
+        confining_pressure = np.asarray(confining_pressure, dtype=float)
+        if sample_id is None:
+            sample_id = np.zeros(series_id.shape, dtype=int)
+        sample_id = np.asarray(sample_id)
+
+        sizes = {strain.size, stress.size, volumetric_strain.size, series_id.size,
+                 confining_pressure.size, sample_id.size}
+        if len(sizes) != 1:
+            raise ValueError("Todos los arrays de entrada deben tener la misma longitud")
+        if strain.size == 0:
+            raise ValueError("No hay datos para calibrar")
+
+        # Ordenar por serie conservando el orden de los puntos dentro de cada una
+        series_labels, seg = np.unique(series_id, return_inverse=True)
+        order = np.argsort(seg, kind='stable')
+        seg = seg[order]
+        strain = strain[order]
+        stress = stress[order]
+        volumetric_strain = volumetric_strain[order]
+        n_series = series_labels.size
+        starts = np.flatnonzero(np.r_[True, seg[1:] != seg[:-1]])
+
+        # Metadatos por serie (primer punto de cada serie)
+        cp = confining_pressure[order][starts]
+        series_sample = sample_id[order][starts]
+        sample_labels, sample_seg = np.unique(series_sample, return_inverse=True)
+        n_samples = sample_labels.size
+
+        # Pico de cada curva (primera ocurrencia, igual que np.argmax)
+        peak = np.maximum.reduceat(stress, starts)
+        peak_idx = segment_first_true(stress == peak[seg], starts)
+
+        # Primera pasada: phi y c por juego (regresión lineal pico vs σ3)
+        slope, intercept = segment_linregress(cp, peak, sample_seg, n_samples)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sin_phi = slope / (2 + slope)
+            phi = np.degrees(np.arcsin(sin_phi))
+            c = intercept * (1 - sin_phi) / (2 * np.cos(np.radians(phi)))
+
+        # E50ref: punto más cercano al 50% del pico
+        distance = np.abs(stress - 0.5 * peak[seg])
+        min_distance = np.minimum.reduceat(distance, starts)
+        idx50 = segment_first_true(distance == min_distance[seg], starts)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            E50ref = stress[idx50] / strain[idx50]
+
+        # qa: transformación hiperbólica ε/q vs ε hasta el pico, descartando q < 10% del pico
+        valid = (np.arange(stress.size) <= peak_idx[seg]) & (stress > 0.1 * peak[seg])
+        x = strain[valid]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            hyp_slope, _ = segment_linregress(x, x / stress[valid], seg[valid], n_series)
+            qa = np.where(hyp_slope > 0, 1.0 / hyp_slope, np.nan)
+        qa = np.where(qa >= peak, qa, np.nan)
+
+        # qf por Mohr-Coulomb con los parámetros del juego al que pertenece la serie
+        phi_rad = np.radians(phi)
+        sin_p, cos_p, tan_p = np.sin(phi_rad), np.cos(phi_rad), np.tan(phi_rad)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            qf = (2 * sin_p[sample_seg]) * (cp + c[sample_seg] / tan_p[sample_seg]) / (1 - sin_p[sample_seg])
+            Rf = qf / qa
+
+        # psi: media de Δεv/Δε1 entre puntos dilatantes consecutivos de la misma serie,
+        # sin los pares con Δε1 = 0 (como `calculate_psi`)
+        dilatant = volumetric_strain < 0
+        d_seg = seg[dilatant]
+        delta_e1 = np.diff(strain[dilatant])
+        same = (d_seg[1:] == d_seg[:-1]) & (delta_e1 != 0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ratio = (np.diff(volumetric_strain[dilatant]) / delta_e1)[same]
+            pair_seg = d_seg[1:][same]
+            n_pairs = np.bincount(pair_seg, minlength=n_series)
+            a = -segment_sum(ratio, pair_seg, n_series) / n_pairs
+            psi = np.degrees(np.arcsin(a / (2 + a)))
+        has_dilatancy = np.bincount(d_seg, minlength=n_series) > 0
+        psi = np.where(has_dilatancy, psi, 0.0)
+
+        # Exponente m y E50_ref por juego (regresión log-log)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            numerator = c[sample_seg] * cos_p[sample_seg] + cp * sin_p[sample_seg]
+            denominator = c[sample_seg] * cos_p[sample_seg] + p_ref * sin_p[sample_seg]
+            m, log_E50ref = segment_linregress(np.log(numerator / denominator), np.log(E50ref),
+                                                sample_seg, n_samples)
+        E50ref_calculated = np.exp(log_E50ref)
+
+        # Promedios por juego
+        n_tests = np.bincount(sample_seg, minlength=n_samples)
+        E50ref_mean = segment_sum(E50ref, sample_seg, n_samples) / n_tests
+        finite_psi = np.isfinite(psi)
+        finite_Rf = np.isfinite(Rf)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            psi_mean = (segment_sum(np.where(finite_psi, psi, 0.0), sample_seg, n_samples)
+                        / np.bincount(sample_seg, weights=finite_psi, minlength=n_samples))
+            Rf_mean = (segment_sum(np.where(finite_Rf, Rf, 0.0), sample_seg, n_samples)
+                       / np.bincount(sample_seg, weights=finite_Rf, minlength=n_samples))
+
+        tests = {
+            'series': series_labels,
+            'sample': series_sample,
+            'confining_pressure': cp,
+            'E50ref': E50ref,
+            'Eur_ref': 3 * E50ref,
+            'Eoed_ref': E50ref,
+            'psi': psi,
+            'qf': qf,
+            'qa': qa,
+            'Rf': Rf,
+        }
+        parameters = {
+            'sample': sample_labels,
+            'E50ref': E50ref_mean,
+            'E50ref_calculated': E50ref_calculated,
+            'Eur_ref': 3 * E50ref_mean,
+            'Eoed_ref': E50ref_mean,
+            'c': c,
+            'phi': phi,
+            'psi': psi_mean,
+            'm': m,
+            'v_ur': np.full(n_samples, v_ur, dtype=float),
+            'p_ref': np.full(n_samples, p_ref, dtype=float),
+            'K0_nc': 1 - sin_p,
+            'Rf': Rf_mean,
+        }
+        return tests, parameters
+
+    @staticmethod
+    def calibrate_set(test_set, sample_id=None, p_ref=100, v_ur=0.2):
+        """
+        Calibra un `TestSet` directamente sobre sus buffers contiguos (sin DataFrames).
+
+        Parámetros:
+        - test_set: `TestSet` con 'strain', 'stress', 'volumetric_strain' y el metadato
+          'confining_pressure'
+        - sample_id: Id del juego de cada ensayo (un valor por ensayo; default: un único juego)
+        """
+        if sample_id is not None:
+            sample_id = np.repeat(np.asarray(sample_id), test_set.lengths)
+        return BatchCalibrator.calibrate(
+            test_set.columns['strain'],
+            test_set.columns['stress'],
+            test_set.columns['volumetric_strain'],
+            test_set.series_id,
+            test_set.repeat('confining_pressure'),
+            sample_id=sample_id, p_ref=p_ref, v_ur=v_ur)
+
+    @staticmethod
+    def calibrate_frame(df, series_col='series_id', sample_col=None, p_ref=100, v_ur=0.2):
+        """
+        Calibra un DataFrame con las columnas de `DataLoader` más una columna de id de serie.
+
+        Parámetros:
+        - df: DataFrame con 'strain', 'stress', 'volumetric_strain' y 'confining_pressure'
+        - series_col: Columna con el id de serie (ensayo)
+        - sample_col: Columna con el id del juego de ensayos (opcional)
+        """
+        sample_id = df[sample_col].values if sample_col is not None else None
+        return BatchCalibrator.calibrate(
+            df['strain'].values,
+            df['stress'].values,
+            df['volumetric_strain'].values,
+            df[series_col].values,
+            df['confining_pressure'].values,
+            sample_id=sample_id,
+            p_ref=p_ref,
+            v_ur=v_ur,
+        )
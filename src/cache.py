@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+
+class DataCache:
+    """
+    Caché en disco de los datos validados y agrupados por `DataLoader`.
+
+    Cada entrada es un directorio con un archivo .npy por columna (todas las
+    series concatenadas), el índice original, los límites de cada serie y un
+    `meta.json`. Las columnas se abren con `np.load(mmap_mode='r')`, de modo
+    que en una ejecución en caliente los datos se mapean sin copiarlos.
+
+    La clave es el hash SHA-256 del contenido del archivo fuente más la versión
+    del cargador; las entradas menos usadas se eliminan cuando el tamaño total
+    supera `max_bytes`.
+    """
+
+    DEFAULT_MAX_BYTES = 512 * 1024 ** 2
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES, version=1):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.version = version
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def key(self, file_path):
+        """Clave de caché: hash del contenido del archivo y de la versión del cargador."""
+        digest = hashlib.sha256(f"loader-v{self.version}".encode())
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 ** 2), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def load(self, key):
+        """
+        Abre una entrada de la caché.
+
+        Retorna:
+        - dict {presión de confinamiento: {'index': array, columna: array, ...}} con
+          vistas de solo lectura sobre arrays mapeados en memoria, o None si la
+          entrada no existe.
+        """
+        entry = self.load_columns(key)
+        if entry is None:
+            return None
+
+        grouped = {}
+        offsets = entry['offsets']
+        for i, cp in enumerate(entry['keys'].tolist()):
+            start, end = offsets[i], offsets[i + 1]
+            group = {'index': entry['index'][start:end]}
+            group.update({name: values[start:end] for name, values in entry['columns'].items()})
+            grouped[cp] = group
+        return grouped
+
+    def load_columns(self, key):
+        """
+        Abre una entrada de la caché sin dividirla por serie.
+
+        Retorna:
+        - dict con 'columns' ({nombre: array mapeado con todas las series}), 'index',
+          'offsets' (límites de cada serie) y 'keys' (presión de confinamiento de cada
+          serie), o None si la entrada no existe.
+        """
+        entry = self.cache_dir / key
+        meta_path = entry / 'meta.json'
+        if not meta_path.exists():
+            return None
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+
+        columns = {name: np.load(entry / f'col_{i}.npy', mmap_mode='r')
+                   for i, name in enumerate(meta['columns'])}
+        index = np.load(entry / 'index.npy', mmap_mode='r')
+        offsets = np.load(entry / 'offsets.npy')
+        keys = np.load(entry / 'keys.npy')
+
+        # Marcar como usada recientemente (política LRU)
+        os.utime(meta_path)
+        return {'columns': columns, 'index': index, 'offsets': offsets, 'keys': keys}
+
+    def store(self, key, grouped):
+        """
+        Guarda un dict de DataFrames agrupados por presión de confinamiento.
+
+        Retorna:
+        - bool: False si alguna columna no es numérica (no se puede mapear) y la
+          entrada no se guardó.
+        """
+        frames = list(grouped.values())
+        columns = list(frames[0].columns)
+        if not all(np.issubdtype(frames[0][col].dtype, np.number) for col in columns):
+            return False
+
+        # Escribir en un directorio temporal y renombrar para que la entrada aparezca completa
+        tmp = Path(tempfile.mkdtemp(dir=self.cache_dir, prefix='.tmp-'))
+        try:
+            for i, col in enumerate(columns):
+                np.save(tmp / f'col_{i}.npy', np.concatenate([df[col].to_numpy() for df in frames]))
+            np.save(tmp / 'index.npy', np.concatenate([df.index.to_numpy() for df in frames]))
+            np.save(tmp / 'offsets.npy', np.cumsum([0] + [len(df) for df in frames]))
+            np.save(tmp / 'keys.npy', np.array(list(grouped.keys())))
+            with open(tmp / 'meta.json', 'w', encoding='utf-8') as f:
+                json.dump({'columns': columns, 'version': self.version}, f, ensure_ascii=False)
+            try:
+                os.replace(tmp, self.cache_dir / key)
+            except OSError:
+                # Otro proceso guardó la misma entrada primero
+                shutil.rmtree(tmp, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+        self.evict(keep=key)
+        return True
+
+    def evict(self, keep=None):
+        """
+        Elimina las entradas menos usadas hasta que la caché quepa en `max_bytes`.
+
+        La entrada `keep` (la recién guardada por `store`) nunca se elimina, aunque por sí
+        sola supere `max_bytes`.
+        """
+        entries = []
+        total = 0
+        for entry in self.cache_dir.iterdir():
+            meta_path = entry / 'meta.json'
+            if entry.name.startswith('.') or not meta_path.exists():
+                continue
+            size = sum(f.stat().st_size for f in entry.iterdir())
+            # La entrada `keep` cuenta en el total pero no es candidata a eliminarse
+            total += size
+            if entry.name != keep:
+                entries.append((meta_path.stat().st_mtime, size, entry))
+
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
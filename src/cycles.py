@@ -0,0 +1,220 @@
+import numpy as np
+import pandas as pd
+
+from .regression import linregress, segment_linregress
+
+# Rama de cada lectura en `CycleAnalysis.segment`
+LOADING, UNLOADING, RELOADING = 0, 1, 2
+BRANCHES = ('loading', 'unloading', 'reloading')
+
+
+def _stress_ratio(sigma, c, phi, p_ref):
+    """Factor de la ley potencial: (c·cosφ + σ·sinφ) / (c·cosφ + p_ref·sinφ)."""
+    phi_rad = np.radians(phi)
+    return ((c * np.cos(phi_rad) + np.asarray(sigma, dtype=float) * np.sin(phi_rad))
+            / (c * np.cos(phi_rad) + p_ref * np.sin(phi_rad)))
+
+
+def _paint(n, first, last):
+    """Máscara con los tramos [first, last] (inclusive) marcados, sin bucles de Python."""
+    marks = np.zeros(n + 1, dtype=np.int64)
+    np.add.at(marks, first, 1)
+    np.add.at(marks, last + 1, -1)
+    return np.cumsum(marks[:-1]) > 0
+
+
+class CycleAnalysis:
+    """
+    Ciclos de descarga-recarga en registros triaxiales y edométricos.
+
+    La envolvente de carga es el máximo acumulado del esfuerzo. Una lectura más de
+    `tolerance` por debajo de la envolvente pertenece a un ciclo; cada tramo de esas
+    lecturas que vuelve a la envolvente es un ciclo completo, con una rama de descarga
+    (del punto de inversión al mínimo) y una de recarga (del mínimo al regreso a la
+    envolvente). Los tramos que no regresan (ablandamiento tras el pico o descarga
+    final) se conservan como carga. Todo se calcula con operaciones acumuladas sobre
+    arrays, en O(n).
+    """
+
+    @staticmethod
+    def segment(strain, stress, tolerance=0.05, min_points=5):
+        """
+        Divide una curva en ramas de carga, descarga y recarga.
+
+        Parámetros:
+        - strain: Deformación axial de cada lectura, en orden de registro
+        - stress: Esfuerzo de cada lectura (desviador en triaxiales, vertical en edómetros)
+        - tolerance: Profundidad mínima de un ciclo, como fracción del rango de esfuerzos
+          (las caídas menores se tratan como ruido de la carga)
+        - min_points: Lecturas mínimas de un ciclo para ajustar su módulo
+
+        Retorna:
+        - branch: Array con la rama de cada lectura (LOADING, UNLOADING o RELOADING)
+        - loops: DataFrame con una fila por ciclo: índices 'start' (inversión), 'minimum'
+          y 'end' (regreso a la envolvente), 'q_top', 'q_min', 'Eur' (pendiente de la
+          regresión esfuerzo-deformación sobre todo el ciclo) y 'Eur_secant' (entre la
+          inversión y el mínimo)
+        """
+        strain = np.asarray(strain, dtype=float)
+        stress = np.asarray(stress, dtype=float)
+        n = stress.size
+        branch = np.zeros(n, dtype=np.int8)
+        columns = ['start', 'minimum', 'end', 'q_top', 'q_min', 'Eur', 'Eur_secant']
+        if n < 3:
+            return branch, pd.DataFrame(columns=columns)
+
+        index = np.arange(n)
+        envelope = np.maximum.accumulate(stress)
+        inside = stress < envelope - tolerance * (envelope[-1] - stress.min())
+
+        # Tramos de lecturas bajo la envolvente: [first, stop)
+        edges = np.diff(inside.astype(np.int8), prepend=0, append=0)
+        first = np.flatnonzero(edges == 1)
+        stop = np.flatnonzero(edges == -1)
+        closed = stop < n
+        first, stop = first[closed], stop[closed]
+        if first.size == 0:
+            return branch, pd.DataFrame(columns=columns)
+
+        # Inversión: lectura donde la envolvente alcanzó su valor al iniciar la descarga
+        on_envelope = stress >= envelope
+        last_peak = np.maximum.accumulate(np.where(on_envelope, index, 0))
+        start = last_peak[first - 1]
+        # Fin: primera lectura que vuelve a la envolvente tras el tramo
+        next_peak = np.minimum.accumulate(np.where(on_envelope, index, n)[::-1])[::-1]
+        end = np.minimum(next_peak[stop], n - 1)
+
+        # Mínimo de cada tramo (primera ocurrencia)
+        bounds = np.column_stack([first, stop]).ravel()
+        run_min = np.minimum.reduceat(stress, bounds)[::2]
+        run = np.maximum(np.searchsorted(first, index, side='right') - 1, 0)
+        in_run = (index >= first[run]) & (index < stop[run])
+        is_min = in_run & (stress == run_min[run])
+        minimum = np.minimum.reduceat(np.where(is_min, index, n), bounds)[::2]
+
+        # Ajuste del módulo de cada ciclo sobre [start, end]
+        lengths = end - start + 1
+        loop_id = np.repeat(np.arange(first.size), lengths)
+        points = start[loop_id] + (np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths))
+        Eur, _ = segment_linregress(strain[points], stress[points], loop_id, first.size)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            Eur_secant = (stress[start] - stress[minimum]) / (strain[start] - strain[minimum])
+        Eur = np.where(lengths >= min_points, Eur, np.nan)
+
+        branch[_paint(n, start + 1, minimum)] = UNLOADING
+        branch[_paint(n, minimum + 1, end)] = RELOADING
+        loops = pd.DataFrame({
+            'start': start, 'minimum': minimum, 'end': end,
+            'q_top': stress[start], 'q_min': stress[minimum],
+            'Eur': Eur, 'Eur_secant': Eur_secant,
+        })
+        return branch, loops
+
+    @staticmethod
+    def fit_power_law(sigma, modulus, c, phi, m=None, p_ref=100):
+        """
+        Ajusta E = E_ref · [(c·cosφ + σ·sinφ) / (c·cosφ + p_ref·sinφ)]^m por regresión
+        lineal en escala logarítmica (como `calculate_m`).
+
+        Parámetros:
+        - sigma: Esfuerzo de cada módulo (σ3 para Eur, σ1 vertical para Eoed)
+        - modulus: Módulos medidos
+        - c, phi: Parámetros de resistencia
+        - m: Exponente fijo; si es None se ajusta (requiere al menos dos niveles de σ)
+        - p_ref: Presión de referencia
+
+        Retorna:
+        - tuple: (E_ref, m)
+
+        Raises:
+        - ValueError: Si no hay módulos válidos o no se puede ajustar m
+        """
+        sigma = np.asarray(sigma, dtype=float)
+        modulus = np.asarray(modulus, dtype=float)
+        valid = np.isfinite(modulus) & (modulus > 0)
+        if not np.any(valid):
+            raise ValueError("No hay módulos válidos para ajustar la ley potencial")
+        x = np.log(_stress_ratio(sigma[valid], c, phi, p_ref))
+        y = np.log(modulus[valid])
+        if m is None:
+            if np.unique(x).size < 2:
+                raise ValueError("Se requieren al menos dos niveles de esfuerzo para ajustar m")
+            m, intercept = linregress(x, y)
+        else:
+            intercept = np.mean(y - m * x)
+        return float(np.exp(intercept)), float(m)
+
+    @staticmethod
+    def loop_moduli(data, tolerance=0.05, min_points=5):
+        """
+        Ciclos de todos los ensayos de un libro.
+
+        Parámetros:
+        - data: dict {presión de confinamiento: DataFrame} como el de `DataLoader.load_data`
+
+        Retorna:
+        - dict {presión de confinamiento: (branch, loops)} con el resultado de `segment`
+        """
+        return {cp: CycleAnalysis.segment(np.asarray(df['strain']), np.asarray(df['stress']),
+                                          tolerance, min_points)
+                for cp, df in data.items()}
+
+    @staticmethod
+    def fit_Eur_ref(cycles, c, phi, m=None, p_ref=100):
+        """
+        Eur_ref a partir de los ciclos de ensayos triaxiales (Eur depende de σ3).
+
+        Parámetros:
+        - cycles: Resultado de `loop_moduli`
+        - c, phi, m, p_ref: Ver `fit_power_law`
+
+        Retorna:
+        - tuple: (Eur_ref, m), o None si ningún ensayo tiene ciclos válidos
+        """
+        sigma = np.concatenate([np.full(len(loops), cp, dtype=float) for cp, (_, loops) in cycles.items()])
+        Eur = np.concatenate([loops['Eur'].to_numpy(dtype=float) for _, loops in cycles.values()])
+        if not np.any(np.isfinite(Eur) & (Eur > 0)):
+            return None
+        return CycleAnalysis.fit_power_law(sigma, Eur, c, phi, m=m, p_ref=p_ref)
+
+    @staticmethod
+    def oedometer_moduli(strain, vertical_stress, n_levels=8, tolerance=0.05):
+        """
+        Módulos edométricos tangentes de la rama de carga virgen a varios niveles de esfuerzo.
+
+        Las lecturas de ciclos de descarga-recarga se excluyen y la carga se divide en
+        `n_levels` intervalos de esfuerzo con razón constante (la ley potencial es
+        lineal en escala logarítmica); en cada uno se ajusta la pendiente
+        esfuerzo vertical-deformación.
+
+        Retorna:
+        - DataFrame con 'sigma_1' (esfuerzo medio del intervalo), 'Eoed' y 'n_points'
+        """
+        strain = np.asarray(strain, dtype=float)
+        vertical_stress = np.asarray(vertical_stress, dtype=float)
+        branch, _ = CycleAnalysis.segment(strain, vertical_stress, tolerance)
+        # Solo la carga virgen: lecturas que marcan un nuevo máximo de esfuerzo
+        virgin = (branch == LOADING) & (vertical_stress >= np.maximum.accumulate(vertical_stress))
+        strain, vertical_stress = strain[virgin], vertical_stress[virgin]
+
+        low = max(vertical_stress.min(), 1e-3 * vertical_stress.max())
+        edges = np.geomspace(low, vertical_stress.max(), n_levels + 1)
+        level = np.clip(np.searchsorted(edges, vertical_stress, side='right') - 1, 0, n_levels - 1)
+        Eoed, _ = segment_linregress(strain, vertical_stress, level, n_levels)
+        counts = np.bincount(level, minlength=n_levels)
+        sums = np.bincount(level, weights=vertical_stress, minlength=n_levels)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sigma_1 = sums / counts
+        return pd.DataFrame({'sigma_1': sigma_1, 'Eoed': Eoed, 'n_points': counts})
+
+    @staticmethod
+    def fit_Eoed_ref(strain, vertical_stress, c, phi, m=None, p_ref=100, n_levels=8, tolerance=0.05):
+        """
+        Eoed_ref a partir de un ensayo edométrico: ley potencial de los módulos tangentes
+        de la carga virgen en función del esfuerzo vertical σ1.
+
+        Retorna:
+        - tuple: (Eoed_ref, m)
+        """
+        moduli = CycleAnalysis.oedometer_moduli(strain, vertical_stress, n_levels, tolerance)
+        return CycleAnalysis.fit_power_law(moduli['sigma_1'], moduli['Eoed'], c, phi, m=m, p_ref=p_ref)
@@ -1,38 +1,408 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack
+from functools import partial
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
+from .cache import DataCache
+from .results_store import ResultsStore
+from .test_set import TestSet
 
 class DataLoader:
+    # Columnas requeridas, incluida la deformación volumétrica
+    REQUIRED_COLUMNS = {'strain', 'stress', 'confining_pressure', 'volumetric_strain'}
+    # Versión del formato de los datos cargados; forma parte de la clave de caché
+    CACHE_VERSION = 1
+    # Formatos de archivo que aceptan `load_data` y `load_sources`
+    EXCEL_SUFFIXES = ('.xlsx', '.xls')
+    CHUNKED_SUFFIXES = ('.csv', '.txt', '.parquet', '.pq')
+
+    @staticmethod
+    def _validate(df):
+        """
+        Verifica que el DataFrame tenga las columnas requeridas y no tenga valores faltantes.
+
+        Raises:
+            ValueError: Si faltan columnas o hay datos inválidos.
+        """
+        required_cols = DataLoader.REQUIRED_COLUMNS
+
+        # Verificar columnas requeridas
+        if not all(col in df.columns for col in required_cols):
+            missing = [col for col in required_cols if col not in df.columns]
+            raise ValueError(f"Columnas faltantes: {missing}")
+
+        # Verificar datos faltantes
+        if df[list(required_cols)].isnull().any().any():
+            raise ValueError("Datos con valores faltantes.")
+
     @staticmethod
-    def load_data(file_path):
+    def load_data(file_path, cache_dir=None, cache_max_bytes=DataCache.DEFAULT_MAX_BYTES):
         """
-        Carga datos de un ensayo triaxial desde un archivo Excel.
-        
+        Carga datos de un ensayo triaxial desde un archivo Excel, CSV o Parquet.
+
         Args:
-            file_path (str): Ruta al archivo Excel.
-        
+            file_path (str): Ruta al archivo.
+            cache_dir (str, optional): Directorio de caché binaria. Si se indica, los datos
+                validados se guardan allí y las siguientes cargas del mismo archivo se
+                mapean desde disco en lugar de volver a leer el archivo.
+            cache_max_bytes (int): Tamaño máximo de la caché.
+
         Returns:
             dict: Diccionario con DataFrames agrupados por presión de confinamiento.
-        
+
+        Raises:
+            FileNotFoundError: Si el archivo no existe.
+            ValueError: Si faltan columnas o hay datos inválidos.
+        """
+        if cache_dir is None:
+            return DataLoader._parse_file(file_path)
+
+        arrays = DataLoader.load_arrays(file_path, cache_dir, cache_max_bytes)
+        return {
+            cp: pd.DataFrame({col: values for col, values in group.items() if col != 'index'},
+                             index=pd.Index(group['index']))
+            for cp, group in arrays.items()
+        }
+
+    @staticmethod
+    def load_arrays(file_path, cache_dir, cache_max_bytes=DataCache.DEFAULT_MAX_BYTES):
+        """
+        Carga los datos agrupados como arrays, usando la caché binaria en disco.
+
+        Args:
+            file_path (str): Ruta al archivo Excel, CSV o Parquet.
+            cache_dir (str): Directorio de caché.
+            cache_max_bytes (int): Tamaño máximo de la caché.
+
+        Returns:
+            dict: {presión de confinamiento: {'index': array, columna: array, ...}}. En una
+            carga en caliente los arrays son vistas de solo lectura mapeadas en memoria.
+
         Raises:
             FileNotFoundError: Si el archivo no existe.
             ValueError: Si faltan columnas o hay datos inválidos.
         """
+        if not Path(file_path).exists():
+            raise FileNotFoundError(f"Archivo {file_path} no encontrado.")
+
+        cache = DataCache(cache_dir, max_bytes=cache_max_bytes, version=DataLoader.CACHE_VERSION)
+        key = cache.key(file_path)
+        arrays = cache.load(key)
+        if arrays is not None:
+            return arrays
+
+        grouped = DataLoader._parse_file(file_path)
+        if cache.store(key, grouped):
+            arrays = cache.load(key)
+            if arrays is not None:
+                return arrays
+
+        # Columnas no numéricas (no se pueden mapear) o entrada eliminada por otro proceso
+        # antes de abrirla: se devuelven en memoria
+        return {
+            cp: {'index': df.index.to_numpy(), **{col: df[col].to_numpy() for col in df.columns}}
+            for cp, df in grouped.items()
+        }
+
+    @staticmethod
+    def load_test_set(file_path, cache_dir=None, dtype=None, cache_max_bytes=DataCache.DEFAULT_MAX_BYTES):
+        """
+        Carga los ensayos como un `TestSet` (buffers contiguos por columna e índice de
+        límites por ensayo) en lugar de un DataFrame por presión de confinamiento.
+
+        Args:
+            file_path (str): Ruta al archivo Excel, CSV o Parquet.
+            cache_dir (str, optional): Directorio de caché binaria. En una carga en caliente
+                los buffers son los arrays mapeados de la caché, sin copias.
+            dtype (optional): Tipo de los buffers (p. ej. np.float32); implica una copia.
+            cache_max_bytes (int): Tamaño máximo de la caché.
+
+        Returns:
+            TestSet: Columnas 'strain', 'stress', 'volumetric_strain' (y las demás
+            numéricas) y el metadato 'confining_pressure'.
+
+        Raises:
+            FileNotFoundError: Si el archivo no existe.
+            ValueError: Si faltan columnas o hay datos inválidos.
+        """
+        if cache_dir is None:
+            return TestSet.from_groups(DataLoader._parse_file(file_path), dtype=dtype)
+        if not Path(file_path).exists():
+            raise FileNotFoundError(f"Archivo {file_path} no encontrado.")
+
+        cache = DataCache(cache_dir, max_bytes=cache_max_bytes, version=DataLoader.CACHE_VERSION)
+        key = cache.key(file_path)
+        entry = cache.load_columns(key)
+        if entry is None:
+            grouped = DataLoader._parse_file(file_path)
+            if cache.store(key, grouped):
+                entry = cache.load_columns(key)
+            if entry is None:
+                return TestSet.from_groups(grouped, dtype=dtype)
+
+        # La presión de confinamiento es constante por ensayo: va a los metadatos
+        columns = {name: values for name, values in entry['columns'].items() if name != 'confining_pressure'}
+        test_set = TestSet(columns, entry['offsets'], meta={'confining_pressure': entry['keys']})
+        return test_set if dtype is None else test_set.astype(dtype)
+
+    @staticmethod
+    def from_frame(df):
+        """
+        Valida un DataFrame con todos los ensayos y lo agrupa por presión de confinamiento.
+
+        Args:
+            df (pandas.DataFrame): Ensayos con las columnas de `REQUIRED_COLUMNS`.
+
+        Returns:
+            dict: Diccionario con DataFrames agrupados por presión de confinamiento, como
+            el de `load_data`.
+
+        Raises:
+            ValueError: Si faltan columnas o hay datos inválidos.
+        """
+        DataLoader._validate(df)
+        return {name: group for name, group in df.groupby('confining_pressure')}
+
+    @staticmethod
+    def _parse_excel(file_path):
+        """Lee, valida y agrupa un archivo Excel (sin caché)."""
         try:
-            df = pd.read_excel(file_path)
-            # Modificar las columnas requeridas para incluir deformación volumétrica
-            required_cols = {'strain', 'stress', 'confining_pressure', 'volumetric_strain'}
-            
-            # Verificar columnas requeridas
-            if not all(col in df.columns for col in required_cols):
-                missing = [col for col in required_cols if col not in df.columns]
-                raise ValueError(f"Columnas faltantes: {missing}")
-            
-            # Verificar datos faltantes
-            if df[list(required_cols)].isnull().any().any():
-                raise ValueError("Datos con valores faltantes.")
-            
-            # Agrupar por presión de confinamiento
-            grouped = {name: group for name, group in df.groupby('confining_pressure')}
-            return grouped
+            return DataLoader.from_frame(pd.read_excel(file_path))
         except FileNotFoundError:
-            raise FileNotFoundError(f"Archivo {file_path} no encontrado.")
\ No newline at end of file
+            raise FileNotFoundError(f"Archivo {file_path} no encontrado.")
+
+    @staticmethod
+    def _parse_file(file_path, chunksize=100_000):
+        """
+        Lee, valida y agrupa un archivo según su extensión (sin caché). Los CSV y Parquet
+        se leen por bloques y cada bloque se valida al leerlo.
+        """
+        suffix = Path(file_path).suffix.lower()
+        if suffix not in DataLoader.CHUNKED_SUFFIXES:
+            return DataLoader._parse_excel(file_path)
+        if not Path(file_path).exists():
+            raise FileNotFoundError(f"Archivo {file_path} no encontrado.")
+        chunks = []
+        for chunk in DataLoader._read_chunks(file_path, chunksize):
+            DataLoader._validate(chunk)
+            chunks.append(chunk)
+        df = pd.concat(chunks) if len(chunks) > 1 else chunks[0]
+        return {name: group for name, group in df.groupby('confining_pressure')}
+
+    @staticmethod
+    def list_sources(sources):
+        """
+        Expande una lista de archivos y directorios en los archivos de datos a cargar.
+
+        De cada directorio se toman, ordenados por nombre, los archivos con extensión
+        soportada (sin subdirectorios ni archivos temporales de Excel '~$...').
+
+        Args:
+            sources (list): Rutas de archivos o directorios.
+
+        Returns:
+            list: Rutas (`Path`) de los archivos, sin repetir.
+
+        Raises:
+            FileNotFoundError: Si alguna ruta no existe.
+        """
+        suffixes = DataLoader.EXCEL_SUFFIXES + DataLoader.CHUNKED_SUFFIXES
+        files = []
+        for source in sources:
+            source = Path(source)
+            if source.is_dir():
+                files.extend(sorted(path for path in source.iterdir()
+                                    if path.is_file() and path.suffix.lower() in suffixes
+                                    and not path.name.startswith(('~$', '.'))))
+            elif source.exists():
+                files.append(source)
+            else:
+                raise FileNotFoundError(f"Archivo {source} no encontrado.")
+        return list(dict.fromkeys(files))
+
+    @staticmethod
+    def _ingest(file_path, cache_dir, cache_max_bytes, chunksize):
+        """Carga un archivo de `load_sources` y describe su procedencia."""
+        start = time.perf_counter()
+        try:
+            if cache_dir is None:
+                data = DataLoader._parse_file(file_path, chunksize)
+            else:
+                data = DataLoader.load_data(file_path, cache_dir=cache_dir, cache_max_bytes=cache_max_bytes)
+        except ValueError as e:
+            raise ValueError(f"{file_path}: {e}") from e
+        record = {
+            'source': str(file_path),
+            'format': Path(file_path).suffix.lower().lstrip('.'),
+            'sha256': ResultsStore.file_hash(file_path),
+            'bytes': Path(file_path).stat().st_size,
+            'seconds': time.perf_counter() - start,
+        }
+        return data, record
+
+    @staticmethod
+    def load_sources(sources, workers=None, cache_dir=None, cache_max_bytes=DataCache.DEFAULT_MAX_BYTES,
+                     chunksize=100_000):
+        """
+        Carga los ensayos de muchos archivos (Excel, CSV y Parquet mezclados) en paralelo
+        y los reúne en un único conjunto agrupado por presión de confinamiento.
+
+        Los CSV y Parquet se leen en un pool de hilos acotado: pandas y pyarrow liberan
+        el GIL durante la lectura, de modo que la lectura de disco y la descompresión de
+        unos archivos se solapan con el análisis de otros. El análisis de Excel con
+        openpyxl es Python puro y retiene el GIL, por lo que con dos o más libros Excel
+        estos se leen en un pool de procesos (uno por libro, hasta `os.cpu_count()`).
+        El tiempo total queda dominado por el archivo más lento.
+
+        Args:
+            sources (list): Archivos o directorios (ver `list_sources`).
+            workers (int, optional): Máximo de hilos y de procesos de lectura (default:
+                uno por archivo, hasta `os.cpu_count() + 4` hilos y `os.cpu_count()`
+                procesos).
+            cache_dir (str, optional): Caché binaria de `load_data`.
+            cache_max_bytes (int): Tamaño máximo de la caché.
+            chunksize (int): Filas por bloque al leer CSV y Parquet sin caché.
+
+        Returns:
+            tuple: (dict {presión de confinamiento: DataFrame} como el de `load_data`,
+            DataFrame de procedencia con una fila por ensayo: 'confining_pressure',
+            'source', 'format', 'rows', 'sha256', 'bytes' y 'seconds' de lectura del
+            archivo)
+
+        Raises:
+            FileNotFoundError: Si algún archivo no existe.
+            ValueError: Si no hay archivos, si un archivo tiene columnas faltantes o datos
+                inválidos, o si la misma presión de confinamiento aparece en dos archivos.
+        """
+        files = DataLoader.list_sources(sources)
+        if not files:
+            raise ValueError("No se encontraron archivos de datos en las rutas indicadas.")
+        cpus = os.cpu_count() or 1
+        excel = [path for path in files if path.suffix.lower() in DataLoader.EXCEL_SUFFIXES]
+        threaded = [path for path in files if path not in excel]
+        processes = min(len(excel), cpus, workers or cpus)
+        ingest = partial(DataLoader._ingest, cache_dir=cache_dir, cache_max_bytes=cache_max_bytes,
+                         chunksize=chunksize)
+
+        loaded = {}
+        with ExitStack() as stack:
+            futures = {}
+            if processes >= 2:
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context('forkserver') if 'forkserver' in methods else None
+                pool = stack.enter_context(ProcessPoolExecutor(max_workers=processes, mp_context=context))
+                futures.update((path, pool.submit(ingest, path)) for path in excel)
+            if threaded:
+                threads = min(len(threaded), workers or cpus + 4)
+                pool = stack.enter_context(ThreadPoolExecutor(max_workers=threads))
+                futures.update((path, pool.submit(ingest, path)) for path in threaded)
+            if processes < 2:
+                # Un solo libro o un solo procesador: los libros se leen en este hilo, uno
+                # tras otro, en lugar de competir por el GIL desde varios hilos
+                loaded.update((path, ingest(path)) for path in excel)
+            loaded.update((path, future.result()) for path, future in futures.items())
+        loaded = [loaded[path] for path in files]
+
+        data = {}
+        provenance = []
+        origin = {}
+        for groups, record in loaded:
+            for cp, df in groups.items():
+                if cp in data:
+                    raise ValueError(f"La presión de confinamiento {cp} aparece en {origin[cp]} "
+                                     f"y en {record['source']}.")
+                data[cp] = df
+                origin[cp] = record['source']
+                provenance.append({'confining_pressure': cp, **record, 'rows': len(df)})
+
+        provenance = pd.DataFrame(provenance, columns=['confining_pressure', 'source', 'format', 'rows',
+                                                       'sha256', 'bytes', 'seconds'])
+        provenance = provenance.sort_values('confining_pressure', ignore_index=True)
+        return dict(sorted(data.items())), provenance
+
+    @staticmethod
+    def _read_chunks(file_path, chunksize):
+        """Lee un archivo CSV o Parquet en bloques de como máximo `chunksize` filas."""
+        suffix = Path(file_path).suffix.lower()
+        if suffix in ('.csv', '.txt'):
+            yield from pd.read_csv(file_path, chunksize=chunksize)
+        elif suffix in ('.parquet', '.pq'):
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError("Se requiere 'pyarrow' para leer archivos Parquet por bloques.")
+            offset = 0
+            for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunksize):
+                chunk = batch.to_pandas()
+                # Índice continuo entre bloques, como en pd.read_csv
+                chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+                offset += len(chunk)
+                yield chunk
+        else:
+            raise ValueError(f"Formato no soportado para lectura por bloques: '{suffix}' (use CSV o Parquet)")
+
+    @staticmethod
+    def iter_series(file_path, chunksize=100_000):
+        """
+        Lee un archivo de data-logger por bloques y entrega cada serie en cuanto se completa.
+
+        Cada bloque se valida al leerlo y se divide en tramos de presión de confinamiento
+        constante. Una serie se considera completa cuando aparece una presión distinta
+        (o termina el archivo), por lo que en memoria solo se mantienen la serie en curso
+        y el bloque actual.
+
+        Args:
+            file_path (str): Ruta al archivo CSV o Parquet.
+            chunksize (int): Número de filas por bloque.
+
+        Yields:
+            tuple: (presión de confinamiento, DataFrame de la serie), con el mismo formato
+            que los elementos de `load_data`; `dict(DataLoader.iter_series(path))` puede
+            usarse directamente en la calibración.
+
+        Raises:
+            FileNotFoundError: Si el archivo no existe.
+            ValueError: Si faltan columnas, hay datos inválidos o una presión de
+                confinamiento reaparece después de haberse cerrado su serie.
+        """
+        if chunksize < 1:
+            raise ValueError("El parámetro 'chunksize' debe ser un entero positivo")
+        if not Path(file_path).exists():
+            raise FileNotFoundError(f"Archivo {file_path} no encontrado.")
+
+        current_cp = None
+        pieces = []
+        completed = set()
+
+        for chunk in DataLoader._read_chunks(file_path, chunksize):
+            DataLoader._validate(chunk)
+            if chunk.empty:
+                continue
+
+            # Límites de los tramos con presión de confinamiento constante
+            cp_values = chunk['confining_pressure'].to_numpy()
+            bounds = np.flatnonzero(cp_values[1:] != cp_values[:-1]) + 1
+            starts = np.r_[0, bounds]
+            ends = np.r_[bounds, len(chunk)]
+
+            for start, end in zip(starts, ends):
+                cp = cp_values[start]
+                if cp != current_cp:
+                    if pieces:
+                        completed.add(current_cp)
+                        yield current_cp, pd.concat(pieces)
+                    if cp in completed:
+                        raise ValueError(
+                            f"La presión de confinamiento {cp} reaparece después de cerrarse su serie; "
+                            "los datos deben estar agrupados por ensayo.")
+                    current_cp = cp
+                    pieces = []
+                pieces.append(chunk.iloc[start:end])
+
+        if pieces:
+            yield current_cp, pd.concat(pieces)
@@ -0,0 +1,45 @@
+import numpy as np
+
+# Reducción de curvas densas para dibujarlas, sin dependencias de gráficas: la usan
+# `Visualizer` (matplotlib) y `ReportGenerator` (reportlab)
+
+
+def lttb_indices(x, y, max_points):
+    """
+    Índices de los puntos elegidos por Largest-Triangle-Three-Buckets.
+
+    Conserva el primer y el último punto y, en cada uno de los `max_points - 2`
+    grupos intermedios, el punto que forma el triángulo de mayor área con el punto
+    elegido en el grupo anterior y el promedio del grupo siguiente, de modo que se
+    mantienen el pico y los cambios de pendiente de la curva.
+    """
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    indices = np.empty(max_points, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < edges.size:
+            next_x, next_y = x[hi:edges[i + 2]].mean(), y[hi:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs((x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a]))
+        a = lo + int(np.argmax(area))
+        indices[i + 1] = a
+    return indices
+
+
+def downsample(x, y, max_points=500):
+    """
+    Reduce una curva densa a `max_points` puntos conservando su forma (LTTB).
+
+    Retorna:
+    - x, y: Arrays con los puntos conservados, en el orden original
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    keep = lttb_indices(x, y, max_points)
+    return x[keep], y[keep]
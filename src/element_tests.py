@@ -0,0 +1,413 @@
+import numpy as np
+
+
+def _illinois(fun, a, b, fa, fb, tol=1e-10, maxiter=60):
+    """
+    Raíz vectorizada de `fun` en [a, b] por el método de Illinois (regula falsi modificada).
+
+    Cada elemento se resuelve de forma independiente (se requiere fa > 0 > fb) y solo
+    se sigue evaluando `fun(x, j)` sobre los índices `j` que aún no convergen.
+    """
+    x = a.copy()
+    todo = np.arange(a.size)
+    for _ in range(maxiter):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            xt = np.where(fb != fa, b - fb * (b - a) / (fb - fa), 0.5 * (a + b))
+        fx = fun(xt, todo)
+        x[todo] = xt
+
+        keep = np.abs(fx) > tol
+        if not np.any(keep):
+            break
+        same_side = np.sign(fx) == np.sign(fb)
+        a, fa = np.where(same_side, a, b)[keep], np.where(same_side, 0.5 * fa, fb)[keep]
+        b, fb = xt[keep], fx[keep]
+        todo = todo[keep]
+    return x
+
+
+class HardeningSoilIntegrator:
+    """
+    Integración del modelo Hardening Soil en un punto de tensión para ensayos de elemento.
+
+    Trabaja en el espacio triaxial axisimétrico (σ1, σ3 = σ2) con variables p, q
+    (compresión positiva) y se vectoriza sobre N puntos materiales independientes,
+    cada uno con su propio juego de parámetros. Incluye:
+    - Elasticidad no lineal en descarga-recarga con Eur(σ3) y ν_ur
+    - Endurecimiento por corte (superficie hiperbólica con E50, qa = qf/Rf y γp)
+      con dilatancia movilizada de Rowe a partir de ψ
+    - Falla de Mohr-Coulomb (c, φ) perfectamente plástica
+    - Endurecimiento volumétrico por cap elíptico (α a partir de K0_nc, β a partir de Eoed_ref)
+
+    Cada incremento se integra con predictor elástico y retorno implícito sobre la
+    superficie de corte y luego sobre el cap (corrección secuencial). La rigidez
+    dependiente de la tensión y ψm se evalúan al inicio del incremento.
+    """
+
+    def __init__(self, E50_ref, c, phi, m, Rf, psi=0.0, Eur_ref=None, Eoed_ref=None,
+                 v_ur=0.2, p_ref=100, K0_nc=None, cap=True):
+        """
+        Parámetros (escalares o arrays de longitud N):
+        - E50_ref, Eur_ref, Eoed_ref: Módulos de referencia [kPa] (por defecto
+          Eur_ref = 3·E50_ref y Eoed_ref = E50_ref, como en `HardeningSoilParameters`)
+        - c: Cohesión [kPa]
+        - phi, psi: Ángulos de fricción y dilatancia [grados]
+        - m: Exponente de la ley potencial
+        - Rf: Ratio de falla
+        - v_ur: Coeficiente de Poisson en descarga-recarga
+        - p_ref: Presión de referencia [kPa]
+        - K0_nc: Coeficiente de empuje en reposo (por defecto 1 - sin φ)
+        - cap: Si es False se desactiva el endurecimiento volumétrico
+        """
+        if Eur_ref is None:
+            Eur_ref = 3 * np.asarray(E50_ref, dtype=float)
+        if Eoed_ref is None:
+            Eoed_ref = E50_ref
+        if K0_nc is None:
+            K0_nc = 1 - np.sin(np.radians(phi))
+
+        (self.E50_ref, self.Eur_ref, self.Eoed_ref, self.c, self.phi, self.psi, self.m,
+         self.Rf, self.v_ur, self.p_ref, self.K0_nc) = (
+            np.atleast_1d(value).astype(float) for value in np.broadcast_arrays(
+                E50_ref, Eur_ref, Eoed_ref, c, phi, psi, m, Rf, v_ur, p_ref, K0_nc))
+        self.size = self.E50_ref.size
+        self.cap = cap
+
+        # Constantes derivadas (una sola vez por punto material)
+        phi_rad = np.radians(self.phi)
+        self.sin_phi = np.sin(phi_rad)
+        self.c_cos_phi = self.c * np.cos(phi_rad)
+        self.c_cot_phi = self.c_cos_phi / self.sin_phi
+        self.mc_slope = 2 * self.sin_phi / (1 - self.sin_phi)
+        sin_psi = np.sin(np.radians(self.psi))
+        self.sin_psi = sin_psi
+        self.sin_phi_cv = (self.sin_phi - sin_psi) / (1 - self.sin_phi * sin_psi)
+        self.reference = self.c_cos_phi + self.p_ref * self.sin_phi
+
+        # Parámetros internos del cap
+        self.m_cap = np.minimum(self.m, 0.999)
+        eta_K0 = 3 * (1 - self.K0_nc) / (1 + 2 * self.K0_nc)
+        self.alpha = np.sqrt(np.maximum(1.5 * eta_K0, 1e-6))
+        self.beta = self._calibrate_beta(eta_K0)
+
+    @classmethod
+    def from_parameters(cls, parameters, cap=True):
+        """
+        Construye el integrador a partir de un dict de parámetros calibrados
+        (el de `CalibrationPipeline.calibrate` o el de `BatchCalibrator.calibrate`).
+        """
+        return cls(
+            E50_ref=parameters['E50ref'],
+            Eur_ref=parameters.get('Eur_ref'),
+            Eoed_ref=parameters.get('Eoed_ref'),
+            c=parameters['c'],
+            phi=parameters['phi'],
+            psi=parameters.get('psi', 0.0),
+            m=parameters['m'],
+            Rf=parameters['Rf'],
+            v_ur=parameters.get('v_ur', 0.2),
+            p_ref=parameters.get('p_ref', 100),
+            K0_nc=parameters.get('K0_nc'),
+            cap=cap,
+        )
+
+    def _for_points(self, values):
+        """
+        Integrador para tantos puntos como valores iniciales: un único juego de
+        parámetros se replica para varias presiones de confinamiento.
+        """
+        n = np.size(values)
+        if self.size != 1 or n == 1:
+            return self
+        return HardeningSoilIntegrator(
+            E50_ref=np.repeat(self.E50_ref, n), c=self.c, phi=self.phi, m=self.m, Rf=self.Rf,
+            psi=self.psi, Eur_ref=self.Eur_ref, Eoed_ref=self.Eoed_ref, v_ur=self.v_ur,
+            p_ref=self.p_ref, K0_nc=self.K0_nc, cap=self.cap)
+
+    # Leyes del material
+
+    def _stress_factor(self, sigma):
+        """Factor [(c·cosφ + σ·sinφ) / (c·cosφ + p_ref·sinφ)]^m con un mínimo para σ → 0."""
+        ratio = (self.c_cos_phi + sigma * self.sin_phi) / self.reference
+        return np.maximum(ratio, 1e-3) ** self.m
+
+    def _elastic_moduli(self, sigma_3):
+        Eur = self.Eur_ref * self._stress_factor(sigma_3)
+        K = Eur / (3 * (1 - 2 * self.v_ur))
+        G = Eur / (2 * (1 + self.v_ur))
+        return Eur, K, G
+
+    def _qf(self, sigma_3):
+        return self.mc_slope * (sigma_3 + self.c_cot_phi)
+
+    def _sin_psi_mobilized(self, sigma_1, sigma_3):
+        """Dilatancia movilizada de Rowe (nula mientras φm < φcv)."""
+        sin_phi_m = np.clip((sigma_1 - sigma_3) / (sigma_1 + sigma_3 + 2 * self.c_cot_phi), 0, self.sin_phi)
+        sin_psi_m = (sin_phi_m - self.sin_phi_cv) / (1 - sin_phi_m * self.sin_phi_cv)
+        return np.maximum(sin_psi_m, 0.0)
+
+    def _cap_pressure(self, eps_vpc, i=slice(None)):
+        """Presión de preconsolidación pp a partir de la deformación volumétrica plástica del cap."""
+        ratio = (1 - self.m_cap[i]) * np.maximum(eps_vpc, 0.0) / self.beta[i]
+        return self.p_ref[i] * ratio ** (1 / (1 - self.m_cap[i]))
+
+    def _cap_strain(self, pp):
+        return self.beta / (1 - self.m_cap) * (pp / self.p_ref) ** (1 - self.m_cap)
+
+    def _calibrate_beta(self, eta_K0):
+        """
+        β tal que la rigidez edométrica tangente en σ1 = p_ref sea Eoed_ref
+        (aproximación: deformación plástica del cap más deformación elástica).
+        """
+        _, K, G = self._elastic_moduli(self.K0_nc * self.p_ref)
+        Eoed_el = K + 4 * G / 3
+        k = (1 + 2 * self.K0_nc) / 3 * np.sqrt(1 + eta_K0 ** 2 / self.alpha ** 2)
+        compliance = np.maximum(1 / self.Eoed_ref - 1 / Eoed_el, 1e-3 / self.Eoed_ref)
+        return compliance * self.p_ref * k ** (self.m_cap - 1)
+
+    # Estados iniciales
+
+    def isotropic_state(self, sigma_3):
+        """Estado inicial isótropo normalmente consolidado (σ1 = σ3, pp = p)."""
+        sigma_3 = np.broadcast_to(np.asarray(sigma_3, dtype=float), (self.size,)).copy()
+        return self._state(sigma_3.copy(), sigma_3, sigma_3)
+
+    def K0_state(self, sigma_1):
+        """Estado inicial normalmente consolidado en condición K0 (σ3 = K0_nc·σ1)."""
+        sigma_1 = np.broadcast_to(np.asarray(sigma_1, dtype=float), (self.size,)).copy()
+        sigma_3 = self.K0_nc * sigma_1
+        p = (sigma_1 + 2 * sigma_3) / 3
+        q = sigma_1 - sigma_3
+        return self._state(sigma_1, sigma_3, np.sqrt(p ** 2 + (q / self.alpha) ** 2))
+
+    def _initial_gamma_p(self, sigma_1, sigma_3):
+        """
+        γp del estado inicial sobre la superficie de corte (f = 0): un estado con q > 0
+        (p. ej. K0) es normalmente consolidado también en corte.
+        """
+        q = sigma_1 - sigma_3
+        Eur, _, _ = self._elastic_moduli(sigma_3)
+        E50 = self.E50_ref * self._stress_factor(sigma_3)
+        qa = self._qf(sigma_3) / self.Rf
+        with np.errstate(invalid='ignore', divide='ignore'):
+            gamma_p = qa / E50 * q / (qa - q) - 2 * q / Eur
+        return np.where((q > 0) & (q < qa), np.maximum(gamma_p, 0.0), 0.0)
+
+    def _state(self, sigma_1, sigma_3, pp):
+        zeros = np.zeros(self.size)
+        return {
+            'sigma_1': sigma_1,
+            'sigma_3': sigma_3,
+            'eps_1': zeros.copy(),
+            'eps_3': zeros.copy(),
+            'gamma_p': self._initial_gamma_p(sigma_1, sigma_3),
+            'eps_vpc': self._cap_strain(pp),
+            'p_p': pp,
+        }
+
+    # Integración de un incremento
+
+    def update(self, state, d_eps_1, d_eps_3):
+        """
+        Integra un incremento de deformación (Δε1, Δε3) para todos los puntos.
+
+        Retorna:
+        - dict con el nuevo estado (el estado de entrada no se modifica)
+        """
+        sigma_1, sigma_3 = state['sigma_1'], state['sigma_3']
+        p0 = (sigma_1 + 2 * sigma_3) / 3
+        q0 = sigma_1 - sigma_3
+
+        Eur, K, G = self._elastic_moduli(sigma_3)
+        d_eps_v = d_eps_1 + 2 * d_eps_3
+        d_eps_s = 2 / 3 * (d_eps_1 - d_eps_3)
+
+        # Predictor elástico
+        p = p0 + K * d_eps_v
+        q = q0 + 3 * G * d_eps_s
+        gamma_p = state['gamma_p'].copy()
+        eps_vpc = state['eps_vpc'].copy()
+        pp = state['p_p'].copy()
+
+        # Endurecimiento por corte. Con E50, Eur, qa y ψm fijos en el incremento, la
+        # condición f = (qa/E50)·q/(qa - q) - 2q/Eur - γp = 0 con γp = γp0 + (q_tr - q)/A
+        # multiplicada por (qa - q) es una cuadrática en q con una única raíz en (0, qa).
+        E50 = self.E50_ref * self._stress_factor(sigma_3)
+        qa = self._qf(sigma_3) / self.Rf
+        sin_psi_m = self._sin_psi_mobilized(sigma_1, sigma_3)
+        # Flujo de Rowe con compresión positiva: Δεv_p = -sinψm·Δγp (ψm > 0 dilata) y
+        # Δq = -3G·Δεs_p = -1.5·G·(1 - sinψm/3)·Δγp
+        A = 1.5 * G * (1 - sin_psi_m / 3)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            f_trial = qa / E50 * q / (qa - q) - 2 * q / Eur - gamma_p
+        active = (q > 0) & ((q >= qa) | (f_trial > 0))
+        if np.any(active):
+            i = np.flatnonzero(active)
+            q_tr, p_tr, g0 = q[i], p[i], gamma_p[i]
+            B = 2 / Eur[i] - 1 / A[i]
+            C = g0 + q_tr / A[i]
+            b = qa[i] / E50[i] - qa[i] * B + C
+            c0 = -qa[i] * C
+            q_new = 2 * c0 / (-b - np.sqrt(b ** 2 - 4 * B * c0))
+            d_gamma = (q_tr - q_new) / A[i]
+            q[i] = q_new
+            p[i] = p_tr + K[i] * sin_psi_m[i] * d_gamma
+            gamma_p[i] = g0 + d_gamma
+
+        # Falla de Mohr-Coulomb: retorno cerrado desde el predictor elástico con la misma
+        # dirección de flujo que el retorno por corte, para que ambos coincidan en q = qf
+        p_tr = p0 + K * d_eps_v
+        q_tr = q0 + 3 * G * d_eps_s
+        failure = (q - self._qf(p - q / 3)) > 1e-9 * self.p_ref
+        if np.any(failure):
+            i = np.flatnonzero(failure)
+            a = self.mc_slope[i]
+            g_tr = q_tr[i] * (1 + a / 3) - a * p_tr[i] - a * self.c_cot_phi[i]
+            d_lambda = g_tr / (A[i] * (1 + a / 3) + a * K[i] * sin_psi_m[i])
+            q[i] = q_tr[i] - A[i] * d_lambda
+            p[i] = p_tr[i] + K[i] * sin_psi_m[i] * d_lambda
+            gamma_p[i] = state['gamma_p'][i] + d_lambda
+
+        # Endurecimiento volumétrico (cap elíptico con flujo asociado)
+        if self.cap:
+            cap_f = (q / self.alpha) ** 2 + p ** 2 - pp ** 2
+            active = np.flatnonzero((cap_f > 1e-12 * pp ** 2) & (p > 0))
+            if active.size:
+                i = active
+                p_tr, q_tr, e0 = p[i], q[i], eps_vpc[i]
+                a2 = self.alpha[i] ** 2
+
+                def cap_residual(x, j):
+                    k = i[j]
+                    p_new = p_tr[j] / (1 + 2 * K[k] * x)
+                    q_new = q_tr[j] / (1 + 6 * G[k] * x / a2[j])
+                    pp_new = self._cap_pressure(e0[j] + 2 * p_new * x, k)
+                    return ((q_new ** 2 / a2[j] + p_new ** 2) - pp_new ** 2) / p_tr[j] ** 2
+
+                j = np.arange(i.size)
+                lo = np.zeros(i.size)
+                hi = 1e3 / K[i]
+                d_lambda = _illinois(cap_residual, lo, hi, cap_residual(lo, j), cap_residual(hi, j))
+                p[i] = p_tr / (1 + 2 * K[i] * d_lambda)
+                q[i] = q_tr / (1 + 6 * G[i] * d_lambda / a2)
+                eps_vpc[i] = e0 + 2 * p[i] * d_lambda
+                pp[i] = self._cap_pressure(eps_vpc[i], i)
+
+        return {
+            'sigma_1': p + 2 * q / 3,
+            'sigma_3': p - q / 3,
+            'eps_1': state['eps_1'] + d_eps_1,
+            'eps_3': state['eps_3'] + d_eps_3,
+            'gamma_p': gamma_p,
+            'eps_vpc': eps_vpc,
+            'p_p': pp,
+        }
+
+    # Trayectorias de ensayo
+
+    def _strain_increments(self, eps_1_path, substeps):
+        """Incrementos de ε1 (pasos × N) desde ε1 = 0."""
+        path = np.asarray(eps_1_path, dtype=float)
+        if path.ndim == 1:
+            path = path[:, np.newaxis]
+        path = np.broadcast_to(path, (path.shape[0], self.size))
+        if np.any(path[0] != 0):
+            path = np.vstack([np.zeros((1, self.size)), path])
+        return np.diff(path, axis=0) / substeps
+
+    def _simulate(self, state, eps_1_path, lateral, substeps, sigma_3_target=None):
+        increments = self._strain_increments(eps_1_path, substeps)
+        history = [state]
+        for d_eps_1 in increments:
+            for _ in range(substeps):
+                if lateral == 'drained':
+                    state = self._drained_increment(state, d_eps_1, sigma_3_target)
+                else:
+                    state = self.update(state, d_eps_1, lateral(d_eps_1))
+            history.append(state)
+
+        results = {key: np.stack([s[key] for s in history]) for key in history[0]}
+        results['p'] = (results['sigma_1'] + 2 * results['sigma_3']) / 3
+        results['q'] = results['sigma_1'] - results['sigma_3']
+        results['eps_v'] = results['eps_1'] + 2 * results['eps_3']
+        return results
+
+    def _drained_increment(self, state, d_eps_1, sigma_3_target, tol=1e-8, maxiter=40):
+        """
+        Incremento con σ3 constante: secante sobre Δε3 protegida por bisección
+        (σ3 crece con Δε3, así que cada residuo acota la raíz por un lado).
+        """
+        _, K, G = self._elastic_moduli(state['sigma_3'])
+        # Primera estimación y pendiente dσ3/dε3 elásticas
+        d_eps_3 = -(3 * K - 2 * G) / (2 * (3 * K + G)) * d_eps_1
+        slope = 2 * K + 2 * G / 3
+        lower = np.full(self.size, -np.inf)
+        upper = np.full(self.size, np.inf)
+
+        new = self.update(state, d_eps_1, d_eps_3)
+        residual = new['sigma_3'] - sigma_3_target
+        for _ in range(maxiter):
+            converged = np.abs(residual) <= tol * self.p_ref
+            if np.all(converged):
+                break
+            lower = np.where(residual < 0, d_eps_3, lower)
+            upper = np.where(residual > 0, d_eps_3, upper)
+
+            candidate = d_eps_3 - residual / slope
+            bracketed = np.isfinite(lower) & np.isfinite(upper)
+            outside = (candidate <= lower) | (candidate >= upper)
+            candidate = np.where(bracketed & outside, 0.5 * (lower + upper), candidate)
+            candidate = np.where(converged, d_eps_3, candidate)
+
+            new = self.update(state, d_eps_1, candidate)
+            new_residual = new['sigma_3'] - sigma_3_target
+            with np.errstate(invalid='ignore', divide='ignore'):
+                secant = (new_residual - residual) / (candidate - d_eps_3)
+            slope = np.where(np.isfinite(secant) & (secant > 0), secant, slope)
+            d_eps_3, residual = candidate, new_residual
+        return new
+
+    def drained_triaxial(self, sigma_3, eps_1_path, substeps=1):
+        """
+        Ensayo triaxial drenado (σ3 constante) desde un estado isótropo.
+
+        Parámetros:
+        - sigma_3: Presión de confinamiento (escalar o array de N valores) [kPa]
+        - eps_1_path: Historia de deformación axial total (n pasos, o n × N). Puede
+          incluir ramas de descarga y recarga.
+        - substeps: Subincrementos por paso
+
+        Retorna:
+        - dict de arrays (pasos × N) con 'sigma_1', 'sigma_3', 'p', 'q', 'eps_1',
+          'eps_3', 'eps_v', 'gamma_p', 'eps_vpc' y 'p_p'
+        """
+        model = self._for_points(sigma_3)
+        state = model.isotropic_state(sigma_3)
+        return model._simulate(state, eps_1_path, 'drained', substeps, sigma_3_target=state['sigma_3'])
+
+    def undrained_triaxial(self, sigma_3, eps_1_path, substeps=1):
+        """
+        Ensayo triaxial no drenado (Δεv = 0) desde un estado isótropo.
+
+        Retorna lo mismo que `drained_triaxial` más 'u': exceso de presión de poros
+        con presión de cámara constante [kPa].
+        """
+        model = self._for_points(sigma_3)
+        state = model.isotropic_state(sigma_3)
+        results = model._simulate(state, eps_1_path, lambda d_eps_1: -0.5 * d_eps_1, substeps)
+        p0, q0 = results['p'][0], results['q'][0]
+        results['u'] = (results['q'] - q0) / 3 - (results['p'] - p0)
+        return results
+
+    def oedometer(self, sigma_v0, eps_1_path, substeps=1):
+        """
+        Ensayo edométrico (ε3 = 0) desde un estado K0 normalmente consolidado.
+
+        Parámetros:
+        - sigma_v0: Tensión vertical inicial [kPa]
+        - eps_1_path: Historia de deformación vertical (carga, descarga y recarga)
+        """
+        model = self._for_points(sigma_v0)
+        state = model.K0_state(sigma_v0)
+        return model._simulate(state, eps_1_path, np.zeros_like, substeps)
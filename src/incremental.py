@@ -0,0 +1,136 @@
+import numpy as np
+
+from .parameters import HardeningSoilParameters
+from .material import HardeningSoilMaterial
+
+
+class IncrementalCalibration:
+    """
+    Calibración incremental: agregar o quitar un ensayo actualiza los parámetros
+    globales sin volver a leer ni a procesar las curvas ya incorporadas.
+
+    Al agregar un ensayo se calculan una sola vez sus valores propios (pico, E50ref,
+    qa, psi). Los parámetros globales se obtienen de sumas acumuladas:
+    - phi y c: regresión lineal pico vs σ3 (n, Σx, Σy, Σx², Σxy)
+    - Rf: promedio de qf/qa, con qf lineal en σ3, a partir de Σσ3/qa y Σ1/qa
+    - E50ref y psi: promedios acumulados
+    El regresor de `calculate_m` depende de c y phi globales, así que m se recalcula
+    sobre los valores guardados de cada ensayo (σ3, E50ref), sin tocar las curvas.
+    """
+
+    def __init__(self, p_ref=100, v_ur=0.2):
+        self.p_ref = p_ref
+        self.v_ur = v_ur
+        self.tests = {}
+        self._sums = dict.fromkeys(
+            ('n', 'cp', 'peak', 'cp2', 'cp_peak', 'E50ref', 'psi', 'n_psi', 'cp_qa', 'inv_qa'), 0.0)
+
+    @classmethod
+    def from_data(cls, data, p_ref=100, v_ur=0.2):
+        """Crea el estado a partir del dict de DataFrames de `DataLoader.load_data`."""
+        state = cls(p_ref=p_ref, v_ur=v_ur)
+        for cp, df in data.items():
+            state.add_frame(cp, df)
+        return state
+
+    def add_frame(self, confining_pressure, df):
+        """Agrega un ensayo a partir de un DataFrame con las columnas de `DataLoader`."""
+        self.add_test(confining_pressure, df['strain'].values, df['stress'].values,
+                      df['volumetric_strain'].values)
+
+    def add_test(self, confining_pressure, strain, stress, volumetric_strain):
+        """
+        Agrega un ensayo y actualiza las sumas acumuladas.
+
+        Raises:
+        - ValueError: Si ya existe un ensayo con esa presión de confinamiento o si
+          `calculate_qa` no obtiene un qa válido
+        """
+        if confining_pressure in self.tests:
+            raise ValueError(f"Ya existe un ensayo con presión de confinamiento {confining_pressure}")
+
+        test = {
+            'confining_pressure': float(confining_pressure),
+            'peak': float(np.max(stress)),
+            'E50ref': float(HardeningSoilParameters.calculate_E50ref(strain, stress)),
+            'qa': float(HardeningSoilParameters.calculate_qa(strain, stress)),
+            'psi': float(HardeningSoilParameters.calculate_psi(strain, volumetric_strain)),
+        }
+        self.tests[confining_pressure] = test
+        self._accumulate(test, 1.0)
+
+    def remove_test(self, confining_pressure):
+        """Quita un ensayo y descuenta su aporte de las sumas acumuladas."""
+        try:
+            test = self.tests.pop(confining_pressure)
+        except KeyError:
+            raise KeyError(f"No existe un ensayo con presión de confinamiento {confining_pressure}")
+        self._accumulate(test, -1.0)
+
+    def _accumulate(self, test, sign):
+        cp, peak = test['confining_pressure'], test['peak']
+        sums = self._sums
+        sums['n'] += sign
+        sums['cp'] += sign * cp
+        sums['peak'] += sign * peak
+        sums['cp2'] += sign * cp * cp
+        sums['cp_peak'] += sign * cp * peak
+        sums['E50ref'] += sign * test['E50ref']
+        sums['cp_qa'] += sign * cp / test['qa']
+        sums['inv_qa'] += sign * 1 / test['qa']
+        if np.isfinite(test['psi']):
+            sums['psi'] += sign * test['psi']
+            sums['n_psi'] += sign
+
+    def strength(self):
+        """phi [grados] y c [kPa] de la regresión acumulada (como `calculate_phi_and_c`)."""
+        s = self._sums
+        if s['n'] < 2:
+            raise ValueError("Se necesitan al menos dos ensayos para calcular phi y c")
+        mean_cp = s['cp'] / s['n']
+        mean_peak = s['peak'] / s['n']
+        slope = (s['cp_peak'] - s['n'] * mean_cp * mean_peak) / (s['cp2'] - s['n'] * mean_cp ** 2)
+        intercept = mean_peak - slope * mean_cp
+        sin_phi = slope / (2 + slope)
+        phi = np.degrees(np.arcsin(sin_phi))
+        c = intercept * (1 - sin_phi) / (2 * np.cos(np.radians(phi)))
+        return phi, c
+
+    def _calibrate(self):
+        s = self._sums
+        phi, c = self.strength()
+        sin_phi = np.sin(np.radians(phi))
+        mc_slope = 2 * sin_phi / (1 - sin_phi)
+
+        confining_pressures = [test['confining_pressure'] for test in self.tests.values()]
+        E50ref_list = [test['E50ref'] for test in self.tests.values()]
+        m, E50ref_calculated = HardeningSoilParameters.calculate_m(
+            confining_pressures, E50ref_list, c, phi, p_ref=self.p_ref)
+
+        E50ref = s['E50ref'] / s['n']
+        parameters = {
+            'E50ref': E50ref,
+            'Eur_ref': 3 * E50ref,
+            'Eoed_ref': E50ref,
+            'c': c,
+            'phi': phi,
+            'psi': s['psi'] / s['n_psi'] if s['n_psi'] else np.nan,
+            'm': m,
+            'v_ur': self.v_ur,
+            'p_ref': self.p_ref,
+            'K0_nc': HardeningSoilParameters.calculate_K0_nc(phi),
+            # Rf_i = qf(σ3_i)/qa_i con qf = mc_slope·(σ3 + c·cotφ)
+            'Rf': mc_slope * (s['cp_qa'] + c / np.tan(np.radians(phi)) * s['inv_qa']) / s['n'],
+        }
+        return parameters, E50ref_calculated
+
+    @property
+    def parameters(self):
+        """Parámetros globales, con las mismas claves que `CalibrationPipeline.calibrate`."""
+        return self._calibrate()[0]
+
+    @property
+    def material(self):
+        """`HardeningSoilMaterial` con el E50_ref de la regresión de `calculate_m`."""
+        parameters, E50ref_calculated = self._calibrate()
+        return HardeningSoilMaterial.from_parameters(parameters, E50_ref=E50ref_calculated)
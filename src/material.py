@@ -0,0 +1,169 @@
+import numpy as np
+
+
+class HardeningSoilMaterial:
+    """
+    Juego de parámetros calibrados del modelo Hardening Soil, inmutable y compacto.
+
+    Las constantes derivadas (sin φ, cos φ, tan φ, c·cosφ + p_ref·sinφ, la recta de
+    Mohr-Coulomb qf(σ3)) se calculan una sola vez al construir el objeto. Dos
+    materiales con los mismos parámetros son iguales y tienen el mismo hash, por lo
+    que pueden usarse como clave de diccionarios o cachés.
+    """
+
+    PARAMETERS = ('E50_ref', 'Eur_ref', 'Eoed_ref', 'c', 'phi', 'psi', 'm', 'Rf',
+                  'v_ur', 'p_ref', 'K0_nc')
+
+    __slots__ = PARAMETERS + ('_sin_phi', '_cos_phi', '_tan_phi', '_c_cos_phi', '_reference',
+                              '_qf_slope', '_qf_intercept', '_key', '_hash')
+
+    def __init__(self, E50_ref, c, phi, m, Rf, psi=0.0, Eur_ref=None, Eoed_ref=None,
+                 v_ur=0.2, p_ref=100, K0_nc=None):
+        """
+        Parámetros:
+        - E50_ref: Módulo secante de referencia [kPa]
+        - c: Cohesión [kPa]
+        - phi: Ángulo de fricción [grados]
+        - m: Exponente de la ley potencial
+        - Rf: Ratio de falla
+        - psi: Ángulo de dilatancia [grados]
+        - Eur_ref, Eoed_ref: Módulos de referencia (por defecto 3·E50_ref y E50_ref)
+        - v_ur: Coeficiente de Poisson en descarga-recarga
+        - p_ref: Presión de referencia [kPa]
+        - K0_nc: Coeficiente de empuje en reposo (por defecto 1 - sin φ)
+
+        Raises:
+        - ValueError: Si algún parámetro obligatorio es None
+        """
+        for name, value in (('E50_ref', E50_ref), ('c', c), ('phi', phi), ('m', m), ('Rf', Rf)):
+            if value is None:
+                raise ValueError(f"El parámetro '{name}' no puede ser None")
+
+        phi_rad = np.radians(float(phi))
+        sin_phi, cos_phi = float(np.sin(phi_rad)), float(np.cos(phi_rad))
+        values = {
+            'E50_ref': float(E50_ref),
+            'Eur_ref': float(3 * E50_ref if Eur_ref is None else Eur_ref),
+            'Eoed_ref': float(E50_ref if Eoed_ref is None else Eoed_ref),
+            'c': float(c),
+            'phi': float(phi),
+            'psi': float(psi),
+            'm': float(m),
+            'Rf': float(Rf),
+            'v_ur': float(v_ur),
+            'p_ref': float(p_ref),
+            'K0_nc': float(1 - sin_phi if K0_nc is None else K0_nc),
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+        # Constantes derivadas
+        tan_phi = sin_phi / cos_phi
+        qf_slope = 2 * sin_phi / (1 - sin_phi)
+        object.__setattr__(self, '_sin_phi', sin_phi)
+        object.__setattr__(self, '_cos_phi', cos_phi)
+        object.__setattr__(self, '_tan_phi', tan_phi)
+        object.__setattr__(self, '_c_cos_phi', values['c'] * cos_phi)
+        object.__setattr__(self, '_reference', values['c'] * cos_phi + values['p_ref'] * sin_phi)
+        object.__setattr__(self, '_qf_slope', qf_slope)
+        object.__setattr__(self, '_qf_intercept', qf_slope * values['c'] / tan_phi)
+
+        key = tuple(values[name] for name in self.PARAMETERS)
+        object.__setattr__(self, '_key', key)
+        object.__setattr__(self, '_hash', hash(key))
+
+    @classmethod
+    def from_parameters(cls, parameters, E50_ref=None):
+        """
+        Construye el material a partir del dict `parameters` de la calibración.
+
+        Parámetros:
+        - parameters: dict con las claves de `CalibrationPipeline.calibrate`
+        - E50_ref: Módulo de referencia a usar en el modelo (p. ej. el E50_ref obtenido
+          por `calculate_m`); por defecto parameters['E50ref']
+        """
+        return cls(
+            E50_ref=parameters['E50ref'] if E50_ref is None else E50_ref,
+            c=parameters['c'],
+            phi=parameters['phi'],
+            m=parameters['m'],
+            Rf=parameters['Rf'],
+            psi=parameters.get('psi') or 0.0,
+            Eur_ref=parameters.get('Eur_ref'),
+            Eoed_ref=parameters.get('Eoed_ref'),
+            v_ur=parameters.get('v_ur', 0.2),
+            p_ref=parameters.get('p_ref', 100),
+            K0_nc=parameters.get('K0_nc'),
+        )
+
+    def __setattr__(self, name, value):
+        raise AttributeError("HardeningSoilMaterial es inmutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("HardeningSoilMaterial es inmutable")
+
+    def __reduce__(self):
+        return (_rebuild_material, (self._key,))
+
+    def __eq__(self, other):
+        if not isinstance(other, HardeningSoilMaterial):
+            return NotImplemented
+        return self._key == other._key
+
+    def __hash__(self):
+        return self._hash
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name):g}" for name in self.PARAMETERS)
+        return f"HardeningSoilMaterial({fields})"
+
+    @property
+    def key(self):
+        """Tupla con los parámetros primarios (identidad del material)."""
+        return self._key
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.PARAMETERS}
+
+    def stress_factor(self, sigma_3):
+        """[(c·cosφ + σ3·sinφ) / (c·cosφ + p_ref·sinφ)]^m"""
+        return ((self._c_cos_phi + np.asarray(sigma_3) * self._sin_phi) / self._reference) ** self.m
+
+    def qf(self, sigma_3):
+        """Esfuerzo desviador en la falla (Mohr-Coulomb) [kPa]."""
+        return self._qf_slope * np.asarray(sigma_3) + self._qf_intercept
+
+    def qa(self, sigma_3):
+        """Esfuerzo asintótico qa = qf / Rf [kPa]."""
+        return self.qf(sigma_3) / self.Rf
+
+    def E50(self, sigma_3):
+        """Módulo secante E50 para σ3 [kPa]."""
+        return self.E50_ref * self.stress_factor(sigma_3)
+
+    def Eur(self, sigma_3):
+        """Módulo de descarga-recarga Eur para σ3 [kPa]."""
+        return self.Eur_ref * self.stress_factor(sigma_3)
+
+    def q(self, epsilon_1, sigma_3):
+        """
+        Esfuerzo desviador de la curva hiperbólica (igual que `model_hyperbolic_curve`).
+        epsilon_1 y sigma_3 se combinan por broadcasting.
+        """
+        sigma_3 = np.asarray(sigma_3)
+        qa = self.qa(sigma_3)
+        E50 = self.E50(sigma_3)
+        epsilon_1 = np.maximum(epsilon_1, 1e-10)
+        return qa / (1 + qa / (2 * E50 * epsilon_1))
+
+    def surrogate(self, sigma_3_range, tolerance=0.01):
+        """
+        Sustituto tabulado de `q` sobre un rango de σ3 con error ≤ `tolerance` [kPa]
+        (ver `HardeningSurrogate.compile`).
+        """
+        from .surrogate import HardeningSurrogate
+        return HardeningSurrogate.compile(self, sigma_3_range, tolerance)
+
+
+def _rebuild_material(key):
+    return HardeningSoilMaterial(**dict(zip(HardeningSoilMaterial.PARAMETERS, key)))
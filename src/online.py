@@ -0,0 +1,228 @@
+import csv
+import heapq
+import time
+from collections import deque
+
+import numpy as np
+
+
+class OnlineCalibrator:
+    """
+    Calibración en línea de un ensayo triaxial en curso, muestra a muestra.
+
+    Mantiene en tiempo constante (amortizado) por muestra:
+    - El esfuerzo pico
+    - La regresión hiperbólica ε/q vs ε de `calculate_qa` (puntos hasta el pico con
+      q > 10% del pico). Al crecer el pico, los puntos que quedan bajo el nuevo umbral
+      se descuentan de las sumas con un montículo ordenado por q; cada punto entra y
+      sale a lo sumo una vez.
+    - qa = 1/pendiente y E50 = 1/(2·intercepto), según ε/q = ε/qa + 1/(2·E50) de
+      `model_hyperbolic_curve`
+    - El ángulo de dilatancia de `calculate_psi` (media de Δεv/Δε1 entre muestras
+      dilatantes consecutivas con Δε1 ≠ 0)
+
+    Con todas las muestras de un ensayo, qa y psi coinciden con `calculate_qa` y
+    `calculate_psi`.
+    """
+
+    def __init__(self, confining_pressure=None, material=None, window=50, tolerance=1e-3,
+                 min_points=20):
+        """
+        Parámetros:
+        - confining_pressure: σ3 del ensayo [kPa] (opcional, para estimar qf y Rf)
+        - material: `HardeningSoilMaterial` con c y phi del proyecto (opcional)
+        - window: Número de muestras entre las que se compara qa para la convergencia
+        - tolerance: Variación relativa de qa en `window` muestras para dar el
+          ensayo por convergido
+        - min_points: Puntos mínimos en la regresión antes de evaluar convergencia
+        """
+        self.confining_pressure = confining_pressure
+        self.material = material
+        self.tolerance = tolerance
+        self.min_points = min_points
+
+        self.n_samples = 0
+        self.peak = -np.inf
+        self.peak_strain = np.nan
+        self._sums = [0.0] * 5          # n, Σx, Σy, Σx², Σxy de los puntos aceptados
+        self._peak_sums = (0.0,) * 5    # las mismas sumas hasta el pico actual
+        self._accepted = []             # montículo de (q, x, y)
+        self._qa_history = deque(maxlen=window + 1)
+
+        self._last_dilatant = None
+        self._psi_sum = 0.0
+        self._psi_count = 0
+
+    def update(self, strain, stress, volumetric_strain):
+        """
+        Incorpora una muestra y retorna las estimaciones actualizadas.
+        """
+        strain, stress, volumetric_strain = float(strain), float(stress), float(volumetric_strain)
+        self.n_samples += 1
+
+        # Pico y regresión hiperbólica
+        if stress > self.peak:
+            self.peak = stress
+            self.peak_strain = strain
+            threshold = 0.1 * stress
+            while self._accepted and self._accepted[0][0] <= threshold:
+                _, x, y = heapq.heappop(self._accepted)
+                self._add(-1.0, x, y)
+            if stress > threshold:
+                self._accept(strain, stress)
+            self._peak_sums = tuple(self._sums)
+        elif stress > 0.1 * self.peak:
+            self._accept(strain, stress)
+
+        # Dilatancia
+        if volumetric_strain < 0:
+            if self._last_dilatant is not None:
+                last_strain, last_vol = self._last_dilatant
+                d_e1 = strain - last_strain
+                # Como en `calculate_psi`, las lecturas repetidas (Δε1 = 0) no cuentan
+                if d_e1 != 0:
+                    self._psi_sum += (volumetric_strain - last_vol) / d_e1
+                    self._psi_count += 1
+            self._last_dilatant = (strain, volumetric_strain)
+
+        self._qa_history.append(self.qa)
+        return self.estimates
+
+    def update_batch(self, strain, stress, volumetric_strain):
+        """Incorpora un bloque de muestras y retorna las estimaciones finales."""
+        for sample in zip(np.asarray(strain, dtype=float), np.asarray(stress, dtype=float),
+                          np.asarray(volumetric_strain, dtype=float)):
+            self.update(*sample)
+        return self.estimates
+
+    def _accept(self, strain, stress):
+        y = strain / stress
+        heapq.heappush(self._accepted, (stress, strain, y))
+        self._add(1.0, strain, y)
+
+    def _add(self, sign, x, y):
+        sums = self._sums
+        sums[0] += sign
+        sums[1] += sign * x
+        sums[2] += sign * y
+        sums[3] += sign * x * x
+        sums[4] += sign * x * y
+
+    def _regression(self):
+        n, sx, sy, sxx, sxy = self._peak_sums
+        if n < 2:
+            return np.nan, np.nan
+        denominator = n * sxx - sx * sx
+        if denominator <= 0:
+            return np.nan, np.nan
+        slope = (n * sxy - sx * sy) / denominator
+        return slope, (sy - slope * sx) / n
+
+    @property
+    def qa(self):
+        """Esfuerzo asintótico (NaN mientras la transformación hiperbólica no es válida)."""
+        slope, _ = self._regression()
+        if not slope > 0:
+            return np.nan
+        qa = 1.0 / slope
+        return qa if qa >= self.peak else np.nan
+
+    @property
+    def E50(self):
+        """Módulo secante E50 a partir del intercepto de la regresión hiperbólica."""
+        _, intercept = self._regression()
+        return 1.0 / (2 * intercept) if intercept > 0 else np.nan
+
+    @property
+    def psi(self):
+        """Ángulo de dilatancia [grados], como `calculate_psi`."""
+        if self._last_dilatant is None:
+            return 0.0
+        if self._psi_count == 0:
+            return np.nan
+        a = -self._psi_sum / self._psi_count
+        with np.errstate(invalid='ignore'):
+            return float(np.degrees(np.arcsin(a / (2 + a))))
+
+    @property
+    def converged(self):
+        """True cuando qa varió menos que `tolerance` en las últimas `window` muestras."""
+        if self._peak_sums[0] < self.min_points or len(self._qa_history) < self._qa_history.maxlen:
+            return False
+        first, last = self._qa_history[0], self._qa_history[-1]
+        return bool(np.isfinite(first) and np.isfinite(last)
+                    and abs(last - first) <= self.tolerance * abs(last))
+
+    @property
+    def estimates(self):
+        """dict con las estimaciones actuales."""
+        qa = self.qa
+        estimates = {
+            'n_samples': self.n_samples,
+            'peak': self.peak,
+            'peak_strain': self.peak_strain,
+            'qa': qa,
+            'E50': self.E50,
+            'psi': self.psi,
+            'converged': self.converged,
+        }
+        if self.material is not None and self.confining_pressure is not None:
+            qf = float(self.material.qf(self.confining_pressure))
+            estimates['qf'] = qf
+            estimates['Rf'] = qf / qa
+        return estimates
+
+    @staticmethod
+    def read_samples(stream, delimiter=','):
+        """
+        Lee muestras de un flujo de texto CSV con encabezado (archivo, tubería,
+        `socket.makefile()` o `tail`) con columnas 'strain', 'stress' y 'volumetric_strain'.
+
+        Yields:
+            tuple: (strain, stress, volumetric_strain)
+        """
+        for row in csv.DictReader(stream, delimiter=delimiter):
+            yield float(row['strain']), float(row['stress']), float(row['volumetric_strain'])
+
+    @staticmethod
+    def tail(file_path, poll_interval=0.5, idle_timeout=None):
+        """
+        Sigue un archivo que el data-logger va escribiendo (como `tail -f`).
+
+        Parámetros:
+        - poll_interval: Segundos entre lecturas cuando no hay datos nuevos
+        - idle_timeout: Termina tras esos segundos sin datos nuevos (None = nunca)
+
+        Yields:
+            str: Líneas completas a medida que se escriben
+        """
+        with open(file_path, encoding='utf-8') as f:
+            pending = ''
+            idle = 0.0
+            while True:
+                chunk = f.readline()
+                if chunk:
+                    idle = 0.0
+                    pending += chunk
+                    if pending.endswith('\n'):
+                        yield pending
+                        pending = ''
+                    continue
+                if idle_timeout is not None and idle >= idle_timeout:
+                    return
+                time.sleep(poll_interval)
+                idle += poll_interval
+
+    def follow(self, samples):
+        """
+        Consume muestras (p. ej. de `read_samples`) y entrega las estimaciones tras cada
+        una; se detiene en cuanto qa converge.
+
+        Yields:
+            dict: Estimaciones actuales
+        """
+        for sample in samples:
+            estimates = self.update(*sample)
+            yield estimates
+            if estimates['converged']:
+                return
@@ -1,7 +1,8 @@
-from scipy.optimize import curve_fit
-from scipy.stats import linregress
 import numpy as np
 
+from .regression import linregress
+
+
 class HardeningSoilParameters:
     #Cálculo de parámetros de resistencia
     
@@ -25,8 +26,10 @@ class HardeningSoilParameters:
         
         delta_ev = np.diff(volumetric_strain[dilatant_mask])
         delta_e1 = np.diff(axial_strain[dilatant_mask])
-        
-        a = -np.mean(delta_ev / delta_e1)
+
+        # Lecturas repetidas (Δε1 = 0, p. ej. puntos duplicados por el bootstrap) no definen pendiente
+        moving = delta_e1 != 0
+        a = -np.mean(delta_ev[moving] / delta_e1[moving])
         sin_psi = a / (2 + a)
         return np.degrees(np.arcsin(sin_psi))
 
@@ -66,7 +69,7 @@ class HardeningSoilParameters:
         log_E50 = np.log(E50)
         
         # Regresión lineal (y = m*x + b)
-        slope, intercept, _, _, _ = linregress(log_ratio, log_E50)
+        slope, intercept = linregress(log_ratio, log_E50)
         
         # Calcular E50_ref del intercepto
         E50_ref = np.exp(intercept)
@@ -188,7 +191,7 @@ class HardeningSoilParameters:
         strain_stress_ratio = strain_filtered / stress_filtered
         
         # Realizar regresión lineal
-        slope, intercept, r_value, _, _ = linregress(strain_filtered, strain_stress_ratio)
+        slope, intercept = linregress(strain_filtered, strain_stress_ratio)
         
         # qa es la inversa de la pendiente
         if slope <= 0:
@@ -257,4 +260,174 @@ class HardeningSoilParameters:
         sigma_d = qa / (1 + qa/ (2 * E50 * epsilon_1))
         
         return sigma_d
-    
\ No newline at end of file
+    
+
+    @staticmethod
+    def model_hyperbolic_grid(epsilon_1, sigma_3, E50_ref, c, phi, m, Rf, p_ref=100, outer=True):
+        """
+        Evalúa la curva hiperbólica sobre mallas de presiones, deformaciones y parámetros.
+
+        Los parámetros (E50_ref, c, phi, m, Rf, p_ref) pueden ser escalares o arrays y se
+        combinan con las reglas de broadcasting de NumPy. Los términos trigonométricos, qf,
+        qa y E50 se calculan una sola vez por combinación de parámetros y presión.
+
+        Parámetros:
+        - epsilon_1: Array de deformaciones axiales
+        - sigma_3: Presión o array de presiones de confinamiento
+        - E50_ref, c, phi, m, Rf, p_ref: Igual que en `model_hyperbolic_curve`
+        - outer: Si es True, el resultado es el producto externo con forma
+          parámetros + sigma_3 + epsilon_1. Si es False, todas las entradas se combinan
+          directamente por broadcasting (p. ej. sigma_3[:, None] con una deformación por fila).
+
+        Retorna:
+        - Array de esfuerzos desviadores (sigma_d)
+
+        Raises:
+        - ValueError: Si phi, c o sigma_3 son None
+        """
+        if phi is None:
+            raise ValueError("El parámetro 'phi' no puede ser None")
+        if c is None:
+            raise ValueError("El parámetro 'c' no puede ser None")
+        if sigma_3 is None:
+            raise ValueError("El parámetro 'sigma_3' no puede ser None")
+
+        E50_ref, c, phi, m, Rf, p_ref = np.broadcast_arrays(
+            *(np.asarray(value, dtype=float) for value in (E50_ref, c, phi, m, Rf, p_ref)))
+        sigma_3 = np.asarray(sigma_3, dtype=float)
+        epsilon_1 = np.asarray(epsilon_1, dtype=float)
+
+        # Términos que solo dependen de los parámetros
+        phi_rad = np.radians(phi)
+        sin_phi = np.sin(phi_rad)
+        c_cos_phi = c * np.cos(phi_rad)
+        c_cot_phi = c_cos_phi / sin_phi
+        qf_factor = 2 * sin_phi / (1 - sin_phi)
+        reference = c_cos_phi + p_ref * sin_phi
+
+        if outer:
+            # Añadir ejes para sigma_3 y epsilon_1 tras los de los parámetros
+            expand = (Ellipsis,) + (np.newaxis,) * (sigma_3.ndim + epsilon_1.ndim)
+            sin_phi, c_cos_phi, c_cot_phi, qf_factor, reference, E50_ref, m, Rf = (
+                term[expand] for term in
+                (sin_phi, c_cos_phi, c_cot_phi, qf_factor, reference, E50_ref, m, Rf))
+            sigma_3 = sigma_3[(Ellipsis,) + (np.newaxis,) * epsilon_1.ndim]
+
+        qa = qf_factor * (sigma_3 + c_cot_phi) / Rf
+        E50 = E50_ref * ((c_cos_phi + sigma_3 * sin_phi) / reference) ** m
+
+        # Evitar división por cero cuando epsilon_1 es 0
+        epsilon_1 = np.maximum(epsilon_1, 1e-10)
+
+        return qa / (1 + qa / (2 * E50 * epsilon_1))
+
+    @staticmethod
+    def fit_hyperbolic_global(strain, stress, confining_pressure, E50_ref, m, Rf, c, phi,
+                              fit_strength=False, p_ref=100):
+        """
+        Ajusta conjuntamente E50_ref, m y Rf (y opcionalmente c y phi) a todas las curvas
+        a la vez mediante mínimos cuadrados sobre `model_hyperbolic_curve`.
+
+        El ajuste parte de las estimaciones cerradas (arranque en caliente) y usa el
+        jacobiano analítico del modelo hiperbólico, por lo que converge en pocas
+        evaluaciones.
+
+        Parámetros:
+        - strain, stress: Arrays concatenados de deformación axial y esfuerzo desviador
+        - confining_pressure: Presión de confinamiento de cada punto [kPa]
+        - E50_ref, m, Rf, c, phi: Valores iniciales (p. ej. los de `calculate_m`,
+          `calculate_phi_and_c` y el promedio de Rf)
+        - fit_strength: Si es True también se ajustan c y phi; si no, quedan fijos. Las
+          curvas solo determinan qa = qf(c, φ)/Rf, así que c, φ y Rf por sí solos están
+          indeterminados: con `fit_strength` se agrega a los residuos el pico de cada
+          presión de confinamiento (máximo de `stress`) frente a `calculate_qf`, que
+          fija c y φ, mientras que las curvas fijan Rf
+        - p_ref: Presión de referencia (default 100 kPa)
+
+        Retorna:
+        - dict con 'E50ref', 'm', 'Rf', 'c', 'phi' ajustados
+        - pcov: Matriz de covarianza de los parámetros ajustados (en el orden anterior)
+
+        Raises:
+        - ValueError: Si no hay puntos con deformación positiva
+        """
+        # scipy.optimize solo se carga cuando se pide el ajuste global
+        from scipy.optimize import curve_fit
+
+        strain = np.asarray(strain, dtype=float)
+        stress = np.asarray(stress, dtype=float)
+        sigma_3 = np.asarray(confining_pressure, dtype=float)
+        mask = strain > 0
+        if not np.any(mask):
+            raise ValueError("No hay puntos con deformación positiva para el ajuste")
+        xdata = np.vstack([strain[mask], sigma_3[mask]])
+        ydata = stress[mask]
+        # Residuos de resistencia: un pico por presión de confinamiento (deformación ficticia 1)
+        n_curve = ydata.size
+        if fit_strength:
+            peak_pressures, group = np.unique(sigma_3[mask], return_inverse=True)
+            peaks = np.full(peak_pressures.size, -np.inf)
+            np.maximum.at(peaks, group, ydata)
+            xdata = np.hstack([xdata, np.vstack([np.ones_like(peak_pressures), peak_pressures])])
+            ydata = np.concatenate([ydata, peaks])
+        is_peak = np.arange(ydata.size) >= n_curve
+
+        def terms(x, E50_ref, m, Rf, c, phi):
+            eps, s3 = x
+            phi_rad = np.radians(phi)
+            sin_phi, cos_phi = np.sin(phi_rad), np.cos(phi_rad)
+            num = c * cos_phi + s3 * sin_phi
+            den = c * cos_phi + p_ref * sin_phi
+            qf = 2 * (s3 * sin_phi + c * cos_phi) / (1 - sin_phi)
+            u = Rf / qf
+            v = 1 / (2 * E50_ref * (num / den) ** m * eps)
+            return eps, s3, sin_phi, cos_phi, num, den, qf, u, v
+
+        def model(x, *theta):
+            E50_ref, m_, Rf_, c_, phi_ = full(theta)
+            *_, qf, u, v = terms(x, E50_ref, m_, Rf_, c_, phi_)
+            return np.where(is_peak, qf, 1 / (u + v))
+
+        def jacobian(x, *theta):
+            E50_ref, m_, Rf_, c_, phi_ = full(theta)
+            eps, s3, sin_phi, cos_phi, num, den, qf, u, v = terms(x, E50_ref, m_, Rf_, c_, phi_)
+            q2 = -1 / (u + v) ** 2
+            columns = [
+                q2 * (-v / E50_ref),
+                q2 * (-v * np.log(num / den)),
+                q2 * (1 / qf),
+            ]
+            if fit_strength:
+                deg = np.pi / 180
+                dqf_dc = 2 * cos_phi / (1 - sin_phi)
+                dqf_dphi = ((2 * s3 * cos_phi - 2 * c_ * sin_phi) * (1 - sin_phi)
+                            + 2 * (s3 * sin_phi + c_ * cos_phi) * cos_phi) / (1 - sin_phi) ** 2 * deg
+                dnum_dphi = (-c_ * sin_phi + s3 * cos_phi) * deg
+                dden_dphi = (-c_ * sin_phi + p_ref * cos_phi) * deg
+                dlogr_dc = cos_phi / num - cos_phi / den
+                dlogr_dphi = dnum_dphi / num - dden_dphi / den
+                columns.append(np.where(is_peak, dqf_dc, q2 * (-u / qf * dqf_dc - v * m_ * dlogr_dc)))
+                columns.append(np.where(is_peak, dqf_dphi, q2 * (-u / qf * dqf_dphi - v * m_ * dlogr_dphi)))
+                # Los picos no dependen de E50_ref, m ni Rf
+                columns[:3] = [np.where(is_peak, 0.0, column) for column in columns[:3]]
+            return np.column_stack(columns)
+
+        def full(theta):
+            if fit_strength:
+                return theta
+            return (*theta, c, phi)
+
+        p0 = [E50_ref, m, Rf]
+        lower = [1e-6, 0.0, 1e-3]
+        upper = [np.inf, 1.5, 1.0]
+        if fit_strength:
+            p0 += [c, phi]
+            lower += [0.0, 1e-3]
+            upper += [np.inf, 89.0]
+        p0 = np.clip(p0, lower, np.nextafter(np.array(upper), 0))
+
+        popt, pcov = curve_fit(model, xdata, ydata, p0=p0, jac=jacobian,
+                               bounds=(lower, upper), method='trf', x_scale='jac')
+
+        E50_fit, m_fit, Rf_fit, c_fit, phi_fit = full(tuple(popt))
+        return {'E50ref': E50_fit, 'm': m_fit, 'Rf': Rf_fit, 'c': c_fit, 'phi': phi_fit}, pcov
@@ -0,0 +1,358 @@
+from contextlib import nullcontext
+from pathlib import Path
+
+import numpy as np
+
+from . import profiling
+from .data_loader import DataLoader
+from .parameters import HardeningSoilParameters
+from .material import HardeningSoilMaterial
+from .preprocessing import SignalPreprocessor
+from .cycles import CycleAnalysis, LOADING
+from .test_set import TestSet
+from .results_store import ResultsStore
+from .stages import StageTracker
+
+# Submódulos cuyo código determina el resultado de la calibración (huella de `run` incremental)
+_CALIBRATION_MODULES = ('pipeline', 'data_loader', 'cache', 'preprocessing', 'cycles', 'parameters',
+                        'regression', 'batch_calibration', 'material', 'test_set')
+
+
+class CalibrationPipeline:
+    """
+    Flujo completo de calibración de un libro de ensayos:
+    carga, calibración en dos pasadas, modelado, gráficas y reporte PDF.
+    """
+
+    @staticmethod
+    def calibrate(data, p_ref=100, v_ur=0.2, global_fit=False, fit_strength=False, cycles=None, compact=False):
+        """
+        Calibra los parámetros del modelo a partir de los datos agrupados.
+
+        Parámetros:
+        - data: dict {presión de confinamiento: DataFrame} como el de `DataLoader.load_data`,
+          o un `TestSet` (cada ensayo se calcula en float64 aunque se guarde en float32)
+        - p_ref: Presión de referencia (default 100 kPa)
+        - v_ur: Coeficiente de Poisson en descarga-recarga (default 0.2)
+        - global_fit: Si es True, E50ref, m y Rf se ajustan conjuntamente a todas las
+          curvas (`HardeningSoilParameters.fit_hyperbolic_global`) partiendo de las
+          estimaciones cerradas
+        - fit_strength: Con `global_fit`, ajustar también c y phi (con los picos de cada
+          curva como residuos de resistencia)
+        - cycles: Ciclos de descarga-recarga ya detectados (`CycleAnalysis.loop_moduli`),
+          p. ej. sobre los datos sin preprocesar. Por defecto se detectan en `data`, y las
+          lecturas de descarga y recarga se excluyen de E50ref, qa y psi
+        - compact: Retornar los ensayos como `TestSet` (curvas en buffers contiguos con el
+          tipo de `data`, c, phi y m guardados una sola vez) en lugar de un dict de dict
+
+        Si hay ciclos, Eur_ref se ajusta a sus módulos (`CycleAnalysis.fit_Eur_ref`, con
+        el m calibrado) en lugar de 3·E50ref.
+
+        Retorna:
+        - tests: dict por presión de confinamiento con curvas, modelo y parámetros del ensayo
+          (`TestSet` si `compact`)
+        - parameters: dict con los parámetros globales del modelo
+        """
+        tests = {}
+        parameters = {
+            'E50ref': None,
+            'Eur_ref': None,
+            'Eoed_ref': None,
+            'c': None,
+            'phi': None,
+            'psi': None,
+            'm': None,
+            'v_ur': v_ur,
+            'p_ref': p_ref,
+            'K0_nc': None,
+            'Rf': [],
+        }
+
+        # Listas temporales para cálculos
+        E50ref_list = []
+        confining_pressures = []
+        peak_stresses = []
+
+        # Primera pasada: calcular phi y c
+        with profiling.stage('first_pass'):
+            for cp, df in data.items():
+                stress = np.asarray(df['stress'], dtype=float)
+                confining_pressures.append(cp)
+                peak_stresses.append(np.max(stress))
+
+            parameters['phi'], parameters['c'] = HardeningSoilParameters.calculate_phi_and_c(
+                confining_pressures,
+                peak_stresses
+            )
+
+        # Ciclos de descarga-recarga de cada ensayo
+        with profiling.stage('cycles'):
+            loading = {}
+            if cycles is None:
+                cycles = CycleAnalysis.loop_moduli(data)
+                loading = {cp: branch == LOADING for cp, (branch, loops) in cycles.items() if len(loops)}
+
+        # Segunda pasada: calcular parámetros individuales
+        with profiling.stage('second_pass'):
+            for cp, df in data.items():
+                strain = np.asarray(df['strain'], dtype=float)
+                stress = np.asarray(df['stress'], dtype=float)
+                vol_strain = np.asarray(df['volumetric_strain'], dtype=float)
+                if cp in loading:
+                    strain, stress, vol_strain = (values[loading[cp]] for values in (strain, stress, vol_strain))
+
+                qf = HardeningSoilParameters.calculate_qf(cp, parameters['c'], parameters['phi'])
+                E50ref = HardeningSoilParameters.calculate_E50ref(strain, stress)
+                E50ref_list.append(E50ref)
+
+                qa = HardeningSoilParameters.calculate_qa(strain, stress)
+                Rf = qf/qa if qa != 0 else None
+
+                loops = cycles[cp][1] if cp in cycles else None
+                Eur = np.nanmedian(loops['Eur']) if loops is not None and loops['Eur'].notna().any() else None
+                Eur_ref = Eur if Eur is not None else HardeningSoilParameters.calculate_Eur_ref(E50ref)
+                Eoed_ref = HardeningSoilParameters.calculate_Eoed_ref(E50ref)
+                psi = HardeningSoilParameters.calculate_psi(strain, vol_strain)
+
+                tests[cp] = {
+                    'strain': strain,
+                    'stress': stress,
+                    'E50ref': E50ref,
+                    'Eur_ref': Eur_ref,
+                    'Eoed_ref': Eoed_ref,
+                    'psi': psi,
+                    'qf': qf,
+                    'qa': qa,
+                    'Rf': Rf,
+                    'loops': loops
+                }
+
+                if Rf is not None:
+                    parameters['Rf'].append(Rf)
+
+        # Parámetros globales
+        with profiling.stage('global_parameters'):
+            parameters['E50ref'] = np.mean(E50ref_list)
+            parameters['m'], E50ref_calculated = HardeningSoilParameters.calculate_m(
+                confining_pressures,
+                E50ref_list,
+                parameters['c'],
+                parameters['phi'],
+                p_ref=parameters['p_ref']
+            )
+            parameters['K0_nc'] = HardeningSoilParameters.calculate_K0_nc(parameters['phi'])
+            parameters['psi'] = np.nanmean([test['psi'] for test in tests.values()])
+            parameters['v_ur'] = np.mean(parameters['v_ur'])
+            valid_Rfs = [rf for rf in parameters['Rf'] if rf is not None]
+            parameters['Rf'] = np.mean(valid_Rfs)
+
+            # Asignar valores por defecto
+            parameters['Eoed_ref'] = parameters['E50ref']
+            parameters['Eur_ref'] = 3*parameters['E50ref']
+
+        if global_fit:
+            with profiling.stage('global_fit'):
+                # Puntos hasta el pico de cada curva, como en calculate_qa
+                pre_peak = [slice(0, np.argmax(tests[cp]['stress']) + 1) for cp in confining_pressures]
+                fitted, _ = HardeningSoilParameters.fit_hyperbolic_global(
+                    strain=np.concatenate([tests[cp]['strain'][k] for cp, k in zip(confining_pressures, pre_peak)]),
+                    stress=np.concatenate([tests[cp]['stress'][k] for cp, k in zip(confining_pressures, pre_peak)]),
+                    confining_pressure=np.concatenate(
+                        [np.full(k.stop, cp, dtype=float) for cp, k in zip(confining_pressures, pre_peak)]),
+                    E50_ref=E50ref_calculated,
+                    m=parameters['m'],
+                    Rf=parameters['Rf'],
+                    c=parameters['c'],
+                    phi=parameters['phi'],
+                    fit_strength=fit_strength,
+                    p_ref=parameters['p_ref']
+                )
+                E50ref_calculated = fitted['E50ref']
+                parameters.update({
+                    'E50ref': fitted['E50ref'],
+                    'Eur_ref': 3*fitted['E50ref'],
+                    'Eoed_ref': fitted['E50ref'],
+                    'm': fitted['m'],
+                    'Rf': fitted['Rf'],
+                    'c': fitted['c'],
+                    'phi': fitted['phi'],
+                    'K0_nc': HardeningSoilParameters.calculate_K0_nc(fitted['phi']),
+                })
+
+        # Eur_ref medido en los ciclos (después del ajuste global, que fija m)
+        with profiling.stage('cycles_fit'):
+            fitted_Eur = CycleAnalysis.fit_Eur_ref(cycles, parameters['c'], parameters['phi'],
+                                                   m=parameters['m'], p_ref=parameters['p_ref'])
+            if fitted_Eur is not None:
+                parameters['Eur_ref'] = fitted_Eur[0]
+
+        # Modelado con los parámetros globales: una curva de 100 puntos por presión,
+        # evaluadas todas en una sola llamada sobre el material calibrado
+        with profiling.stage('modelling'):
+            material = HardeningSoilMaterial.from_parameters(parameters, E50_ref=E50ref_calculated)
+            max_strains = np.array([max(tests[cp]['strain']) for cp in confining_pressures])
+            strain_models = np.linspace(0, max_strains, 100, axis=-1)
+            stress_models = material.q(strain_models, np.asarray(confining_pressures, dtype=float)[:, np.newaxis])
+
+            for cp, strain_model, stress_model in zip(confining_pressures, strain_models, stress_models):
+                tests[cp].update({
+                    'strain_model': strain_model,
+                    'stress_model': stress_model,
+                    'c': parameters['c'],
+                    'phi': parameters['phi'],
+                    'm': parameters['m']
+                })
+
+        if compact:
+            dtype = data.columns['strain'].dtype if isinstance(data, TestSet) else None
+            tests = TestSet.from_tests(tests, dtype=dtype)
+        return tests, parameters
+
+    @staticmethod
+    def output_paths(output_dir):
+        """
+        Crea los directorios de salida y retorna las rutas de figuras y reporte.
+        """
+        output_dir = Path(output_dir)
+        figures_dir = output_dir / 'figures'
+        reports_dir = output_dir / 'reports'
+        figures_dir.mkdir(parents=True, exist_ok=True)
+        reports_dir.mkdir(parents=True, exist_ok=True)
+
+        return {
+            'stress_strain': str(figures_dir / 'stress_strain.png'),
+            'stress_path': str(figures_dir / 'stress_path.png'),
+            'report': str(reports_dir / 'calibration_report.pdf'),
+        }
+
+    @staticmethod
+    def profile_dir(output_dir):
+        """Directorio del perfil de ejecución de `run`."""
+        return Path(output_dir) / 'profile'
+
+    @staticmethod
+    def stages_dir(output_dir):
+        """Directorio del manifiesto y los resultados intermedios de `run` incremental."""
+        return Path(output_dir) / 'stages'
+
+    @staticmethod
+    def run(file_path, output_dir, cache_dir=None, global_fit=False, fast_plots=False, report_figures='png',
+            profile=False, profile_memory=False, resample_points=None, return_tests=False, compact=False,
+            incremental=False):
+        """
+        Ejecuta el flujo completo para un libro de ensayos.
+
+        Parámetros:
+        - file_path: Ruta al archivo Excel con los ensayos
+        - output_dir: Directorio donde se crean 'figures/' y 'reports/'
+        - cache_dir: Directorio de caché binaria para `DataLoader` (opcional)
+        - global_fit: Ajuste conjunto de E50ref, m y Rf (ver `calibrate`)
+        - fast_plots: Modo rápido de `Visualizer` (plantilla reutilizada y curvas reducidas)
+        - report_figures: Figuras del informe: 'png', 'cached' o 'vector' (ver
+          `ReportGenerator.generate_report`)
+        - profile: Registrar tiempo y llamadas por etapa (`profiling.Profiler`) en
+          'profile/profile.json' y 'profile/trace.json'
+        - profile_memory: Registrar también la memoria pico por etapa (tracemalloc
+          ralentiza las etapas que asignan mucha memoria, como las gráficas)
+        - resample_points: Si se indica, cada curva se preprocesa (deformación monótona,
+          suavizado y remuestreo a este número de puntos, ver `SignalPreprocessor`) antes
+          de calibrar
+        - return_tests: Retornar también los ensayos calibrados
+        - compact: Cargar los ensayos como `TestSet` (sin DataFrames, mapeados desde la
+          caché si hay `cache_dir`) y retornarlos compactos (ver `calibrate`)
+        - incremental: Omitir las etapas cuyas entradas no cambiaron desde la ejecución
+          anterior en `output_dir` (`StageTracker`, manifiesto en 'stages/'). La
+          calibración depende del contenido del libro, de las opciones y del código de
+          carga y calibración; cada figura, de los resultados calibrados, de
+          `fast_plots` y del código de gráficas; el informe, de los resultados, de
+          `report_figures`, de las figuras y del código del informe. Una etapa omitida
+          reutiliza sus artefactos (la calibración se guarda en 'stages/calibrate.pkl')
+
+        Retorna:
+        - parameters: dict con los parámetros globales calibrados, o (tests, parameters)
+          si `return_tests`
+        """
+        paths = CalibrationPipeline.output_paths(output_dir)
+        profile = profile or profile_memory
+        profiler = profiling.Profiler(Path(file_path).stem, memory=profile_memory) if profile else nullcontext()
+        tracker = StageTracker(CalibrationPipeline.stages_dir(output_dir)) if incremental else None
+
+        try:
+            with profiler:
+                # Huella de la calibración: contenido del libro, opciones y código que calibra
+                calibration_key = None
+                if tracker is not None:
+                    with profiling.stage('fingerprint'):
+                        calibration_key = StageTracker.digest(
+                            ResultsStore.file_hash(file_path),
+                            {'global_fit': global_fit, 'resample_points': resample_points, 'compact': compact},
+                            StageTracker.code_version(*_CALIBRATION_MODULES,
+                                                      libraries=('numpy', 'pandas', 'scipy', 'openpyxl')))
+
+                if tracker is not None and tracker.fresh_result('calibrate', calibration_key):
+                    with profiling.stage('calibrate'):
+                        tests, parameters = tracker.load('calibrate')
+                else:
+                    with profiling.stage('load'):
+                        if compact and not resample_points:
+                            data = DataLoader.load_test_set(file_path, cache_dir=cache_dir)
+                        else:
+                            data = DataLoader.load_data(file_path, cache_dir=cache_dir)
+                    cycles = None
+                    if resample_points:
+                        with profiling.stage('preprocess'):
+                            # Los ciclos se miden en los datos originales: el preprocesado los elimina
+                            cycles = CycleAnalysis.loop_moduli(data)
+                            data = SignalPreprocessor.preprocess(data, n_points=resample_points)
+                    with profiling.stage('calibrate'):
+                        tests, parameters = CalibrationPipeline.calibrate(data, global_fit=global_fit, cycles=cycles,
+                                                                          compact=compact)
+                        if tracker is not None:
+                            tracker.save('calibrate', calibration_key, (tests, parameters))
+
+                # Las figuras y el informe dependen de los valores calibrados, no de cómo se
+                # obtuvieron: si una recalibración da los mismos resultados, no se rehacen
+                results_key = StageTracker.digest(tests, parameters) if tracker is not None else None
+                figure_keys = {}
+                with profiling.stage('plotting'):
+                    for name, plot in (('stress_strain', 'plot_stress_strain'), ('stress_path', 'plot_stress_path')):
+                        if tracker is not None:
+                            figure_keys[name] = StageTracker.digest(
+                                name, results_key, fast_plots,
+                                StageTracker.code_version('visualization', 'downsampling', 'parameters',
+                                                          libraries=('matplotlib', 'seaborn')))
+                            if tracker.fresh(name, figure_keys[name], [paths[name]]):
+                                continue
+                        # Las librerías de gráficas solo se cargan si hay que dibujar
+                        from .visualization import Visualizer
+                        getattr(Visualizer, plot)(tests, save_path=paths[name], fast=fast_plots)
+                        if tracker is not None:
+                            tracker.record(name, figure_keys[name], [paths[name]])
+
+                with profiling.stage('report'):
+                    report_key = None
+                    if tracker is not None:
+                        # El modo vectorial no usa las figuras PNG
+                        figures_key = None if report_figures == 'vector' else figure_keys
+                        report_key = StageTracker.digest(
+                            results_key, report_figures, figures_key,
+                            StageTracker.code_version('report_generator', 'downsampling', 'parameters',
+                                                      libraries=('reportlab', 'Pillow')))
+                    if tracker is None or not tracker.fresh('report', report_key, [paths['report']]):
+                        from .report_generator import ReportGenerator
+                        ReportGenerator.generate_report(
+                            parameters=parameters,
+                            img_paths=[paths['stress_strain'], paths['stress_path']],
+                            output_file=paths['report'],
+                            tests=tests,
+                            figures=report_figures
+                        )
+                        if tracker is not None:
+                            tracker.record('report', report_key, [paths['report']])
+        finally:
+            # El perfil se guarda también si una etapa falla (queda registrada con su error)
+            if profile:
+                profiler.write(CalibrationPipeline.profile_dir(output_dir))
+        if return_tests:
+            return tests, parameters
+        return parameters
@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+
+from .cycles import CycleAnalysis, LOADING
+
+
+def _moving_average(values, window):
+    """Media móvil centrada con sumas acumuladas; en los bordes la ventana se acorta."""
+    n = values.size
+    half = window // 2
+    cumulative = np.concatenate(([0.0], np.cumsum(values)))
+    idx = np.arange(n)
+    lo = np.maximum(idx - half, 0)
+    hi = np.minimum(idx + half + 1, n)
+    return (cumulative[hi] - cumulative[lo]) / (hi - lo)
+
+
+def _moving_median(values, window):
+    """Mediana móvil centrada; los bordes se extienden repitiendo el primer y último valor."""
+    half = window // 2
+    padded = np.pad(values, half, mode='edge')
+    return np.median(np.lib.stride_tricks.sliding_window_view(padded, 2 * half + 1), axis=-1)
+
+
+class SignalPreprocessor:
+    """
+    Preprocesamiento de las curvas del data-logger antes de la calibración:
+    deformaciones monótonas sin repetidos, suavizado y remuestreo sobre una malla
+    uniforme de deformación.
+
+    Con unos cientos de puntos por curva, `HardeningSoilParameters` trabaja sobre
+    curvas compactas en lugar de cientos de miles de lecturas, y `calculate_psi`
+    deja de dividir por incrementos de deformación nulos o ruidosos.
+    """
+
+    # Puntos de la malla uniforme de deformación por defecto
+    DEFAULT_POINTS = 200
+
+    @staticmethod
+    def monotonize(strain, *columns):
+        """
+        Vuelve monótona la deformación axial y promedia las lecturas repetidas.
+
+        La deformación se reemplaza por su máximo acumulado (los retrocesos del sensor
+        quedan en el último máximo alcanzado) y las lecturas con la misma deformación se
+        promedian en un solo punto.
+
+        Parámetros:
+        - strain: Deformación axial de cada lectura, en orden de registro
+        - columns: Otras columnas de la misma longitud (esfuerzo, deformación volumétrica...)
+
+        Retorna:
+        - tuple: (deformación estrictamente creciente, columnas promediadas...)
+        """
+        strain = np.maximum.accumulate(np.asarray(strain, dtype=float))
+        if strain.size == 0:
+            return (strain,) + tuple(np.asarray(column, dtype=float) for column in columns)
+        starts = np.flatnonzero(np.concatenate(([True], np.diff(strain) > 0)))
+        counts = np.diff(np.append(starts, strain.size))
+        averaged = tuple(np.add.reduceat(np.asarray(column, dtype=float), starts) / counts
+                         for column in columns)
+        return (strain[starts],) + averaged
+
+    @staticmethod
+    def smooth(values, window, method='mean'):
+        """
+        Suaviza una señal con una ventana centrada de `window` lecturas.
+
+        Parámetros:
+        - values: Señal a suavizar
+        - window: Ancho de la ventana (se usa el impar inmediato superior); 1 o menos no filtra
+        - method: 'mean' (media móvil, O(n)) o 'median' (mediana móvil, elimina picos
+          aislados del registro; use ventanas cortas)
+        """
+        values = np.asarray(values, dtype=float)
+        window = int(window or 0)
+        if window <= 1 or values.size < 2:
+            return values
+        window = min(window, 2 * ((values.size - 1) // 2) + 1)
+        if method == 'mean':
+            return _moving_average(values, window)
+        if method == 'median':
+            return _moving_median(values, window)
+        raise ValueError(f"Método de suavizado desconocido: '{method}' (use 'mean' o 'median')")
+
+    @staticmethod
+    def resample(strain, columns, n_points=DEFAULT_POINTS):
+        """
+        Interpola las columnas sobre `n_points` deformaciones uniformes entre la primera
+        y la última deformación de la curva.
+
+        Parámetros:
+        - strain: Deformación estrictamente creciente (ver `monotonize`)
+        - columns: dict {nombre: valores}
+
+        Retorna:
+        - tuple: (malla de deformación, dict {nombre: valores interpolados})
+        """
+        grid = np.linspace(strain[0], strain[-1], n_points)
+        return grid, {name: np.interp(grid, strain, values) for name, values in columns.items()}
+
+    @staticmethod
+    def preprocess_curve(df, n_points=DEFAULT_POINTS, window=None, median_window=0):
+        """
+        Preprocesa la curva de un ensayo: deformación monótona, suavizado y remuestreo.
+        Si la curva tiene ciclos de descarga-recarga (`CycleAnalysis.segment`), solo se
+        conserva la rama de carga.
+
+        Parámetros:
+        - df: DataFrame de un ensayo con 'strain' y las demás columnas numéricas
+          (como los de `DataLoader.load_data`)
+        - n_points: Puntos de la malla uniforme de deformación. Una curva que ya tiene
+          `n_points` deformaciones distintas o menos no se remuestrea (interpolarla solo
+          agregaría puntos): se conservan sus lecturas monótonas, filtradas con
+          `median_window` si se indica
+        - window: Ancho de la media móvil en lecturas. Por defecto, las lecturas que caen
+          en un intervalo de la malla (filtro antialias antes de reducir la curva)
+        - median_window: Ancho de la mediana móvil previa para eliminar picos (0: sin filtro)
+
+        Retorna:
+        - DataFrame con min(`n_points`, deformaciones distintas) filas y las mismas
+          columnas numéricas
+        """
+        if 'stress' in df.columns:
+            # Las ramas de descarga-recarga no pertenecen a la curva de carga
+            branch, _ = CycleAnalysis.segment(df['strain'].to_numpy(), df['stress'].to_numpy())
+            df = df[branch == LOADING]
+        columns = [col for col in df.columns
+                   if col != 'strain' and pd.api.types.is_numeric_dtype(df[col])]
+        strain, *values = SignalPreprocessor.monotonize(df['strain'].to_numpy(),
+                                                         *(df[col].to_numpy() for col in columns))
+        if strain.size < 2:
+            raise ValueError("La curva necesita al menos dos deformaciones distintas para remuestrearse")
+        if window is None:
+            window = strain.size // n_points
+        smoothed = {}
+        for col, column in zip(columns, values):
+            column = SignalPreprocessor.smooth(column, median_window, method='median')
+            smoothed[col] = SignalPreprocessor.smooth(column, window)
+        if strain.size <= n_points:
+            grid, resampled = strain, smoothed
+        else:
+            grid, resampled = SignalPreprocessor.resample(strain, smoothed, n_points)
+        return pd.DataFrame({'strain': grid, **resampled},
+                            columns=[col for col in df.columns if col == 'strain' or col in resampled])
+
+    @staticmethod
+    def preprocess(data, n_points=DEFAULT_POINTS, window=None, median_window=0):
+        """
+        Preprocesa todos los ensayos de un libro.
+
+        Parámetros:
+        - data: dict {presión de confinamiento: DataFrame} como el de `DataLoader.load_data`
+        - n_points, window, median_window: ver `preprocess_curve`
+
+        Retorna:
+        - dict con las mismas claves y las curvas preprocesadas, listo para
+          `CalibrationPipeline.calibrate`
+        """
+        return {cp: SignalPreprocessor.preprocess_curve(df, n_points, window, median_window)
+                for cp, df in data.items()}
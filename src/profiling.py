@@ -0,0 +1,237 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+# Perfiladores activos en este proceso (el último recibe las etapas y llamadas)
+_active = []
+# Métodos sustituidos por contadores: {(clase, nombre): staticmethod original}
+_patched = {}
+
+
+def stage(name):
+    """
+    Marca una etapa del flujo de calibración.
+
+    Sin un `Profiler` activo retorna un contexto nulo, por lo que las etapas pueden
+    dejarse en el código sin costo apreciable.
+    """
+    if not _active:
+        return nullcontext()
+    return _active[-1].stage(name)
+
+
+def _counted(qualname, func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _active:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            entry = _active[-1].calls.setdefault(qualname, {'count': 0, 'seconds': 0.0})
+            entry['count'] += 1
+            entry['seconds'] += time.perf_counter() - start
+    return wrapper
+
+
+def _patch(classes):
+    for cls in classes:
+        for name, attr in list(vars(cls).items()):
+            if isinstance(attr, staticmethod) and (cls, name) not in _patched:
+                _patched[(cls, name)] = attr
+                setattr(cls, name, staticmethod(_counted(f"{cls.__name__}.{name}", attr.__func__)))
+
+
+def _unpatch():
+    for (cls, name), attr in _patched.items():
+        setattr(cls, name, attr)
+    _patched.clear()
+
+
+class Profiler:
+    """
+    Instrumentación de una ejecución: tiempo y memoria pico por etapa, y número de
+    llamadas y tiempo acumulado (inclusivo) de los métodos estáticos de las clases
+    indicadas.
+
+    Uso:
+        with Profiler('libro') as profiler:
+            CalibrationPipeline.run(...)
+        profiler.write('output/profile')
+
+    Las etapas se registran con `profiling.stage(nombre)`. La memoria pico se mide
+    con tracemalloc (memoria trazada desde el inicio del perfil, incluida la de las
+    etapas anidadas) y solo si `memory=True`, porque ralentiza las asignaciones.
+    """
+
+    def __init__(self, name='run', memory=True, count_calls=None):
+        """
+        Parámetros:
+        - name: Nombre de la ejecución (p. ej. el libro procesado)
+        - memory: Medir la memoria pico por etapa
+        - count_calls: Clases cuyos métodos estáticos se cuentan
+          (default: `HardeningSoilParameters`)
+        """
+        if count_calls is None:
+            from .parameters import HardeningSoilParameters
+            count_calls = (HardeningSoilParameters,)
+        self.name = name
+        self.memory = memory
+        self.count_calls = tuple(count_calls)
+        self.events = []
+        self.calls = {}
+        self._stack = []
+        self._origin = None
+        self._tracing = False
+
+    def __enter__(self):
+        self._origin = time.perf_counter()
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        _patch(self.count_calls)
+        _active.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _active.remove(self)
+        if not _active:
+            _unpatch()
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+        return False
+
+    def _traced_peak(self):
+        return tracemalloc.get_traced_memory()[1] if self.memory and tracemalloc.is_tracing() else 0
+
+    @contextmanager
+    def stage(self, name):
+        """Registra la duración, la memoria pico y el resultado de una etapa."""
+        if self._stack:
+            self._stack[-1]['peak'] = max(self._stack[-1]['peak'], self._traced_peak())
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        frame = {'peak': 0}
+        self._stack.append(frame)
+        event = {'name': name, 'depth': len(self._stack) - 1, 'status': 'ok', 'error': None,
+                 'thread': threading.get_ident()}
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            event['status'] = 'error'
+            event['error'] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            end = time.perf_counter()
+            self._stack.pop()
+            peak = max(frame['peak'], self._traced_peak())
+            if self._stack:
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            event.update({
+                'start': start - self._origin,
+                'seconds': end - start,
+                'peak_mb': peak / 2 ** 20 if self.memory else None,
+            })
+            self.events.append(event)
+
+    def summary(self):
+        """
+        Resumen de la ejecución.
+
+        Retorna:
+        - dict con 'name', 'total_seconds', 'status', 'stages' ({etapa: {'count',
+          'seconds', 'peak_mb', 'errors'}}) y 'calls' ({método: {'count', 'seconds'}})
+        """
+        stages = {}
+        for event in sorted(self.events, key=lambda e: e['start']):
+            entry = stages.setdefault(event['name'], {'count': 0, 'seconds': 0.0, 'peak_mb': None, 'errors': []})
+            entry['count'] += 1
+            entry['seconds'] += event['seconds']
+            if event['peak_mb'] is not None:
+                entry['peak_mb'] = max(entry['peak_mb'] or 0.0, event['peak_mb'])
+            if event['error']:
+                entry['errors'].append(event['error'])
+        roots = [event for event in self.events if event['depth'] == 0]
+        return {
+            'name': self.name,
+            'total_seconds': sum(event['seconds'] for event in roots),
+            'status': 'error' if any(event['status'] == 'error' for event in self.events) else 'ok',
+            'stages': stages,
+            'calls': dict(sorted(self.calls.items())),
+        }
+
+    def chrome_trace(self, pid=None):
+        """Eventos en formato Chrome Trace (chrome://tracing, Perfetto)."""
+        pid = os.getpid() if pid is None else pid
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': self.name}}]
+        for event in sorted(self.events, key=lambda e: e['start']):
+            events.append({
+                'name': event['name'],
+                'cat': 'stage',
+                'ph': 'X',
+                'ts': event['start'] * 1e6,
+                'dur': event['seconds'] * 1e6,
+                'pid': pid,
+                'tid': event['thread'],
+                'args': {'peak_mb': event['peak_mb'], 'status': event['status'], 'error': event['error']},
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write(self, directory):
+        """
+        Guarda `profile.json` (resumen) y `trace.json` (Chrome Trace) en `directory`.
+
+        Retorna:
+        - dict con las rutas 'profile' y 'trace'
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        paths = {'profile': directory / 'profile.json', 'trace': directory / 'trace.json'}
+        paths['profile'].write_text(json.dumps(self.summary(), indent=2, ensure_ascii=False), encoding='utf-8')
+        paths['trace'].write_text(json.dumps(self.chrome_trace(), ensure_ascii=False), encoding='utf-8')
+        return {key: str(path) for key, path in paths.items()}
+
+    @staticmethod
+    def aggregate(summaries):
+        """
+        Combina los resúmenes de varias ejecuciones (p. ej. los libros de un lote).
+
+        Retorna:
+        - dict con 'runs', 'failed_runs', 'total_seconds', 'stages' ({etapa: {'runs',
+          'count', 'seconds', 'mean_seconds', 'max_seconds', 'max_peak_mb', 'errors'}})
+          y 'calls' ({método: {'count', 'seconds'}})
+        """
+        summaries = list(summaries)
+        stages, calls = {}, {}
+        for summary in summaries:
+            for name, entry in summary['stages'].items():
+                total = stages.setdefault(name, {'runs': 0, 'count': 0, 'seconds': 0.0, 'max_seconds': 0.0,
+                                                 'max_peak_mb': None, 'errors': 0})
+                total['runs'] += 1
+                total['count'] += entry['count']
+                total['seconds'] += entry['seconds']
+                total['max_seconds'] = max(total['max_seconds'], entry['seconds'])
+                if entry['peak_mb'] is not None:
+                    total['max_peak_mb'] = max(total['max_peak_mb'] or 0.0, entry['peak_mb'])
+                total['errors'] += len(entry['errors'])
+            for name, entry in summary['calls'].items():
+                total = calls.setdefault(name, {'count': 0, 'seconds': 0.0})
+                total['count'] += entry['count']
+                total['seconds'] += entry['seconds']
+        for total in stages.values():
+            total['mean_seconds'] = total['seconds'] / total['runs']
+        return {
+            'runs': len(summaries),
+            'failed_runs': sum(summary['status'] != 'ok' for summary in summaries),
+            'total_seconds': sum(summary['total_seconds'] for summary in summaries),
+            'stages': stages,
+            'calls': dict(sorted(calls.items())),
+        }
@@ -0,0 +1,56 @@
+import numpy as np
+
+# Regresiones lineales sin scipy, compartidas por la calibración por ensayo
+# (`HardeningSoilParameters`), la vectorizada (`BatchCalibrator`) y `CycleAnalysis`
+
+
+def linregress(x, y):
+    """
+    Pendiente e intercepto de la regresión lineal por mínimos cuadrados, con las mismas
+    operaciones que `scipy.stats.linregress` (resultados idénticos) pero sin importar
+    scipy.stats, cuya carga domina el arranque de una calibración sin gráficas.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if x.size == 0 or y.size == 0:
+        raise ValueError("Inputs must not be empty.")
+    if np.amax(x) == np.amin(x) and len(x) > 1:
+        raise ValueError("Cannot calculate a linear regression if all x values are identical")
+
+    xmean = np.mean(x, None)
+    ymean = np.mean(y, None)
+    ssxm, ssxym, _, _ = np.cov(x, y, bias=1).flat
+    slope = ssxym / ssxm
+    return slope, ymean - slope * xmean
+
+
+def segment_sum(values, seg, n_seg):
+    """Suma por segmento usando np.bincount (sin bucles de Python)."""
+    return np.bincount(seg, weights=values, minlength=n_seg)
+
+
+def segment_first_true(mask, starts):
+    """Índice global del primer elemento verdadero de cada segmento (-1 si no hay)."""
+    positions = np.where(mask, np.arange(mask.size), mask.size)
+    first = np.minimum.reduceat(positions, starts)
+    return np.where(first < mask.size, first, -1)
+
+
+def segment_linregress(x, y, seg, n_seg):
+    """
+    Regresión lineal y = slope·x + intercept independiente para cada segmento.
+
+    Usa sumas centradas por segmento para mantener la estabilidad numérica.
+    Los segmentos con menos de dos puntos o con x constante devuelven NaN.
+    """
+    n = segment_sum(np.ones_like(x), seg, n_seg)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_x = segment_sum(x, seg, n_seg) / n
+        mean_y = segment_sum(y, seg, n_seg) / n
+        dx = x - mean_x[seg]
+        dy = y - mean_y[seg]
+        sxx = segment_sum(dx * dx, seg, n_seg)
+        sxy = segment_sum(dx * dy, seg, n_seg)
+        slope = np.where((n >= 2) & (sxx > 0), sxy / sxx, np.nan)
+    intercept = mean_y - slope * mean_x
+    return slope, intercept
@@ -1,85 +1,337 @@
+import io
+import os
+from xml.sax.saxutils import escape
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image as PILImage
 from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, PageBreak, Table, TableStyle
 from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+from reportlab.graphics.shapes import Drawing, Group, String
+from reportlab.graphics.charts.lineplots import LinePlot
+from reportlab.graphics.charts.legends import Legend
+from reportlab.graphics.widgets.markers import makeMarker
+
+from .parameters import HardeningSoilParameters
+from .downsampling import downsample
+
+FIGURE_MODES = ('png', 'cached', 'vector')
+
+# Paleta "deep" de seaborn, como en `Visualizer`
+_SERIES_COLORS = ('#4C72B0', '#DD8452', '#55A868', '#C44E52', '#8172B3',
+                  '#937860', '#DA8BC3', '#8C8C8C', '#CCB974', '#64B5CD')
+
+# Columnas de la tabla resumen del informe combinado: (clave, encabezado, formato)
+_SUMMARY_COLUMNS = (
+    ('E50ref', 'E50ref [kPa]', '{:.0f}'),
+    ('Eur_ref', 'Eur_ref [kPa]', '{:.0f}'),
+    ('phi', 'phi [°]', '{:.2f}'),
+    ('c', 'c [kPa]', '{:.2f}'),
+    ('psi', 'psi [°]', '{:.2f}'),
+    ('m', 'm', '{:.3f}'),
+    ('Rf', 'Rf', '{:.3f}'),
+)
+
+FIGURE_WIDTH, FIGURE_HEIGHT = 450, 338  # Proporción 4:3
+
+
+@lru_cache(maxsize=None)
+def _styles():
+    """Estilos del informe, construidos una sola vez por proceso."""
+    styles = getSampleStyleSheet()
+
+    # Estilos personalizados
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Title'],
+        fontSize=24,
+        spaceAfter=30,
+        textColor=colors.HexColor('#1B4F72'),
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold'
+    )
+
+    heading_style = ParagraphStyle(
+        'CustomHeading',
+        parent=styles['Heading2'],
+        fontSize=16,
+        textColor=colors.HexColor('#2874A6'),
+        spaceAfter=20,
+        spaceBefore=20,
+        fontName='Helvetica-Bold'
+    )
+
+    param_style = ParagraphStyle(
+        'CustomParam',
+        parent=styles['Normal'],
+        fontSize=12,
+        textColor=colors.HexColor('#2C3E50'),
+        alignment=TA_JUSTIFY,
+        fontName='Helvetica',
+        leading=20
+    )
+
+    table_style = TableStyle([
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2874A6')),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#EBF5FB')]),
+        ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.HexColor('#AEB6BF')),
+    ])
+
+    return {'title': title_style, 'heading': heading_style, 'param': param_style, 'table': table_style}
+
+
+@lru_cache(maxsize=64)
+def _cached_image(path, mtime, max_width_px):
+    """
+    Figura PNG reducida a `max_width_px` y recomprimida como JPEG, leída una sola vez
+    por proceso (la clave incluye la fecha de modificación del archivo).
+    """
+    with PILImage.open(path) as img:
+        img = img.convert('RGB')
+        img.thumbnail((max_width_px, max_width_px))
+        buffer = io.BytesIO()
+        img.save(buffer, format='JPEG', quality=85, optimize=True)
+    return buffer.getvalue()
+
+
+def _format_value(value, unit=''):
+    # Función para formatear valores con estilo
+    if value is None:
+        return '<i>N/A</i>'
+    val = f"{value:.2f}" if isinstance(value, (int, float)) else str(value)
+    return f"{val} <i>{unit}</i>" if unit else val
+
+
+def _parameters_paragraph(parameters, styles):
+    # Texto con formato mejorado
+    params_text = f"""
+    <para alignment="justify" spaceAfter="10">
+    <b>E50ref:</b> {_format_value(parameters['E50ref'], 'kPa')}<br/>
+    <b>Eur_ref:</b> {_format_value(parameters['Eur_ref'], 'kPa')}<br/>
+    <b>φ (Ángulo de fricción):</b> {_format_value(parameters['phi'], '°')}<br/>
+    <b>c (Cohesión):</b> {_format_value(parameters['c'], 'kPa')}<br/>
+    <b>ψ (Ángulo de dilatancia):</b> {_format_value(parameters['psi'], '°')}<br/>
+    <b>m (Exponente de rigidez):</b> {_format_value(parameters['m'])}<br/>
+    <b>ν_ur (Coeficiente de Poisson):</b> {_format_value(parameters['v_ur'])}<br/>
+    <b>K0_nc:</b> {_format_value(parameters['K0_nc'])}<br/>
+    <b>Rf (Ratio de falla):</b> {_format_value(parameters['Rf'])}
+    </para>
+    """
+    return Paragraph(params_text, styles['param'])
+
+
+def _line_chart(series, x_label, y_label, max_points):
+    """
+    Gráfico vectorial de ReportLab.
+
+    series: lista de (puntos x, puntos y, color, etiqueta, marcador); las curvas densas
+    se reducen a `max_points` con LTTB. Los textos usan nombres de las variables en
+    lugar de letras griegas, que no existen en las fuentes estándar del PDF.
+    """
+    drawing = Drawing(FIGURE_WIDTH, FIGURE_HEIGHT)
+    plot = LinePlot()
+    plot.x, plot.y = 50, 40
+    plot.width, plot.height = FIGURE_WIDTH - 60, FIGURE_HEIGHT - 110
+
+    data = []
+    for i, (x, y, color, _, marker) in enumerate(series):
+        x, y = downsample(x, y, max_points)
+        data.append(list(zip(x.tolist(), y.tolist())))
+        line = plot.lines[i]
+        line.strokeColor = colors.HexColor(color)
+        if marker:
+            line.strokeWidth = 0
+            line.symbol = makeMarker('Circle', size=2.5, fillColor=colors.HexColor(color),
+                                     strokeColor=colors.HexColor(color))
+        else:
+            line.strokeWidth = 1.2
+        if color == '#000000':
+            line.strokeDashArray = (4, 2)
+    plot.data = data
+
+    for axis in (plot.xValueAxis, plot.yValueAxis):
+        axis.valueMin = 0
+        axis.labels.fontName = 'Helvetica'
+        axis.labels.fontSize = 7
+        axis.visibleGrid = True
+        axis.gridStrokeColor = colors.HexColor('#D5D8DC')
+        axis.gridStrokeWidth = 0.3
+    drawing.add(plot)
+
+    drawing.add(String(plot.x + plot.width / 2, 10, x_label, fontName='Helvetica-Bold',
+                       fontSize=8, textAnchor='middle'))
+    drawing.add(Group(String(0, 0, y_label, fontName='Helvetica-Bold', fontSize=8, textAnchor='middle'),
+                      transform=(0, 1, -1, 0, 12, plot.y + plot.height / 2)))
+
+    legend = Legend()
+    legend.x, legend.y = plot.x, FIGURE_HEIGHT - 5
+    legend.fontName, legend.fontSize = 'Helvetica', 6.5
+    legend.columnMaximum = 3
+    legend.dx, legend.dy, legend.deltay = 6, 6, 9
+    legend.colorNamePairs = [(colors.HexColor(color), label) for _, _, color, label, _ in series]
+    drawing.add(legend)
+    return drawing
+
+
+def _stress_strain_drawing(tests, prediction_pressures=(600,), max_points=200):
+    series = []
+    for i, (name, test) in enumerate(tests.items()):
+        color = _SERIES_COLORS[i % len(_SERIES_COLORS)]
+        series.append((test['strain'], test['stress'], color, f'Experimental (sigma3={name} kPa)', True))
+        series.append((test['strain_model'], test['stress_model'], color,
+                       f'Modelo (E50ref={test["E50ref"]:.0f} kPa)', False))
+
+    if len(prediction_pressures):
+        first_test = next(iter(tests.values()))
+        strain_pred = np.linspace(0, max(np.max(test['strain']) for test in tests.values()), 100)
+        stress_pred = HardeningSoilParameters.model_hyperbolic_grid(
+            strain_pred, np.asarray(prediction_pressures, dtype=float), first_test['E50ref'],
+            first_test['c'], first_test['phi'], first_test['m'], first_test['Rf'])
+        for sigma3_pred, stress in zip(prediction_pressures, stress_pred):
+            series.append((strain_pred, stress, '#000000', f'Predicción (sigma3={sigma3_pred} kPa)', False))
+
+    return _line_chart(series, 'Deformación Axial (epsilon1) [%]', 'Esfuerzo Desviador (q) [kPa]', max_points)
+
+
+def _stress_path_drawing(tests, max_points=200):
+    series = []
+    for i, (name, test) in enumerate(tests.items()):
+        q = np.asarray(test['stress'], dtype=float)
+        series.append((name + q / 3, q, _SERIES_COLORS[i % len(_SERIES_COLORS)], f'sigma3={name} kPa', False))
+    return _line_chart(series, 'Esfuerzo Normal Medio (p) [kPa]', 'Esfuerzo Desviador (q) [kPa]', max_points)
+
+
+def _figure_flowables(figures, img_paths, tests, max_width_px):
+    if figures == 'vector':
+        if tests is None:
+            raise ValueError("El modo 'vector' requiere los ensayos calibrados (tests)")
+        return [_stress_strain_drawing(tests), _stress_path_drawing(tests)]
+    if figures == 'cached':
+        return [Image(io.BytesIO(_cached_image(str(path), os.path.getmtime(path), max_width_px)),
+                      width=FIGURE_WIDTH, height=FIGURE_HEIGHT)
+                for path in img_paths]
+    return [Image(path, width=FIGURE_WIDTH, height=FIGURE_HEIGHT) for path in img_paths]
+
+
+def _check_figures(figures):
+    if figures not in FIGURE_MODES:
+        raise ValueError(f"Modo de figuras no válido: '{figures}' (use {FIGURE_MODES})")
+
+
+def _build_report(kwargs):
+    """Genera un informe a partir de sus argumentos (ejecutable en otro proceso)."""
+    ReportGenerator.generate_report(**kwargs)
+    return kwargs['output_file']
+
 
 class ReportGenerator:
     @staticmethod
-    def generate_report(parameters, img_paths, output_file='output/reports/calibration_report.pdf'):
+    def generate_report(parameters, img_paths=(), output_file='output/reports/calibration_report.pdf',
+                        tests=None, figures='png', max_width_px=1200):
+        """
+        Genera el informe PDF de calibración de una muestra.
+
+        Parámetros:
+        - parameters: dict con los parámetros calibrados
+        - img_paths: Rutas de las figuras PNG (modos 'png' y 'cached')
+        - output_file: Ruta del PDF
+        - tests: dict de ensayos de `CalibrationPipeline.calibrate` (modo 'vector')
+        - figures: 'png' (figuras originales), 'cached' (figuras reducidas a
+          `max_width_px` y recomprimidas, leídas una vez por proceso) o 'vector'
+          (gráficos vectoriales dibujados directamente en el PDF)
+        """
+        _check_figures(figures)
         doc = SimpleDocTemplate(output_file, pagesize=letter, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=72)
-        styles = getSampleStyleSheet()
-        
-        # Estilos personalizados
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Title'],
-            fontSize=24,
-            spaceAfter=30,
-            textColor=colors.HexColor('#1B4F72'),
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        )
-        
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=16,
-            textColor=colors.HexColor('#2874A6'),
-            spaceAfter=20,
-            spaceBefore=20,
-            fontName='Helvetica-Bold'
-        )
-        
-        param_style = ParagraphStyle(
-            'CustomParam',
-            parent=styles['Normal'],
-            fontSize=12,
-            textColor=colors.HexColor('#2C3E50'),
-            alignment=TA_JUSTIFY,
-            fontName='Helvetica',
-            leading=20
-        )
-        
+        styles = _styles()
+
         story = []
-        
+
         # Encabezado
-        story.append(Paragraph("Informe de Calibración:<br/>Modelo Hardening Soil", title_style))
+        story.append(Paragraph("Informe de Calibración:<br/>Modelo Hardening Soil", styles['title']))
         story.append(Spacer(1, 30))
-        
+
         # Parámetros
-        story.append(Paragraph("Parámetros Calculados", heading_style))
+        story.append(Paragraph("Parámetros Calculados", styles['heading']))
         story.append(Spacer(1, 20))
-        
-        # Función para formatear valores con estilo
-        def format_value(value, unit=''):
-            if value is None:
-                return '<i>N/A</i>'
-            val = f"{value:.2f}" if isinstance(value, (int, float)) else str(value)
-            return f"{val} <i>{unit}</i>" if unit else val
-        
-        # Texto con formato mejorado
-        params_text = f"""
-        <para alignment="justify" spaceAfter="10">
-        <b>E50ref:</b> {format_value(parameters['E50ref'], 'kPa')}<br/>
-        <b>Eur_ref:</b> {format_value(parameters['Eur_ref'], 'kPa')}<br/>
-        <b>φ (Ángulo de fricción):</b> {format_value(parameters['phi'], '°')}<br/>
-        <b>c (Cohesión):</b> {format_value(parameters['c'], 'kPa')}<br/>
-        <b>ψ (Ángulo de dilatancia):</b> {format_value(parameters['psi'], '°')}<br/>
-        <b>m (Exponente de rigidez):</b> {format_value(parameters['m'])}<br/>
-        <b>ν_ur (Coeficiente de Poisson):</b> {format_value(parameters['v_ur'])}<br/>
-        <b>K0_nc:</b> {format_value(parameters['K0_nc'])}<br/>
-        <b>Rf (Ratio de falla):</b> {format_value(parameters['Rf'])}
-        </para>
-        """
-        story.append(Paragraph(params_text, param_style))
+        story.append(_parameters_paragraph(parameters, styles))
         story.append(Spacer(1, 30))
-        
+
         # Gráficos con título
-        story.append(Paragraph("Resultados Gráficos", heading_style))
-        for path in img_paths:
+        story.append(Paragraph("Resultados Gráficos", styles['heading']))
+        for figure in _figure_flowables(figures, img_paths, tests, max_width_px):
             story.append(Spacer(1, 20))
-            story.append(Image(path, width=450, height=338))  # Proporción 4:3
+            story.append(figure)
             story.append(Spacer(1, 20))
-        
-        doc.build(story)
\ No newline at end of file
+
+        doc.build(story)
+
+    @staticmethod
+    def generate_reports(jobs, workers=None):
+        """
+        Genera muchos informes individuales, en paralelo si `workers` > 1. Los estilos
+        y las figuras en caché se comparten entre los informes de cada proceso.
+
+        Parámetros:
+        - jobs: Iterable de dict con los argumentos de `generate_report`
+        - workers: Procesos de trabajo (None o 1 = en el proceso actual)
+
+        Retorna:
+        - list: Rutas de los informes, en el orden de `jobs`
+        """
+        jobs = list(jobs)
+        for job in jobs:
+            _check_figures(job.get('figures', 'png'))
+        if workers and workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+                return list(executor.map(_build_report, jobs))
+        return [_build_report(job) for job in jobs]
+
+    @staticmethod
+    def generate_combined_report(samples, output_file='output/reports/combined_report.pdf',
+                                 figures='vector', max_width_px=1200):
+        """
+        Genera un único PDF con una tabla resumen y una sección por muestra.
+
+        Parámetros:
+        - samples: dict {nombre: {'parameters': ..., 'tests': ... y/o 'img_paths': ...}}
+        - output_file: Ruta del PDF
+        - figures, max_width_px: Igual que en `generate_report`
+        """
+        _check_figures(figures)
+        doc = SimpleDocTemplate(output_file, pagesize=letter, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=72)
+        styles = _styles()
+
+        story = [
+            Paragraph("Informe de Calibración:<br/>Modelo Hardening Soil", styles['title']),
+            Spacer(1, 30),
+            Paragraph("Resumen de Muestras", styles['heading']),
+        ]
+
+        rows = [['Muestra'] + [header for _, header, _ in _SUMMARY_COLUMNS]]
+        for name, sample in samples.items():
+            parameters = sample['parameters']
+            rows.append([str(name)] + [
+                'N/A' if parameters.get(key) is None else fmt.format(parameters[key])
+                for key, _, fmt in _SUMMARY_COLUMNS
+            ])
+        story.append(Table(rows, repeatRows=1, style=styles['table']))
+
+        for name, sample in samples.items():
+            story.append(PageBreak())
+            story.append(Paragraph(f"Muestra: {escape(str(name))}", styles['heading']))
+            story.append(_parameters_paragraph(sample['parameters'], styles))
+            for figure in _figure_flowables(figures, sample.get('img_paths', ()), sample.get('tests'),
+                                            max_width_px):
+                story.append(Spacer(1, 10))
+                story.append(figure)
+
+        doc.build(story)
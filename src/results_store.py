@@ -0,0 +1,290 @@
+import hashlib
+import json
+import math
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+# Parámetros globales guardados por calibración (claves de `CalibrationPipeline.calibrate`)
+PARAMETER_COLUMNS = ('E50ref', 'Eur_ref', 'Eoed_ref', 'c', 'phi', 'psi', 'm', 'v_ur', 'p_ref', 'K0_nc', 'Rf')
+# Valores guardados por ensayo
+TEST_COLUMNS = ('confining_pressure', 'E50ref', 'Eur_ref', 'Eoed_ref', 'psi', 'qf', 'qa', 'Rf')
+# Columnas con índice para las consultas por rango
+_INDEXED_PARAMETERS = ('E50ref', 'c', 'phi', 'psi', 'm', 'Rf')
+
+_TABLES = f"""
+CREATE TABLE IF NOT EXISTS calibrations (
+    id INTEGER PRIMARY KEY,
+    project TEXT,
+    specimen TEXT,
+    source TEXT,
+    source_hash TEXT,
+    options TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    {', '.join(f'{col} REAL' for col in PARAMETER_COLUMNS)}
+);
+CREATE TABLE IF NOT EXISTS tests (
+    calibration_id INTEGER NOT NULL REFERENCES calibrations(id) ON DELETE CASCADE,
+    {', '.join(f'{col} REAL' for col in TEST_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS idx_tests_calibration ON tests(calibration_id);
+"""
+# Índices de consulta: {nombre: definición}. En las inserciones masivas se eliminan y
+# se reconstruyen al final, lo que es varias veces más rápido que actualizarlos fila a fila
+_INDEXES = {
+    'idx_calibrations_project': 'calibrations(project)',
+    'idx_calibrations_source': 'calibrations(source_hash, options)',
+    **{f'idx_calibrations_{col}': f'calibrations({col})' for col in _INDEXED_PARAMETERS},
+    'idx_tests_confining_pressure': 'tests(confining_pressure, calibration_id)',
+}
+# Filas mínimas de una inserción para reconstruir los índices (y al menos 1/4 de las existentes)
+_BULK_ROWS = 10_000
+
+
+def _real(value):
+    """Valor numérico para SQLite (None si falta o no es finito)."""
+    if value is None:
+        return None
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def _options_key(options):
+    return json.dumps(options or {}, sort_keys=True)
+
+
+def _range_clause(column, bounds, params):
+    """Condición SQL de un rango (min, max); None en un extremo deja ese lado abierto."""
+    low, high = bounds
+    clauses = []
+    if low is not None:
+        clauses.append(f"{column} >= ?")
+        params.append(float(low))
+    if high is not None:
+        clauses.append(f"{column} <= ?")
+        params.append(float(high))
+    return clauses
+
+
+class ResultsStore:
+    """
+    Almacén persistente de calibraciones en SQLite (biblioteca estándar).
+
+    Cada calibración guarda los parámetros globales, los valores por ensayo
+    (E50ref, qa, Rf, psi...) y su procedencia: proyecto, probeta, archivo fuente,
+    hash SHA-256 de su contenido y opciones de calibración. El hash y las opciones
+    permiten reutilizar una calibración existente en lugar de repetirla.
+
+    Uso:
+        with ResultsStore('output/results.db') as store:
+            store.insert(parameters, tests, project='Obra A', source='ensayos.xlsx')
+            store.query(project='Obra A', phi=(30, 35), confining_pressure=(50, 200))
+    """
+
+    def __init__(self, path):
+        """
+        Parámetros:
+        - path: Archivo de la base de datos (se crea con su esquema si no existe)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Las transacciones se abren explícitamente (ver `insert_many`)
+        self.connection = sqlite3.connect(self.path, isolation_level=None)
+        # WAL permite leer mientras otro proceso escribe; NORMAL evita un fsync por transacción
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        # Caché de páginas de 64 MB: las inserciones masivas actualizan varios índices a la vez
+        self.connection.execute("PRAGMA cache_size=-65536")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(_TABLES)
+        self._create_indexes()
+
+    def _create_indexes(self):
+        for name, definition in _INDEXES.items():
+            self.connection.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        self.connection.close()
+
+    @staticmethod
+    def file_hash(file_path):
+        """Hash SHA-256 del contenido de un archivo (procedencia de una calibración)."""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 ** 2), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def test_rows(tests):
+        """
+        Valores por ensayo de `CalibrationPipeline.calibrate` como lista de dict con las
+        claves de `TEST_COLUMNS` (sin las curvas).
+        """
+        return [{'confining_pressure': cp, **{col: test.get(col) for col in TEST_COLUMNS[1:]}}
+                for cp, test in tests.items()]
+
+    def insert(self, parameters, tests=None, project=None, specimen=None, source=None, source_hash=None,
+               options=None):
+        """
+        Guarda una calibración.
+
+        Parámetros:
+        - parameters: dict de parámetros globales (claves de `PARAMETER_COLUMNS`)
+        - tests: dict de ensayos de `CalibrationPipeline.calibrate` o lista de
+          `test_rows` (opcional)
+        - project, specimen: Proyecto y probeta o muestra
+        - source: Archivo fuente; si existe y no se indica `source_hash`, se calcula
+        - options: dict con las opciones de calibración (p. ej. {'global_fit': True})
+
+        Retorna:
+        - int: id de la calibración
+        """
+        return self.insert_many([{
+            'parameters': parameters, 'tests': tests, 'project': project, 'specimen': specimen,
+            'source': source, 'source_hash': source_hash, 'options': options,
+        }])[0]
+
+    def insert_many(self, records):
+        """
+        Guarda muchas calibraciones en una sola transacción.
+
+        Parámetros:
+        - records: Iterable de dict con las claves de `insert` ('parameters' obligatoria)
+
+        Retorna:
+        - list: ids de las calibraciones, en el orden de `records`
+        """
+        created_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        calibration_rows, test_rows = [], []
+        for record in records:
+            source = record.get('source')
+            source_hash = record.get('source_hash')
+            if source_hash is None and source is not None and Path(source).is_file():
+                source_hash = ResultsStore.file_hash(source)
+            parameters = record['parameters']
+            calibration_rows.append((
+                record.get('project'), record.get('specimen'), None if source is None else str(source),
+                source_hash, _options_key(record.get('options')), created_at,
+                *map(_real, map(parameters.get, PARAMETER_COLUMNS))))
+            tests = record.get('tests') or []
+            if isinstance(tests, dict):
+                tests = ResultsStore.test_rows(tests)
+            test_rows.append([tuple(map(_real, map(test.get, TEST_COLUMNS))) for test in tests])
+
+        # Los ids se asignan dentro de una transacción con bloqueo de escritura, de modo que
+        # calibraciones y ensayos se insertan con executemany sin consultar lastrowid
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            last_id, = self.connection.execute("SELECT COALESCE(MAX(id), 0) FROM calibrations").fetchone()
+            ids = list(range(last_id + 1, last_id + 1 + len(calibration_rows)))
+            rebuild = len(ids) >= _BULK_ROWS and 4 * len(ids) >= last_id
+            if rebuild:
+                for name in _INDEXES:
+                    self.connection.execute(f"DROP INDEX IF EXISTS {name}")
+            self.connection.executemany(
+                f"INSERT INTO calibrations (id, project, specimen, source, source_hash, options, created_at, "
+                f"{', '.join(PARAMETER_COLUMNS)}) VALUES ({', '.join('?' * (7 + len(PARAMETER_COLUMNS)))})",
+                ((calibration_id, *row) for calibration_id, row in zip(ids, calibration_rows)))
+            self.connection.executemany(
+                f"INSERT INTO tests (calibration_id, {', '.join(TEST_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * (1 + len(TEST_COLUMNS)))})",
+                ((calibration_id, *test) for calibration_id, tests in zip(ids, test_rows) for test in tests))
+            if rebuild:
+                self._create_indexes()
+            self.connection.commit()
+        except BaseException:
+            self.connection.rollback()
+            raise
+        return ids
+
+    def find(self, source_hash, options=None):
+        """
+        Calibración más reciente del mismo contenido fuente y las mismas opciones.
+
+        Retorna:
+        - dict con 'id', 'parameters' y 'tests' (lista de dict), o None si no existe
+        """
+        row = self.connection.execute(
+            f"SELECT id, {', '.join(PARAMETER_COLUMNS)} FROM calibrations "
+            "WHERE source_hash = ? AND options = ? ORDER BY id DESC LIMIT 1",
+            (source_hash, _options_key(options))).fetchone()
+        if row is None:
+            return None
+        tests = self.connection.execute(
+            f"SELECT {', '.join(TEST_COLUMNS)} FROM tests WHERE calibration_id = ? ORDER BY confining_pressure",
+            (row[0],)).fetchall()
+        return {
+            'id': row[0],
+            'parameters': dict(zip(PARAMETER_COLUMNS, row[1:])),
+            'tests': [dict(zip(TEST_COLUMNS, test)) for test in tests],
+        }
+
+    def query(self, project=None, confining_pressure=None, tests=False, limit=None, **ranges):
+        """
+        Consulta las calibraciones guardadas.
+
+        Parámetros:
+        - project: Proyecto o lista de proyectos
+        - confining_pressure: Rango (min, max) de presión de confinamiento; sin `tests`,
+          selecciona las calibraciones con al menos un ensayo en el rango
+        - tests: Si es True, retorna una fila por ensayo (con el proyecto, la probeta y la
+          fuente de su calibración); si no, una fila por calibración
+        - limit: Número máximo de filas
+        - ranges: Rangos (min, max) por columna, p. ej. `phi=(30, 35)`, `Rf=(None, 0.9)`.
+          Con `tests` se aplican a las columnas por ensayo (`TEST_COLUMNS`); si no, a los
+          parámetros globales (`PARAMETER_COLUMNS`)
+
+        Retorna:
+        - pandas.DataFrame
+        """
+        allowed = TEST_COLUMNS if tests else PARAMETER_COLUMNS
+        unknown = [name for name in ranges if name not in allowed]
+        if unknown:
+            raise ValueError(f"Columnas desconocidas para la consulta: {unknown} (use {', '.join(allowed)})")
+
+        where, params = [], []
+        if project is not None:
+            projects = [project] if isinstance(project, str) else list(project)
+            where.append(f"c.project IN ({', '.join('?' * len(projects))})")
+            params.extend(projects)
+        table = 't' if tests else 'c'
+        for name, bounds in ranges.items():
+            where.extend(_range_clause(f"{table}.{name}", bounds, params))
+
+        if tests:
+            if confining_pressure is not None:
+                where.extend(_range_clause('t.confining_pressure', confining_pressure, params))
+            sql = ("SELECT c.id AS calibration_id, c.project, c.specimen, c.source, "
+                   f"{', '.join(f't.{col}' for col in TEST_COLUMNS)} "
+                   "FROM tests t JOIN calibrations c ON c.id = t.calibration_id")
+        else:
+            if confining_pressure is not None:
+                test_where = _range_clause('t.confining_pressure', confining_pressure, params)
+                where.append("EXISTS (SELECT 1 FROM tests t WHERE t.calibration_id = c.id"
+                             + ''.join(f" AND {clause}" for clause in test_where) + ")")
+            sql = ("SELECT c.id, c.project, c.specimen, c.source, c.source_hash, c.options, c.created_at, "
+                   f"{', '.join(f'c.{col}' for col in PARAMETER_COLUMNS)} FROM calibrations c")
+
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY c.id" + (", t.confining_pressure" if tests else "")
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return pd.read_sql_query(sql, self.connection, params=params)
+
+    def count(self):
+        """Número de calibraciones y de ensayos guardados."""
+        calibrations, = self.connection.execute("SELECT COUNT(*) FROM calibrations").fetchone()
+        tests, = self.connection.execute("SELECT COUNT(*) FROM tests").fetchone()
+        return {'calibrations': calibrations, 'tests': tests}
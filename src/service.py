@@ -0,0 +1,366 @@
+import asyncio
+import hashlib
+import io
+import json
+import math
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from .data_loader import DataLoader
+from .pipeline import CalibrationPipeline
+from .preprocessing import SignalPreprocessor
+
+# Formato de entrada según el Content-Type de la solicitud
+CONTENT_KINDS = {
+    'application/json': 'json',
+    'text/csv': 'csv',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': 'excel',
+    'application/vnd.ms-excel': 'excel',
+    'application/octet-stream': 'excel',
+}
+# Claves de cada ensayo en la respuesta (las curvas medidas no se devuelven)
+_TEST_KEYS = ('E50ref', 'Eur_ref', 'Eoed_ref', 'psi', 'qf', 'qa', 'Rf', 'strain_model', 'stress_model')
+# Tamaño máximo de los encabezados de una solicitud
+_MAX_HEADER_BYTES = 64 * 1024
+
+
+class _HTTPError(Exception):
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = HTTPStatus(status)
+        self.headers = headers or {}
+
+
+def _jsonable(value):
+    """Convierte escalares y arrays de numpy a tipos JSON (NaN e infinitos a null)."""
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, (np.integer, int)) and not isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (np.floating, float)):
+        return float(value) if math.isfinite(value) else None
+    return value
+
+
+def _load_payload(kind, body):
+    """Datos agrupados por presión de confinamiento a partir del cuerpo de la solicitud."""
+    if kind == 'csv':
+        return DataLoader.from_frame(pd.read_csv(io.BytesIO(body)))
+    if kind == 'excel':
+        return DataLoader.from_frame(pd.read_excel(io.BytesIO(body)))
+
+    payload = json.loads(body)
+    tests = payload.get('tests') if isinstance(payload, dict) else payload
+    if not isinstance(tests, list) or not tests:
+        raise ValueError("El cuerpo JSON debe tener una lista 'tests' con un objeto por ensayo "
+                         "('confining_pressure', 'strain', 'stress', 'volumetric_strain')")
+    return DataLoader.from_frame(pd.concat([pd.DataFrame(test) for test in tests], ignore_index=True))
+
+
+def _run_job(kind, body, options):
+    """
+    Calibra una solicitud en un proceso de trabajo.
+
+    Retorna:
+    - dict con 'parameters' y 'tests' o, si `options['report']`, los bytes del informe PDF
+    """
+    data = _load_payload(kind, body)
+    if options['resample']:
+        data = SignalPreprocessor.preprocess(data, n_points=options['resample'])
+    tests, parameters = CalibrationPipeline.calibrate(data, global_fit=options['global_fit'])
+
+    if options['report']:
+        # reportlab solo se carga en los procesos que generan informes
+        from .report_generator import ReportGenerator
+        output = io.BytesIO()
+        ReportGenerator.generate_report(parameters, output_file=output, tests=tests, figures='vector')
+        return output.getvalue()
+    return _jsonable({
+        'parameters': parameters,
+        'tests': {cp: {key: test[key] for key in _TEST_KEYS} for cp, test in tests.items()},
+    })
+
+
+def _ready():
+    """Tarea vacía para arrancar los procesos del pool antes de aceptar conexiones."""
+    return os.getpid()
+
+
+class CalibrationService:
+    """
+    Servicio HTTP local de calibración (asyncio, solo biblioteca estándar).
+
+    Rutas:
+    - GET /health: estado, solicitudes en curso y estadísticas de la caché
+    - POST /calibrate: parámetros globales y por ensayo en JSON
+    - POST /report: informe PDF de calibración (figuras vectoriales)
+
+    El cuerpo de los POST es JSON (`{"tests": [{"confining_pressure": 100, "strain": [...],
+    "stress": [...], "volumetric_strain": [...]}, ...]}`), CSV o un libro Excel, según el
+    Content-Type. Opciones en la consulta: `global_fit=1` y `resample=N` (ver
+    `SignalPreprocessor`).
+
+    La calibración se ejecuta en un pool de procesos. Los resultados se guardan en una
+    caché LRU indexada por el hash del cuerpo, el formato y las opciones, y las
+    solicitudes idénticas en curso comparten el mismo trabajo. Cuando hay
+    `max_pending` trabajos en curso, las solicitudes nuevas se rechazan con 503 y
+    Retry-After en lugar de acumularse en memoria.
+    """
+
+    DEFAULT_MAX_BODY_BYTES = 64 * 1024 ** 2
+
+    def __init__(self, workers=None, cache_size=128, max_pending=None, max_body_bytes=DEFAULT_MAX_BODY_BYTES):
+        """
+        Parámetros:
+        - workers: Procesos de calibración (default: número de núcleos)
+        - cache_size: Resultados guardados en la caché LRU (0 desactiva la caché)
+        - max_pending: Trabajos simultáneos en el pool antes de responder 503
+          (default: 4 por proceso)
+        - max_body_bytes: Tamaño máximo del cuerpo de una solicitud (413 si se supera)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_size = cache_size
+        self.max_pending = max_pending or 4 * self.workers
+        self.max_body_bytes = max_body_bytes
+        self.stats = {'requests': 0, 'hits': 0, 'misses': 0, 'shared': 0, 'rejected': 0, 'errors': 0,
+                      'restarts': 0}
+        self._cache = OrderedDict()
+        self._inflight = {}
+        self._pending = 0
+        self._executor = None
+        self._broken = False
+
+    @staticmethod
+    def key(kind, body, options):
+        """Clave de caché: hash del formato, las opciones y el cuerpo de la solicitud."""
+        digest = hashlib.sha256(f"{kind}:{json.dumps(options, sort_keys=True)}:".encode())
+        digest.update(body)
+        return digest.hexdigest()
+
+    async def submit(self, kind, body, options):
+        """
+        Resultado de una solicitud desde la caché, un trabajo idéntico en curso o un
+        trabajo nuevo en el pool.
+
+        Retorna:
+        - tuple: (resultado de `_run_job`, origen: 'cache', 'shared' o 'computed')
+
+        Raises:
+        - _HTTPError 503: Si ya hay `max_pending` trabajos en curso
+        - BrokenProcessPool: Si un proceso del pool terminó de forma abrupta; el pool se
+          reemplaza antes de propagar el error
+        """
+        key = self.key(kind, body, options)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.stats['hits'] += 1
+            return self._cache[key], 'cache'
+        if key in self._inflight:
+            self.stats['shared'] += 1
+            return await asyncio.shield(self._inflight[key]), 'shared'
+        if self._pending >= self.max_pending:
+            self.stats['rejected'] += 1
+            raise _HTTPError(HTTPStatus.SERVICE_UNAVAILABLE,
+                             f"Servicio saturado ({self._pending} calibraciones en curso)",
+                             headers={'Retry-After': '1'})
+
+        self.stats['misses'] += 1
+        self._pending += 1
+        executor = self._executor
+        try:
+            future = asyncio.get_running_loop().run_in_executor(executor, _run_job, kind, body, options)
+            self._inflight[key] = future
+            try:
+                result = await future
+            finally:
+                del self._inflight[key]
+        except BrokenProcessPool:
+            await self._restart(executor)
+            raise
+        finally:
+            self._pending -= 1
+
+        if self.cache_size > 0:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result, 'computed'
+
+    def health(self):
+        return {
+            'status': 'broken' if self._broken else 'ok',
+            'workers': self.workers,
+            'pending': self._pending,
+            'max_pending': self.max_pending,
+            'cache': {'size': len(self._cache), 'max_size': self.cache_size},
+            'stats': dict(self.stats),
+        }
+
+    async def _read_request(self, reader):
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.LimitOverrunError:
+            raise _HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Encabezados demasiado grandes")
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, _ = lines[0].split(' ', 2)
+        except ValueError:
+            raise _HTTPError(HTTPStatus.BAD_REQUEST, "Línea de solicitud inválida")
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            if name:
+                headers[name.strip().lower()] = value.strip()
+
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            raise _HTTPError(HTTPStatus.LENGTH_REQUIRED, "Se requiere Content-Length")
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise _HTTPError(HTTPStatus.BAD_REQUEST, "Content-Length inválido")
+        if length < 0:
+            raise _HTTPError(HTTPStatus.BAD_REQUEST, "Content-Length inválido")
+        if length > self.max_body_bytes:
+            raise _HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                             f"El cuerpo supera el máximo de {self.max_body_bytes} bytes")
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), target, headers, body
+
+    @staticmethod
+    def _options(query):
+        params = parse_qs(query)
+
+        def first(name, default):
+            return params.get(name, [default])[-1]
+
+        try:
+            resample = int(first('resample', 0) or 0)
+        except ValueError:
+            raise _HTTPError(HTTPStatus.BAD_REQUEST, "'resample' debe ser un entero")
+        if resample == 1 or resample < 0:
+            raise _HTTPError(HTTPStatus.BAD_REQUEST, "'resample' debe ser 0 (sin remuestreo) o al menos 2")
+        return {
+            'global_fit': str(first('global_fit', '0')).lower() in ('1', 'true', 'yes'),
+            'resample': resample,
+        }
+
+    async def _dispatch(self, method, target, headers, body):
+        url = urlsplit(target)
+        if url.path == '/health':
+            if method != 'GET':
+                raise _HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "Use GET", headers={'Allow': 'GET'})
+            status = HTTPStatus.SERVICE_UNAVAILABLE if self._broken else HTTPStatus.OK
+            return status, 'application/json', self.health(), {}
+        if url.path not in ('/calibrate', '/report'):
+            raise _HTTPError(HTTPStatus.NOT_FOUND, f"Ruta desconocida: {url.path}")
+        if method != 'POST':
+            raise _HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "Use POST", headers={'Allow': 'POST'})
+
+        content_type = headers.get('content-type', 'application/json').split(';')[0].strip().lower()
+        kind = CONTENT_KINDS.get(content_type)
+        if kind is None:
+            raise _HTTPError(HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+                             f"Content-Type no soportado: {content_type} (use {', '.join(CONTENT_KINDS)})")
+        if not body:
+            raise _HTTPError(HTTPStatus.BAD_REQUEST, "La solicitud no tiene datos de ensayos")
+
+        options = dict(self._options(url.query), report=url.path == '/report')
+        try:
+            result, source = await self.submit(kind, body, options)
+        except (ValueError, KeyError, TypeError) as e:
+            raise _HTTPError(HTTPStatus.UNPROCESSABLE_ENTITY, f"{type(e).__name__}: {e}")
+        except BrokenProcessPool:
+            raise _HTTPError(HTTPStatus.SERVICE_UNAVAILABLE,
+                             "Un proceso de calibración terminó de forma inesperada; reintente la solicitud",
+                             headers={'Retry-After': '1'})
+        extra = {'X-Cache': source}
+        if options['report']:
+            return HTTPStatus.OK, 'application/pdf', result, extra
+        return HTTPStatus.OK, 'application/json', result, extra
+
+    async def _handle(self, reader, writer):
+        self.stats['requests'] += 1
+        try:
+            try:
+                status, content_type, payload, extra = await self._dispatch(*await self._read_request(reader))
+            except _HTTPError as e:
+                status, content_type, payload, extra = e.status, 'application/json', {'error': str(e)}, e.headers
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return
+            except Exception as e:
+                self.stats['errors'] += 1
+                status, content_type = HTTPStatus.INTERNAL_SERVER_ERROR, 'application/json'
+                payload, extra = {'error': f"{type(e).__name__}: {e}"}, {}
+
+            body = payload if isinstance(payload, bytes) else json.dumps(payload, ensure_ascii=False).encode()
+            head = [f"HTTP/1.1 {status.value} {status.phrase}",
+                    f"Content-Type: {content_type}",
+                    f"Content-Length: {len(body)}",
+                    "Connection: close"]
+            head += [f"{name}: {value}" for name, value in extra.items()]
+            writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=8765):
+        """
+        Crea el pool de procesos y empieza a aceptar conexiones; retorna el `asyncio.Server`.
+
+        Los procesos se crean con 'forkserver' (donde existe) y se arrancan antes de abrir
+        el puerto: un proceso creado con fork durante una solicitud heredaría el socket
+        del cliente, y al cerrarlo el cliente no recibiría el fin de la conexión.
+        """
+        if self._executor is None:
+            await self._start_executor()
+        return await asyncio.start_server(self._handle, host, port, limit=_MAX_HEADER_BYTES)
+
+    async def _start_executor(self):
+        """Crea el pool de procesos y espera a que arranquen todos sus procesos."""
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('forkserver') if 'forkserver' in methods else None
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._executor, _ready) for _ in range(self.workers)))
+
+    async def _restart(self, broken):
+        """
+        Reemplaza un pool roto (un proceso terminó de forma abrupta, p. ej. por falta de
+        memoria) por uno nuevo. Mientras tanto, y si el pool nuevo no arranca, /health
+        informa el estado 'broken'; la siguiente solicitud vuelve a intentarlo.
+        """
+        if self._executor is not broken:
+            # Otra solicitud ya reemplazó este pool
+            return
+        self._broken = True
+        self.stats['restarts'] += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+        await self._start_executor()
+        self._broken = False
+
+    async def serve(self, host='127.0.0.1', port=8765):
+        """Atiende solicitudes hasta que se cancela la tarea."""
+        server = await self.start(host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        """Detiene el pool de procesos."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
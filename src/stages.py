@@ -0,0 +1,189 @@
+import hashlib
+import importlib.util
+import json
+import os
+import pickle
+import tempfile
+from collections.abc import Mapping
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def _update(digest, value):
+    """Agrega un valor al hash de forma determinista (tipo, forma y contenido)."""
+    if isinstance(value, pd.DataFrame):
+        digest.update(b'frame')
+        _update(digest, {str(name): value[name].to_numpy() for name in value.columns})
+    elif isinstance(value, Mapping):
+        digest.update(f'map{len(value)}'.encode())
+        for key, item in value.items():
+            _update(digest, key)
+            _update(digest, item)
+    elif isinstance(value, (list, tuple)):
+        digest.update(f'seq{len(value)}'.encode())
+        for item in value:
+            _update(digest, item)
+    elif isinstance(value, np.ndarray) and value.dtype == object:
+        # p. ej. columnas de un DataFrame vacío
+        digest.update(f'objects{value.shape}'.encode())
+        for item in value.ravel().tolist():
+            _update(digest, item)
+    elif isinstance(value, np.ndarray):
+        digest.update(f'array{value.dtype.str}{value.shape}'.encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (np.generic, float, int, bool, str, bytes)) or value is None:
+        digest.update(f'{type(value).__name__}:{value!r}'.encode())
+    else:
+        raise TypeError(f"No se puede calcular la huella de un valor de tipo {type(value).__name__}")
+
+
+@lru_cache(maxsize=None)
+def _module_hash(name):
+    """
+    Hash del código fuente de un submódulo del paquete (una vez por proceso). El archivo
+    se localiza sin importar el módulo, para no cargar sus librerías (matplotlib, reportlab).
+    """
+    with open(importlib.util.find_spec(f'{__package__}.{name}').origin, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _library_version(name):
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return 'unknown'
+
+
+class StageTracker:
+    """
+    Registro de las etapas de un flujo incremental.
+
+    Cada etapa se identifica por una huella de sus entradas (hash de los datos, valores
+    de los parámetros y opciones, y versión del código que la ejecuta) y produce
+    artefactos en disco. El manifiesto 'manifest.json' de `directory` guarda, por
+    etapa, la huella y el tamaño y la fecha de modificación de cada artefacto. Una
+    etapa está al día si su huella no cambió y sus artefactos siguen en disco sin
+    modificar; en ese caso se omite y se reutilizan sus artefactos.
+
+    Uso:
+        tracker = StageTracker('output/stages')
+        key = StageTracker.digest(data_hash, options, StageTracker.code_version('parameters'))
+        if tracker.fresh_result('calibrate', key):
+            result = tracker.load('calibrate')
+        else:
+            result = calibrate(...)
+            tracker.save('calibrate', key, result)
+    """
+
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        manifest_path = self.directory / self.MANIFEST
+        try:
+            with open(manifest_path, encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            # Sin manifiesto (o ilegible): todas las etapas se ejecutan
+            self.manifest = {}
+        # Etapas omitidas y ejecutadas en esta ejecución, en orden
+        self.skipped = []
+        self.built = []
+
+    # Huellas
+
+    @staticmethod
+    def digest(*values):
+        """
+        Huella SHA-256 de valores anidados: escalares, cadenas, listas, dict (y otros
+        Mapping, como `TestSet`), arrays de numpy y DataFrames.
+        """
+        digest = hashlib.sha256()
+        _update(digest, values)
+        return digest.hexdigest()
+
+    @staticmethod
+    def code_version(*modules, libraries=()):
+        """
+        Versión del código de una etapa: hash de las fuentes de los submódulos de `src`
+        que la ejecutan y versiones instaladas de las librerías indicadas.
+
+        Parámetros:
+        - modules: Nombres de los submódulos (p. ej. 'parameters', 'visualization')
+        - libraries: Nombres de distribución de las librerías (p. ej. 'matplotlib')
+        """
+        return StageTracker.digest([_module_hash(name) for name in modules],
+                                   [_library_version(name) for name in libraries])
+
+    # Estado de las etapas
+
+    @staticmethod
+    def _stat(path):
+        stat = os.stat(path)
+        return {'path': str(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def artifact_path(self, name):
+        """Archivo donde `save` guarda el resultado de una etapa."""
+        return self.directory / f'{name}.pkl'
+
+    def fresh(self, name, fingerprint, artifacts=()):
+        """
+        Indica si la etapa `name` está al día: misma huella y mismos artefactos, que
+        existen y no se modificaron desde que se registraron. Una etapa al día se anota
+        en `skipped`.
+        """
+        entry = self.manifest.get(name)
+        if entry is None or entry['fingerprint'] != fingerprint:
+            return False
+        recorded = entry['artifacts']
+        if [item['path'] for item in recorded] != [str(path) for path in artifacts]:
+            return False
+        try:
+            if any(self._stat(item['path']) != item for item in recorded):
+                return False
+        except OSError:
+            return False
+        self.skipped.append(name)
+        return True
+
+    def record(self, name, fingerprint, artifacts=()):
+        """
+        Registra una etapa ejecutada con su huella y sus artefactos. El manifiesto se
+        reescribe de forma atómica en cada registro, de modo que si una etapa posterior
+        falla, las anteriores quedan registradas.
+        """
+        self.manifest[name] = {'fingerprint': fingerprint,
+                               'artifacts': [self._stat(path) for path in artifacts]}
+        self.built.append(name)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix='.tmp-', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.manifest, f, indent=2, ensure_ascii=False)
+            os.replace(tmp, self.directory / self.MANIFEST)
+        except Exception:
+            os.unlink(tmp)
+            raise
+
+    # Resultados en memoria de una etapa (p. ej. la calibración)
+
+    def save(self, name, fingerprint, value):
+        """Guarda el resultado de una etapa como artefacto (pickle) y la registra."""
+        path = self.artifact_path(name)
+        with open(path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.record(name, fingerprint, [path])
+
+    def load(self, name):
+        """Carga el resultado guardado con `save`."""
+        with open(self.artifact_path(name), 'rb') as f:
+            return pickle.load(f)
+
+    def fresh_result(self, name, fingerprint):
+        """`fresh` para una etapa cuyo artefacto es el resultado guardado con `save`."""
+        return self.fresh(name, fingerprint, [self.artifact_path(name)])
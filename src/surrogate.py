@@ -0,0 +1,222 @@
+import numpy as np
+
+from .material import HardeningSoilMaterial
+
+# Consultas evaluadas por bloque: los temporales del bloque caben en la caché del procesador
+_BLOCK = 8192
+# Deformación mínima, como en `model_hyperbolic_curve`
+_MIN_STRAIN = 1e-10
+
+
+def _power_max(base_lo, base_hi, exponent):
+    """Máximo de base^exponent para base en [base_lo, base_hi] (base > 0): está en un extremo."""
+    return np.maximum(base_lo ** exponent, base_hi ** exponent)
+
+
+class HardeningSurrogate:
+    """
+    Sustituto tabulado de la curva hiperbólica q(ε, σ3) de un material calibrado, para
+    consultas masivas con error acotado.
+
+    La curva se escribe como q = a(σ3)·ε / (ε + b(σ3)), con a = qa = qf/Rf (lineal en
+    σ3) y b = qa / (2·E50). La dependencia en ε y en a es exacta; solo b(σ3), que
+    contiene la ley potencial, se tabula en una malla uniforme de σ3 y se interpola
+    linealmente. Así cada consulta evita las funciones trigonométricas y la potencia, y
+    el dominio en deformación no tiene límite superior.
+
+    El número de nodos se elige para que la cota de error garantizada sea menor que
+    `tolerance` en todo el dominio (ver `compile`).
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, material, sigma_3_min, sigma_3_max, table, error_bound, tolerance):
+        """
+        Parámetros:
+        - material: `HardeningSoilMaterial` tabulado
+        - sigma_3_min, sigma_3_max: Dominio de σ3 [kPa]
+        - table: Valores de b en los nodos (n_celdas + 1, uniformes en σ3)
+        - error_bound: Cota garantizada de |q_sustituto - q| en el dominio [kPa]
+        - tolerance: Tolerancia pedida al compilar [kPa]
+        """
+        self.material = material
+        self.sigma_3_min = float(sigma_3_min)
+        self.sigma_3_max = float(sigma_3_max)
+        self.table = np.asarray(table, dtype=float)
+        self.error_bound = float(error_bound)
+        self.tolerance = float(tolerance)
+
+        n_cells = self.table.size - 1
+        # Tablas de la interpolación con un nodo extra (pendiente 0) para σ3 = σ3_max
+        self._b = np.r_[self.table, self.table[-1]]
+        self._slope = np.r_[np.diff(self.table), 0.0, 0.0]
+        self._scale = n_cells / (self.sigma_3_max - self.sigma_3_min)
+        self._offset = -self.sigma_3_min * self._scale
+        self._a_slope = material._qf_slope / material.Rf
+        self._a_intercept = material._qf_intercept / material.Rf
+
+    def __repr__(self):
+        return (f"HardeningSurrogate(σ3=[{self.sigma_3_min:g}, {self.sigma_3_max:g}] kPa, "
+                f"{self.table.size} nodos, error ≤ {self.error_bound:.3g} kPa)")
+
+    # Construcción
+
+    @staticmethod
+    def _b_exact(material, sigma_3):
+        return material.qa(sigma_3) / (2 * material.E50(sigma_3))
+
+    @staticmethod
+    def _cell_bounds(material, nodes, b_nodes):
+        """
+        Cota del error en q de cada celda de la malla.
+
+        Con b = K·P(σ)·Q(σ), P = a = α·σ + β y Q = (c·cosφ + σ·sinφ)^(-m):
+        b'' = K·(2·P'·Q' + P·Q''), y cada factor es lineal o una potencia de una función
+        lineal positiva, cuyo máximo en la celda está en un extremo. El error de la
+        interpolación lineal es |Δb| ≤ h²/8·max|b''|, y como ∂q/∂b = -a·ε/(ε + b)² con
+        máximo a/(4·b) en ε = b, |Δq| ≤ a·|Δb| / (4·b_min).
+        """
+        lo, hi = nodes[:-1], nodes[1:]
+        h = hi - lo
+        m, D, C = material.m, material._sin_phi, material._c_cos_phi
+        alpha = material._qf_slope / material.Rf
+        K = material._reference ** m / (2 * material.E50_ref)
+
+        base_lo, base_hi = C + D * lo, C + D * hi
+        a_max = np.maximum(np.abs(alpha * lo + material._qf_intercept / material.Rf),
+                           np.abs(alpha * hi + material._qf_intercept / material.Rf))
+        term_1 = 2 * abs(alpha * m * D) * _power_max(base_lo, base_hi, -m - 1)
+        term_2 = a_max * abs(m * (m + 1)) * D ** 2 * _power_max(base_lo, base_hi, -m - 2)
+        b_error = h ** 2 / 8 * K * (term_1 + term_2)
+
+        b_min = np.minimum(b_nodes[:-1], b_nodes[1:]) - b_error
+        with np.errstate(divide='ignore', invalid='ignore'):
+            bounds = np.where(b_min > 0, a_max * b_error / (4 * b_min), np.inf)
+        # Redondeo de punto flotante de la evaluación (unas pocas operaciones por consulta)
+        return bounds + 16 * np.finfo(float).eps * a_max
+
+    @classmethod
+    def compile(cls, material, sigma_3_range, tolerance=0.01, max_nodes=1_000_000):
+        """
+        Tabula un material sobre un dominio de σ3 con error garantizado.
+
+        Parámetros:
+        - material: `HardeningSoilMaterial` calibrado
+        - sigma_3_range: (σ3 mínimo, σ3 máximo) [kPa]
+        - tolerance: Error máximo admitido en q [kPa]
+        - max_nodes: Límite de nodos de la tabla
+
+        Retorna:
+        - HardeningSurrogate con `error_bound` ≤ `tolerance`
+
+        Raises:
+        - ValueError: Si el dominio no es válido (σ3 máximo ≤ mínimo, o qa o
+          c·cosφ + σ3·sinφ no positivos en el dominio) o si la tolerancia requiere más
+          de `max_nodes` nodos
+        """
+        sigma_3_min, sigma_3_max = map(float, sigma_3_range)
+        if not sigma_3_max > sigma_3_min:
+            raise ValueError("El rango de σ3 debe tener máximo mayor que mínimo")
+        if material._c_cos_phi + sigma_3_min * material._sin_phi <= 0 or material.qa(sigma_3_min) <= 0:
+            raise ValueError("El modelo no está definido en todo el rango de σ3 (qa o c·cosφ + σ3·sinφ ≤ 0)")
+        if tolerance <= 0:
+            raise ValueError("La tolerancia debe ser positiva")
+
+        # El error decrece con h²: se corrige el número de celdas hasta cumplir la tolerancia
+        n_cells = 16
+        while True:
+            nodes = np.linspace(sigma_3_min, sigma_3_max, n_cells + 1)
+            table = cls._b_exact(material, nodes)
+            bound = float(np.max(cls._cell_bounds(material, nodes, table)))
+            if bound <= tolerance:
+                return cls(material, sigma_3_min, sigma_3_max, table, bound, tolerance)
+            if n_cells + 1 >= max_nodes:
+                raise ValueError(f"La tolerancia {tolerance} kPa requiere más de {max_nodes} nodos")
+            growth = np.sqrt(bound / tolerance) * 1.05 if np.isfinite(bound) else 2.0
+            n_cells = min(max_nodes - 1, int(np.ceil(n_cells * max(growth, 1.1))))
+
+    # Consultas
+
+    def q(self, epsilon_1, sigma_3):
+        """
+        Esfuerzo desviador q(ε, σ3) por interpolación (mismo resultado que
+        `HardeningSoilMaterial.q` con error ≤ `error_bound`). epsilon_1 y sigma_3 se
+        combinan por broadcasting; las consultas se evalúan por bloques sin temporales
+        del tamaño total.
+
+        Raises:
+        - ValueError: Si algún σ3 está fuera del dominio tabulado
+        """
+        epsilon_1, sigma_3 = np.broadcast_arrays(np.asarray(epsilon_1, dtype=float),
+                                                 np.asarray(sigma_3, dtype=float))
+        shape = epsilon_1.shape
+        epsilon_1, sigma_3 = epsilon_1.ravel(), sigma_3.ravel()
+        n = sigma_3.size
+        if n and (sigma_3.min() < self.sigma_3_min or sigma_3.max() > self.sigma_3_max):
+            raise ValueError(f"σ3 fuera del dominio tabulado [{self.sigma_3_min:g}, {self.sigma_3_max:g}] kPa")
+
+        out = np.empty(n)
+        size = min(n, _BLOCK)
+        position, index = np.empty(size), np.empty(size, dtype=np.intp)
+        b, work = np.empty(size), np.empty(size)
+        for start in range(0, n, _BLOCK):
+            stop = min(start + _BLOCK, n)
+            k = stop - start
+            s, e, q = sigma_3[start:stop], epsilon_1[start:stop], out[start:stop]
+            t, i, bb, w = position[:k], index[:k], b[:k], work[:k]
+
+            # Celda y posición dentro de la celda
+            np.multiply(s, self._scale, out=t)
+            t += self._offset
+            np.copyto(i, t, casting='unsafe')
+            t -= i
+            # b interpolado, denominador ε + b y q = a·ε / (ε + b)
+            np.take(self._slope, i, out=w, mode='clip')
+            w *= t
+            np.take(self._b, i, out=bb, mode='clip')
+            bb += w
+            np.maximum(e, _MIN_STRAIN, out=w)
+            bb += w
+            np.multiply(s, self._a_slope, out=q)
+            q += self._a_intercept
+            q *= w
+            q /= bb
+        return out.reshape(shape)
+
+    def max_error(self, n_samples=1_000_000, seed=None, strain_max=0.2):
+        """
+        Error máximo observado frente a la expresión analítica en puntos aleatorios del
+        dominio (verificación empírica de `error_bound`).
+        """
+        rng = np.random.default_rng(seed)
+        sigma_3 = rng.uniform(self.sigma_3_min, self.sigma_3_max, n_samples)
+        epsilon_1 = rng.uniform(0, strain_max, n_samples)
+        return float(np.max(np.abs(self.q(epsilon_1, sigma_3) - self.material.q(epsilon_1, sigma_3))))
+
+    # Archivo binario
+
+    def save(self, path):
+        """
+        Guarda el sustituto en un archivo binario .npz sin comprimir: la tabla en float64
+        más los parámetros del material, el dominio y la cota de error.
+        """
+        np.savez(path, version=np.array(self.FORMAT_VERSION), table=self.table,
+                 material=np.array(self.material.key),
+                 domain=np.array([self.sigma_3_min, self.sigma_3_max]),
+                 error=np.array([self.error_bound, self.tolerance]))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Carga un sustituto guardado con `save`.
+
+        Raises:
+        - ValueError: Si el archivo es de otra versión del formato
+        """
+        with np.load(path) as archive:
+            if int(archive['version']) != cls.FORMAT_VERSION:
+                raise ValueError(f"Versión de sustituto no soportada: {int(archive['version'])}")
+            material = HardeningSoilMaterial(
+                **dict(zip(HardeningSoilMaterial.PARAMETERS, archive['material'].tolist())))
+            (sigma_3_min, sigma_3_max), (error_bound, tolerance) = archive['domain'], archive['error']
+            return cls(material, sigma_3_min, sigma_3_max, archive['table'], error_bound, tolerance)
@@ -0,0 +1,336 @@
+import itertools
+import json
+import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .parameters import HardeningSoilParameters
+
+# Argumentos de `model_hyperbolic_grid` que pueden barrerse
+SWEEP_PARAMETERS = ('E50_ref', 'c', 'phi', 'm', 'Rf', 'sigma_3')
+
+
+def _moments(values):
+    """Número de valores, media y suma de cuadrados centrada por columna."""
+    mean = values.mean(axis=0)
+    return {'n': values.shape[0], 'mean': mean, 'm2': ((values - mean) ** 2).sum(axis=0)}
+
+
+def _merge_moments(a, b):
+    """Combina los momentos de dos bloques (Chan et al.), sin sumas de cuadrados sin centrar."""
+    if a is None:
+        return b
+    n = a['n'] + b['n']
+    delta = b['mean'] - a['mean']
+    return {
+        'n': n,
+        'mean': a['mean'] + delta * b['n'] / n,
+        'm2': a['m2'] + b['m2'] + delta ** 2 * a['n'] * b['n'] / n,
+    }
+
+
+def _histogram(q, q_upper, bins):
+    """Histograma por deformación objetivo sobre [0, q_upper] (los extremos se acumulan en los bordes)."""
+    n_strains = q.shape[1]
+    index = np.clip((q / q_upper * bins).astype(np.int64), 0, bins - 1)
+    index += np.arange(n_strains) * bins
+    return np.bincount(index.ravel(), minlength=n_strains * bins).reshape(n_strains, bins)
+
+
+def _histogram_quantiles(hist, q_upper, quantiles):
+    """Cuantiles interpolados linealmente dentro de cada intervalo del histograma."""
+    bins = hist.shape[1]
+    cumulative = np.cumsum(hist, axis=1)
+    total = cumulative[:, -1:]
+    result = np.empty((hist.shape[0], len(quantiles)))
+    for k, quantile in enumerate(quantiles):
+        target = quantile * total
+        b = np.minimum((cumulative < target).sum(axis=1), bins - 1)
+        rows = np.arange(hist.shape[0])
+        below = np.where(b > 0, cumulative[rows, b - 1], 0)
+        inside = np.maximum(hist[rows, b], 1)
+        fraction = np.clip((target[:, 0] - below) / inside, 0, 1)
+        result[:, k] = (b + fraction) * q_upper / bins
+    return result
+
+
+def _evaluate(values, names, fixed, strains, p_ref):
+    """q en las deformaciones objetivo para cada fila de `values` (una combinación por fila)."""
+    arguments = dict(fixed)
+    arguments.update({name: values[:, i, np.newaxis] for i, name in enumerate(names)})
+    return HardeningSoilParameters.model_hyperbolic_grid(
+        strains[np.newaxis, :], arguments['sigma_3'], arguments['E50_ref'], arguments['c'],
+        arguments['phi'], arguments['m'], arguments['Rf'], p_ref=p_ref, outer=False)
+
+
+def _unit_samples(job, start, stop):
+    """Puntos del hipercubo unitario de dimensión 2d (matrices A y B de Saltelli) del bloque."""
+    n, dims = stop - start, 2 * len(job['names'])
+    if job['method'] == 'sobol':
+        from scipy.stats import qmc
+        sampler = qmc.Sobol(dims, scramble=True, seed=job['seed'])
+        if start:
+            sampler.fast_forward(start)
+        with warnings.catch_warnings():
+            # Los bloques no siempre tienen 2^k puntos; la secuencia completa sí se conserva
+            warnings.simplefilter('ignore', UserWarning)
+            return sampler.random(n)
+    if job['method'] == 'lhs':
+        from scipy.stats import qmc
+        return qmc.LatinHypercube(dims, seed=np.random.default_rng(job['seed'])).random(n)
+    # Un solo flujo PCG64 (un valor de 64 bits por número): el bloque avanza hasta su posición
+    bit_generator = np.random.PCG64(job['seed'])
+    bit_generator.advance(start * dims)
+    return np.random.Generator(bit_generator).random((n, dims))
+
+
+def _sweep_chunk(job):
+    """
+    Evalúa un bloque del barrido y retorna sus reducciones (ejecutable en otro proceso).
+
+    Las q del bloque en las deformaciones objetivo se escriben directamente en los
+    archivos .npy de salida, si los hay, en las filas [start, stop).
+    """
+    names, strains = job['names'], job['strains']
+    start, stop = job['start'], job['stop']
+    d = len(names)
+
+    if job['method'] == 'grid':
+        levels = np.unravel_index(np.arange(start, stop), [len(values) for values in job['levels']])
+        values = np.column_stack([job['levels'][i][index] for i, index in enumerate(levels)])
+        q = _evaluate(values, names, job['fixed'], strains, job['p_ref'])
+        base = q
+    else:
+        unit = _unit_samples(job, start, stop)
+        low, high = job['bounds'][:, 0], job['bounds'][:, 1]
+        A = low + unit[:, :d] * (high - low)
+        B = low + unit[:, d:] * (high - low)
+        values = A
+        if job['sensitivity']:
+            # Matrices AB_i: A con la columna i de B; todas se evalúan en una sola llamada
+            AB = np.repeat(A[np.newaxis], d, axis=0)
+            AB[np.arange(d), :, np.arange(d)] = B.T
+            q = _evaluate(np.concatenate([A, B, AB.reshape(-1, d)]), names, job['fixed'], strains, job['p_ref'])
+            q = q.reshape(d + 2, stop - start, strains.size)
+            base = q[0]
+        else:
+            base = q = _evaluate(A, names, job['fixed'], strains, job['p_ref'])
+
+    result = {
+        'moments': _moments(base),
+        'min': base.min(axis=0),
+        'max': base.max(axis=0),
+        'hist': _histogram(base, job['q_upper'], job['bins']),
+    }
+    if job['sensitivity'] and job['method'] == 'grid':
+        # Suma y número de evaluaciones por nivel de cada parámetro (efectos principales)
+        result['level_sums'] = [np.stack([np.bincount(index, weights=base[:, j], minlength=len(job['levels'][i]))
+                                          for j in range(strains.size)], axis=1)
+                                for i, index in enumerate(levels)]
+        result['level_counts'] = [np.bincount(index, minlength=len(job['levels'][i]))
+                                  for i, index in enumerate(levels)]
+    elif job['sensitivity']:
+        fA, fB, fAB = q[0], q[1], q[2:]
+        result['variance'] = _moments(np.concatenate([fA, fB]))
+        result['first'] = (fB[np.newaxis] * (fAB - fA[np.newaxis])).sum(axis=1)
+        result['total'] = ((fA[np.newaxis] - fAB) ** 2).sum(axis=1)
+
+    if job['q_path'] is not None:
+        np.load(job['q_path'], mmap_mode='r+')[start:stop] = base
+        np.load(job['values_path'], mmap_mode='r+')[start:stop] = values
+    return result
+
+
+def _merge(total, part):
+    if total is None:
+        return part
+    merged = {
+        'moments': _merge_moments(total['moments'], part['moments']),
+        'min': np.minimum(total['min'], part['min']),
+        'max': np.maximum(total['max'], part['max']),
+        'hist': total['hist'] + part['hist'],
+    }
+    if 'level_sums' in total:
+        merged['level_sums'] = [a + b for a, b in zip(total['level_sums'], part['level_sums'])]
+        merged['level_counts'] = [a + b for a, b in zip(total['level_counts'], part['level_counts'])]
+    if 'variance' in total:
+        merged['variance'] = _merge_moments(total['variance'], part['variance'])
+        merged['first'] = total['first'] + part['first']
+        merged['total'] = total['total'] + part['total']
+    return merged
+
+
+class ParameterSweep:
+    """
+    Barridos del modelo hiperbólico sobre hipercubos de parámetros (E50_ref, c, phi, m,
+    Rf y sigma_3) para ábacos de diseño y análisis de sensibilidad.
+
+    El espacio se recorre por bloques de tamaño acotado, en paralelo, y de cada bloque
+    solo se conservan reducciones combinables: momentos, mínimos y máximos,
+    histogramas (para los cuantiles) y las sumas de los índices de sensibilidad. El
+    tensor completo de q nunca se construye; q en las deformaciones objetivo puede
+    guardarse en disco con `output_dir`.
+    """
+
+    METHODS = ('grid', 'lhs', 'sobol', 'random')
+    QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+    @staticmethod
+    def run(space, strains, method='grid', n_samples=1024, sensitivity=True, quantiles=QUANTILES,
+            output_dir=None, workers=1, chunk_size=100_000, bins=4096, seed=None, p_ref=100):
+        """
+        Evalúa q(ε, σ3) del modelo sobre el espacio de parámetros.
+
+        Parámetros:
+        - space: dict con cada nombre de `SWEEP_PARAMETERS`: un escalar (valor fijo), una
+          lista de valores (método 'grid') o un par (mínimo, máximo) (métodos por muestreo)
+        - strains: Deformaciones axiales objetivo
+        - method: 'grid' (producto cartesiano de los valores), 'lhs' (hipercubo latino por
+          bloque), 'sobol' (secuencia de Sobol' con aleatorización) o 'random'. Salvo en
+          'lhs', las combinaciones no dependen de `chunk_size`
+        - n_samples: Muestras base de los métodos por muestreo. Con `sensitivity` se
+          evalúan n_samples·(d + 2) combinaciones (diseño de Saltelli, d parámetros
+          barridos); para 'sobol' conviene una potencia de 2
+        - sensitivity: Calcular índices de sensibilidad por deformación objetivo: de
+          primer orden (S1) y totales (ST) de Sobol' en los métodos por muestreo, o
+          efectos principales (S1) en 'grid'
+        - quantiles: Cuantiles de q por deformación objetivo
+        - output_dir: Si se indica, se guardan 'statistics.csv', 'sensitivity.csv',
+          'summary.json' y, por filas, 'q_targets.npy' (q de cada combinación base en las
+          deformaciones objetivo) y 'parameters.npy' (valores de los parámetros barridos)
+        - workers: Procesos de trabajo (1 = en el proceso actual)
+        - chunk_size: Combinaciones evaluadas por bloque (acota la memoria)
+        - bins: Intervalos del histograma de q; los cuantiles tienen una resolución de
+          q_max / bins, con q_max el qa máximo del espacio
+        - seed: Semilla; el resultado no depende del número de procesos
+        - p_ref: Presión de referencia
+
+        Retorna:
+        - statistics: DataFrame por deformación objetivo con media, desviación estándar,
+          mínimo, máximo y cuantiles de q
+        - sensitivity: DataFrame por (deformación, parámetro) con S1 (y ST en los métodos
+          por muestreo), o None si `sensitivity` es False
+
+        Raises:
+        - ValueError: Si el método o el espacio de parámetros no son válidos
+        """
+        if method not in ParameterSweep.METHODS:
+            raise ValueError(f"Método de barrido no válido: '{method}' (use {ParameterSweep.METHODS})")
+        missing = [name for name in SWEEP_PARAMETERS if name not in space]
+        unknown = [name for name in space if name not in SWEEP_PARAMETERS]
+        if missing or unknown:
+            raise ValueError(f"Espacio de parámetros inválido: faltan {missing}, desconocidos {unknown}")
+
+        strains = np.atleast_1d(np.asarray(strains, dtype=float))
+        fixed = {name: float(value) for name, value in space.items() if np.ndim(value) == 0}
+        names = [name for name in SWEEP_PARAMETERS if name not in fixed]
+        if not names:
+            raise ValueError("Al menos un parámetro debe barrerse (lista de valores o rango)")
+        d = len(names)
+
+        job = {'method': method, 'names': names, 'fixed': fixed, 'strains': strains, 'p_ref': p_ref,
+               'sensitivity': sensitivity, 'bins': bins, 'q_path': None, 'values_path': None}
+        if method == 'grid':
+            job['levels'] = [np.asarray(space[name], dtype=float) for name in names]
+            ranges = {name: (levels.min(), levels.max()) for name, levels in zip(names, job['levels'])}
+            n_base = int(np.prod([len(levels) for levels in job['levels']]))
+            per_chunk = max(1, chunk_size)
+        else:
+            bounds = np.array([space[name] for name in names], dtype=float)
+            if bounds.shape != (d, 2) or np.any(bounds[:, 1] < bounds[:, 0]):
+                raise ValueError("En los métodos por muestreo cada parámetro barrido es un par (mínimo, máximo)")
+            job['bounds'] = bounds
+            ranges = dict(zip(names, map(tuple, bounds)))
+            n_base = int(n_samples)
+            per_chunk = max(1, chunk_size // (d + 2 if sensitivity else 1))
+
+        # Cota de q: qa = qf/Rf crece con sigma_3, c y phi y decrece con Rf, así que su
+        # máximo está en un vértice del hipercubo
+        corners = {name: ranges.get(name, (fixed.get(name),) * 2) for name in ('sigma_3', 'c', 'phi', 'Rf')}
+        job['q_upper'] = max(
+            HardeningSoilParameters.calculate_qf(s3, c, phi) / Rf
+            for s3, c, phi, Rf in itertools.product(*corners.values()))
+
+        output_dir = Path(output_dir) if output_dir is not None else None
+        if output_dir is not None:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            job['q_path'] = str(output_dir / 'q_targets.npy')
+            job['values_path'] = str(output_dir / 'parameters.npy')
+            np.lib.format.open_memmap(job['q_path'], mode='w+', dtype=np.float32, shape=(n_base, strains.size))
+            np.lib.format.open_memmap(job['values_path'], mode='w+', dtype=np.float32, shape=(n_base, d))
+
+        starts = range(0, n_base, per_chunk)
+        sequence = np.random.SeedSequence(seed)
+        if method in ('sobol', 'random'):
+            # Una sola secuencia; cada bloque avanza hasta su posición
+            chunk_seeds = itertools.repeat(int(sequence.generate_state(1)[0]))
+        else:
+            chunk_seeds = sequence.spawn(len(starts))
+        jobs = (dict(job, start=start, stop=min(start + per_chunk, n_base), seed=chunk_seed)
+                for start, chunk_seed in zip(starts, chunk_seeds))
+
+        total = None
+        if workers > 1 and len(starts) > 1:
+            # Ventana de bloques en curso: la memoria no crece con el número de bloques
+            with ProcessPoolExecutor(max_workers=min(workers, len(starts))) as executor:
+                pending = deque()
+                for chunk_job in jobs:
+                    pending.append(executor.submit(_sweep_chunk, chunk_job))
+                    if len(pending) >= 2 * workers:
+                        total = _merge(total, pending.popleft().result())
+                while pending:
+                    total = _merge(total, pending.popleft().result())
+        else:
+            for chunk_job in jobs:
+                total = _merge(total, _sweep_chunk(chunk_job))
+
+        moments = total['moments']
+        variance = moments['m2'] / max(moments['n'] - 1, 1)
+        statistics = pd.DataFrame({
+            'mean': moments['mean'],
+            'std': np.sqrt(variance),
+            'min': total['min'],
+            'max': total['max'],
+            **{f'q{round(100 * quantile):02d}': column for quantile, column in
+               zip(quantiles, _histogram_quantiles(total['hist'], job['q_upper'], quantiles).T)},
+        }, index=pd.Index(strains, name='strain'))
+
+        table = None
+        if sensitivity:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                if method == 'grid':
+                    population_variance = moments['m2'] / moments['n']
+                    first = np.stack([
+                        (counts[:, np.newaxis] * (sums / np.maximum(counts, 1)[:, np.newaxis] - moments['mean']) ** 2
+                         ).sum(axis=0) / moments['n']
+                        for sums, counts in zip(total['level_sums'], total['level_counts'])]) / population_variance
+                    columns = {'S1': first}
+                else:
+                    v = total['variance']
+                    joint_variance = v['m2'] / v['n']
+                    columns = {'S1': total['first'] / moments['n'] / joint_variance,
+                               'ST': total['total'] / (2 * moments['n']) / joint_variance}
+            # Filas (deformación, parámetro); los arrays tienen forma (parámetro, deformación)
+            index = pd.MultiIndex.from_product([strains, names], names=['strain', 'parameter'])
+            table = pd.DataFrame({key: value.T.ravel() for key, value in columns.items()}, index=index)
+
+        if output_dir is not None:
+            statistics.to_csv(output_dir / 'statistics.csv')
+            if table is not None:
+                table.to_csv(output_dir / 'sensitivity.csv')
+            (output_dir / 'summary.json').write_text(json.dumps({
+                'method': method,
+                'n_base': n_base,
+                'n_evaluations': n_base * (d + 2 if sensitivity and method != 'grid' else 1),
+                'swept': {name: [float(low), float(high)] for name, (low, high) in ranges.items()},
+                'fixed': fixed,
+                'strains': strains.tolist(),
+                'q_upper': float(job['q_upper']),
+                'files': {'q_targets': 'q_targets.npy', 'parameters': 'parameters.npy',
+                          'parameter_columns': names},
+            }, indent=2, ensure_ascii=False), encoding='utf-8')
+        return statistics, table
@@ -0,0 +1,196 @@
+import numpy as np
+import pandas as pd
+
+# Juego de parámetros de referencia (similar al de los ensayos de ejemplo)
+BASE_PARAMETERS = {
+    'E50ref': 25000.0,
+    'c': 2.0,
+    'phi': 32.0,
+    'psi': 5.0,
+    'm': 0.75,
+    'Rf': 0.9,
+}
+
+CONFINING_PRESSURES = (50.0, 100.0, 200.0, 400.0)
+
+
+class SyntheticTriaxialData:
+    """
+    Ensayos triaxiales sintéticos generados a partir de parámetros conocidos.
+
+    Cada curva sigue la hipérbola del modelo Hardening Soil con la rigidez inicial
+    Ei = 2·E50/(2 - Rf), de modo que el módulo secante al 50% de qf es E50, y se
+    trunca en la falla de Mohr-Coulomb qf. La deformación volumétrica es contractiva
+    hasta qf/2 y luego dilata con la pendiente que corresponde a psi en
+    `calculate_psi`. Las deformaciones se concentran cerca del origen (ε ∝ i²) para
+    resolver el tramo inicial de la curva.
+
+    Los arrays generados tienen el formato de entrada de `BatchCalibrator.calibrate`.
+    """
+
+    @staticmethod
+    def sample_parameters(n_samples, spread=0.1, base=None, seed=None):
+        """
+        Juegos de parámetros aleatorios alrededor de `base`.
+
+        Parámetros:
+        - n_samples: Número de juegos (muestras)
+        - spread: Variación relativa uniforme (±spread) de cada parámetro
+        - base: dict de parámetros (default `BASE_PARAMETERS`)
+        - seed: Semilla, `np.random.SeedSequence` o lista de `n_samples` SeedSequence
+          (una por muestra; la fila i es la misma que con `sample_parameters(1, seed=seed[i])`)
+
+        Retorna:
+        - DataFrame con una fila por muestra y una columna por parámetro
+        """
+        base = dict(BASE_PARAMETERS if base is None else base)
+        if isinstance(seed, (list, tuple)):
+            draws = np.array([np.random.default_rng(s).uniform(-1, 1, len(base)) for s in seed]).T
+        else:
+            draws = np.random.default_rng(seed).uniform(-1, 1, (len(base), n_samples))
+        parameters = pd.DataFrame({
+            name: value * (1 + spread * draw)
+            for (name, value), draw in zip(base.items(), draws)
+        }, index=pd.RangeIndex(n_samples, name='sample'))
+        # Con Rf cercano a 1 la curva no alcanza qf dentro del rango de deformaciones
+        parameters['Rf'] = parameters['Rf'].clip(upper=0.95)
+        return parameters
+
+    @staticmethod
+    def curve(strain, confining_pressure, E50ref, c, phi, psi, m, Rf, p_ref=100):
+        """
+        Curvas sin ruido q(ε) y εv(ε); todos los argumentos se combinan por broadcasting.
+
+        Retorna:
+        - stress, volumetric_strain: Arrays con la forma de `strain`
+        """
+        phi_rad = np.radians(phi)
+        sin_phi, cos_phi = np.sin(phi_rad), np.cos(phi_rad)
+        qf = 2 * sin_phi / (1 - sin_phi) * (confining_pressure + c * cos_phi / sin_phi)
+        qa = qf / Rf
+        E50 = E50ref * ((c * cos_phi + confining_pressure * sin_phi) / (c * cos_phi + p_ref * sin_phi)) ** m
+        Ei = 2 * E50 / (2 - Rf)
+        stress = np.minimum(Ei * strain * qa / (qa + Ei * strain), qf)
+
+        # Contracción (pendiente 1 - 2ν con ν = 0.25) hasta qf/2, luego dilatancia
+        strain_50 = qf / 2 / (Ei * (1 - qf / 2 / qa))
+        sin_psi = np.sin(np.radians(psi))
+        dilatancy = 2 * sin_psi / (1 - sin_psi)
+        volumetric_strain = np.where(
+            strain <= strain_50,
+            0.5 * strain,
+            0.5 * strain_50 - dilatancy * (strain - strain_50)
+        )
+        return stress, volumetric_strain
+
+    @staticmethod
+    def generate(parameters=None, n_samples=1, confining_pressures=CONFINING_PRESSURES[:3], n_points=100,
+                 max_strain=0.2, noise=0.0, volumetric_noise=0.0, spread=0.1, p_ref=100, seed=None):
+        """
+        Genera los ensayos de varias muestras como arrays concatenados.
+
+        Parámetros:
+        - parameters: DataFrame de `sample_parameters` (si es None se sortean
+          `n_samples` juegos con `spread`)
+        - confining_pressures: Presiones de los ensayos de cada muestra [kPa]
+        - n_points: Puntos por ensayo
+        - max_strain: Deformación axial final
+        - noise: Desviación estándar del ruido gaussiano en q, relativa a qf
+        - volumetric_noise: Desviación estándar del ruido gaussiano en εv (absoluta).
+          `calculate_psi` promedia Δεv/Δε1 entre puntos consecutivos, por lo que es muy
+          sensible a este ruido cuando los puntos están próximos
+        - seed: Semilla, `np.random.SeedSequence` o lista de SeedSequence, una por
+          muestra (la muestra i es la misma que con `generate(n_samples=1, seed=seed[i])`)
+
+        Retorna:
+        - arrays: dict con 'strain', 'stress', 'volumetric_strain', 'confining_pressure',
+          'series_id' y 'sample_id' (un elemento por punto)
+        - parameters: DataFrame con los parámetros verdaderos de cada muestra
+        """
+        if isinstance(seed, (list, tuple)):
+            n_samples = len(seed)
+            parameter_seed, noise_seed = (list(seeds) for seeds in zip(*(s.spawn(2) for s in seed)))
+        else:
+            seed = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+            parameter_seed, noise_seed = seed.spawn(2)
+        if parameters is None:
+            parameters = SyntheticTriaxialData.sample_parameters(n_samples, spread=spread, seed=parameter_seed)
+        n_samples = len(parameters)
+        pressures = np.asarray(confining_pressures, dtype=float)
+        n_tests = pressures.size
+
+        # Forma (muestra, ensayo, punto)
+        strain = max_strain * (np.arange(1, n_points + 1) / n_points) ** 2
+        values = {name: parameters[name].to_numpy(dtype=float)[:, None, None] for name in BASE_PARAMETERS}
+        stress, volumetric_strain = SyntheticTriaxialData.curve(
+            strain, pressures[:, None], p_ref=p_ref, **values)
+        strain = np.broadcast_to(strain, stress.shape)
+
+        if isinstance(noise_seed, list):
+            # Ruido de cada muestra con su propio generador
+            rngs = [np.random.default_rng(s) for s in noise_seed]
+
+            def standard_normal(shape):
+                return np.stack([rng.standard_normal(shape[1:]) for rng in rngs])
+        else:
+            standard_normal = np.random.default_rng(noise_seed).standard_normal
+        if noise:
+            qf = np.max(stress, axis=-1, keepdims=True)
+            stress = stress + noise * qf * standard_normal(stress.shape)
+        if volumetric_noise:
+            volumetric_strain = volumetric_strain + volumetric_noise * standard_normal(stress.shape)
+
+        series = np.arange(n_samples * n_tests).reshape(n_samples, n_tests, 1)
+        arrays = {
+            'strain': strain.ravel().copy(),
+            'stress': stress.ravel(),
+            'volumetric_strain': volumetric_strain.ravel(),
+            'confining_pressure': np.broadcast_to(pressures[:, None], stress.shape).ravel().copy(),
+            'series_id': np.broadcast_to(series, stress.shape).ravel().copy(),
+            'sample_id': np.broadcast_to(series // n_tests, stress.shape).ravel().copy(),
+        }
+        return arrays, parameters
+
+    @staticmethod
+    def iter_blocks(n_samples, block_samples=100, seed=None, **kwargs):
+        """
+        Genera un número grande de muestras en bloques de `block_samples`, para no
+        tener todo el conjunto en memoria. Cada muestra usa su propia semilla derivada
+        (`SeedSequence(seed).spawn(n_samples)`), así que el resultado no depende del
+        tamaño de bloque elegido para el consumo.
+
+        Yields:
+            tuple: (arrays, parameters) como `generate`; 'sample_id' y el índice de
+            `parameters` son globales
+        """
+        n_tests = len(kwargs.get('confining_pressures', CONFINING_PRESSURES[:3]))
+        sample_seeds = np.random.SeedSequence(seed).spawn(n_samples)
+        for start in range(0, n_samples, block_samples):
+            size = min(block_samples, n_samples - start)
+            arrays, parameters = SyntheticTriaxialData.generate(
+                seed=sample_seeds[start:start + size], **kwargs)
+            arrays['sample_id'] += start
+            arrays['series_id'] += start * n_tests
+            parameters.index = pd.RangeIndex(start, start + size, name='sample')
+            yield arrays, parameters
+
+    @staticmethod
+    def to_data(arrays, sample=0):
+        """
+        Ensayos de una muestra en el formato de `DataLoader.load_data`
+        ({presión de confinamiento: DataFrame}).
+        """
+        mask = arrays['sample_id'] == sample
+        frame = SyntheticTriaxialData.to_frame(arrays)[mask]
+        return {cp: group.reset_index(drop=True) for cp, group in frame.groupby('confining_pressure')}
+
+    @staticmethod
+    def to_frame(arrays):
+        """DataFrame con las columnas de un libro de ensayos (σ'1 = σ3 + q)."""
+        return pd.DataFrame({
+            'strain': arrays['strain'],
+            'σ\'1': arrays['confining_pressure'] + arrays['stress'],
+            'confining_pressure': arrays['confining_pressure'],
+            'stress': arrays['stress'],
+            'volumetric_strain': arrays['volumetric_strain'],
+        })
@@ -0,0 +1,206 @@
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+
+class TestView(Mapping):
+    """
+    Un ensayo de un `TestSet`, con la interfaz de los dict de ensayos de
+    `CalibrationPipeline.calibrate`: `test['strain']` es una vista sin copia del buffer
+    común, `test['E50ref']` un metadato del ensayo y `test['c']` un valor compartido.
+    """
+
+    # No es una clase de pruebas de pytest (evita PytestCollectionWarning por el nombre)
+    __test__ = False
+    __slots__ = ('_set', '_position')
+
+    def __init__(self, test_set, position):
+        self._set = test_set
+        self._position = position
+
+    def __getitem__(self, name):
+        test_set, position = self._set, self._position
+        if name in test_set.columns:
+            start, stop = test_set.offsets[position], test_set.offsets[position + 1]
+            return test_set.columns[name][start:stop]
+        if name in test_set.meta:
+            return test_set.meta[name][position]
+        if name in test_set.shared:
+            return test_set.shared[name]
+        raise KeyError(name)
+
+    def __iter__(self):
+        yield from self._set.columns
+        yield from self._set.meta
+        yield from self._set.shared
+
+    def __len__(self):
+        return len(self._set.columns) + len(self._set.meta) + len(self._set.shared)
+
+    def __repr__(self):
+        return f"TestView({self._set.keys_array[self._position]!r}, {self._set.lengths[self._position]} puntos)"
+
+    def to_frame(self):
+        """DataFrame con las columnas por punto del ensayo (copia)."""
+        return pd.DataFrame({name: self[name] for name in self._set.columns})
+
+
+class TestSet(Mapping):
+    """
+    Conjunto de ensayos en estructura de arrays: cada columna por punto ('strain',
+    'stress', ...) es un único buffer contiguo con todos los ensayos, y `offsets`
+    marca dónde empieza cada uno (el ensayo i ocupa `offsets[i]:offsets[i + 1]`).
+    Los valores por ensayo (presión de confinamiento, E50ref, curvas del modelo de
+    longitud fija, ...) son columnas de `meta` con una fila por ensayo, y los valores
+    comunes a todos (c, phi, m) se guardan una sola vez en `shared`.
+
+    Se usa como el dict {presión de confinamiento: ensayo} de `DataLoader.load_data` y
+    `CalibrationPipeline.calibrate`: `test_set[cp]` y `test_set.items()` entregan
+    `TestView` sin copiar datos, de modo que `HardeningSoilParameters`, `Visualizer` y
+    `ReportGenerator` lo consumen directamente. Los buffers completos y `series_id` son
+    la entrada de las rutas vectorizadas (`BatchCalibrator.calibrate_set`,
+    `BootstrapAnalysis`).
+    """
+
+    # No es una clase de pruebas de pytest (evita PytestCollectionWarning por el nombre)
+    __test__ = False
+
+    def __init__(self, columns, offsets, meta=None, shared=None, key='confining_pressure'):
+        """
+        Parámetros:
+        - columns: dict {nombre: array 1D} con los puntos de todos los ensayos
+        - offsets: Límites de los ensayos (n_ensayos + 1 valores, desde 0)
+        - meta: dict {nombre: array} con una fila por ensayo (escalares o filas de
+          longitud fija)
+        - shared: dict de valores comunes a todos los ensayos
+        - key: Columna de `meta` que identifica cada ensayo (default: la posición)
+
+        Raises:
+        - ValueError: Si las longitudes de las columnas no coinciden con `offsets`
+        """
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.columns = {name: np.asarray(values) for name, values in columns.items()}
+        self.meta = {name: np.asarray(values) for name, values in (meta or {}).items()}
+        self.shared = dict(shared or {})
+        self.key = key
+
+        n_tests = self.offsets.size - 1
+        if n_tests < 0 or self.offsets[0] != 0 or np.any(np.diff(self.offsets) < 0):
+            raise ValueError("'offsets' debe empezar en 0 y ser no decreciente")
+        for name, values in self.columns.items():
+            if values.ndim != 1 or values.size != self.offsets[-1]:
+                raise ValueError(f"La columna '{name}' tiene {values.size} puntos; se esperaban {self.offsets[-1]}")
+        for name, values in self.meta.items():
+            if values.shape[0] != n_tests:
+                raise ValueError(f"El metadato '{name}' tiene {values.shape[0]} filas; se esperaban {n_tests}")
+
+        self.keys_array = self.meta[key] if key in self.meta else np.arange(n_tests)
+        self._positions = {cp: i for i, cp in enumerate(self.keys_array.tolist())}
+        if len(self._positions) != n_tests:
+            raise ValueError(f"Los valores de '{key}' deben ser únicos")
+
+    # Interfaz de dict {clave: ensayo}
+
+    def __getitem__(self, key):
+        return TestView(self, self._positions[key])
+
+    def __iter__(self):
+        return iter(self._positions)
+
+    def __len__(self):
+        return self.offsets.size - 1
+
+    def __repr__(self):
+        return (f"TestSet({len(self)} ensayos, {self.offsets[-1]} puntos, columnas={list(self.columns)}, "
+                f"{self.nbytes / 1024 ** 2:.1f} MB)")
+
+    def test(self, position):
+        """Ensayo por posición."""
+        return TestView(self, position)
+
+    # Arrays derivados
+
+    @property
+    def lengths(self):
+        """Puntos de cada ensayo."""
+        return np.diff(self.offsets)
+
+    @property
+    def series_id(self):
+        """Posición del ensayo de cada punto (para las funciones por segmentos)."""
+        return np.repeat(np.arange(len(self)), self.lengths)
+
+    @property
+    def nbytes(self):
+        """Memoria de los buffers y metadatos."""
+        return (self.offsets.nbytes + sum(values.nbytes for values in self.columns.values())
+                + sum(values.nbytes for values in self.meta.values()))
+
+    def repeat(self, name):
+        """Metadato escalar `name` repetido en cada punto de su ensayo."""
+        return np.repeat(self.meta[name], self.lengths)
+
+    # Construcción y conversión
+
+    @classmethod
+    def from_groups(cls, data, columns=None, dtype=None, key='confining_pressure'):
+        """
+        Crea el conjunto a partir del dict de `DataLoader.load_data` (DataFrames) o de
+        `DataLoader.load_arrays` (dict de arrays), copiando cada columna una vez a su
+        buffer contiguo.
+
+        Parámetros:
+        - data: dict {presión de confinamiento: DataFrame o dict de arrays}
+        - columns: Columnas por punto a guardar (default: las numéricas, salvo `key`)
+        - dtype: Tipo de los buffers de punto flotante (p. ej. np.float32 para reducir la
+          memoria a la mitad); por defecto se conserva el de los datos
+        - key: Nombre del metadato con las claves de `data`
+        """
+        groups = list(data.values())
+        if columns is None:
+            first = groups[0] if groups else {}
+            columns = [name for name in first
+                       if name not in (key, 'index') and np.issubdtype(np.asarray(first[name]).dtype, np.number)]
+        lengths = [len(group[columns[0]]) for group in groups] if columns else [0] * len(groups)
+        buffers = {name: np.concatenate([np.asarray(group[name]) for group in groups]) if groups
+                   else np.empty(0) for name in columns}
+        test_set = cls(buffers, np.r_[0, np.cumsum(lengths)], meta={key: np.asarray(list(data.keys()))}, key=key)
+        return test_set if dtype is None else test_set.astype(dtype)
+
+    @classmethod
+    def from_tests(cls, tests, columns=('strain', 'stress'), shared=('c', 'phi', 'm'), dtype=None,
+                   key='confining_pressure'):
+        """
+        Compacta el dict de ensayos de `CalibrationPipeline.calibrate`.
+
+        Las curvas de `columns` pasan a buffers contiguos, los valores escalares y las
+        curvas de longitud fija (como 'strain_model') a columnas de `meta`, y las claves
+        de `shared` se guardan una sola vez. Los valores de otros tipos (p. ej. la tabla
+        'loops') no se conservan.
+        """
+        views = list(tests.values())
+        test_set = cls.from_groups(tests, columns=list(columns), key=key)
+        shared_values = {name: views[0][name] for name in shared if views and name in views[0]}
+        for name in views[0] if views else ():
+            if name in columns or name in shared_values:
+                continue
+            values = [view[name] for view in views]
+            if all(value is None or np.isscalar(value) or np.ndim(value) == 0 for value in values):
+                test_set.meta[name] = np.array([np.nan if value is None else value for value in values])
+            elif all(isinstance(value, np.ndarray) and value.shape == values[0].shape for value in values):
+                test_set.meta[name] = np.stack(values)
+        test_set.shared.update(shared_values)
+        return test_set if dtype is None else test_set.astype(dtype)
+
+    def astype(self, dtype):
+        """Copia con las columnas y metadatos de punto flotante convertidos a `dtype`."""
+        def convert(values):
+            return values.astype(dtype) if np.issubdtype(values.dtype, np.floating) else values
+        return type(self)({name: convert(values) for name, values in self.columns.items()}, self.offsets,
+                          meta={name: convert(values) for name, values in self.meta.items()},
+                          shared=self.shared, key=self.key)
+
+    def to_groups(self):
+        """dict {clave: DataFrame} como el de `DataLoader.load_data` (copia)."""
+        return {cp: self[cp].to_frame() for cp in self}
@@ -0,0 +1,163 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .batch_calibration import BatchCalibrator
+from .test_set import TestSet
+
+# Parámetros cuya distribución se reporta (v_ur y p_ref son constantes)
+REPORTED_PARAMETERS = ('E50ref', 'E50ref_calculated', 'Eur_ref', 'Eoed_ref', 'c', 'phi',
+                       'psi', 'm', 'K0_nc', 'Rf')
+
+
+def _stack_tests(data):
+    """
+    Concatena los DataFrames de `DataLoader` en arrays con límites por serie. Un
+    `TestSet` ya tiene esa forma y se usa sin concatenar.
+    """
+    if isinstance(data, TestSet):
+        return {
+            'strain': np.asarray(data.columns['strain'], dtype=float),
+            'stress': np.asarray(data.columns['stress'], dtype=float),
+            'volumetric_strain': np.asarray(data.columns['volumetric_strain'], dtype=float),
+            'confining_pressure': data.repeat('confining_pressure').astype(float),
+            'offsets': data.offsets,
+        }
+    frames = list(data.values())
+    lengths = np.array([len(df) for df in frames])
+    return {
+        'strain': np.concatenate([df['strain'].to_numpy(dtype=float) for df in frames]),
+        'stress': np.concatenate([df['stress'].to_numpy(dtype=float) for df in frames]),
+        'volumetric_strain': np.concatenate([df['volumetric_strain'].to_numpy(dtype=float) for df in frames]),
+        'confining_pressure': np.repeat(np.asarray(list(data.keys()), dtype=float), lengths),
+        'offsets': np.r_[0, np.cumsum(lengths)],
+    }
+
+
+def _resample_indices(rng, offsets, n_resamples, mode):
+    """
+    Índices de los puntos de `n_resamples` remuestreos, generados en bloque.
+
+    Retorna:
+    - index: Índice del punto original
+    - group: Serie remuestreada (resample · n_series + posición) de cada punto
+    """
+    n_series = offsets.size - 1
+    lengths = np.diff(offsets)
+
+    # Serie original que ocupa cada posición de cada remuestreo
+    if mode in ('series', 'both'):
+        source = rng.integers(0, n_series, size=n_resamples * n_series)
+    else:
+        source = np.tile(np.arange(n_series), n_resamples)
+    group_lengths = lengths[source]
+    group = np.repeat(np.arange(source.size), group_lengths)
+
+    if mode in ('points', 'both'):
+        # Puntos con reemplazo dentro de cada serie, ordenados por serie y deformación.
+        # Los duplicados se conservan (bootstrap, no submuestreo); los pares repetidos
+        # tienen Δε1 = 0 y `calculate_psi` los ignora
+        local = (rng.random(group.size) * group_lengths[group]).astype(np.int64)
+        width = lengths.max()
+        keys = np.sort(group * width + local)
+        group, local = keys // width, keys % width
+    else:
+        starts = np.r_[0, np.cumsum(group_lengths)[:-1]]
+        local = np.arange(group.size) - np.repeat(starts, group_lengths)
+
+    return offsets[source[group]] + local, group
+
+
+def _bootstrap_chunk(arrays, n_resamples, mode, seed, p_ref, v_ur):
+    """Calibra un bloque de remuestreos con `BatchCalibrator` (ejecutable en otro proceso)."""
+    rng = np.random.default_rng(seed)
+    index, group = _resample_indices(rng, arrays['offsets'], n_resamples, mode)
+    n_series = arrays['offsets'].size - 1
+    _, parameters = BatchCalibrator.calibrate(
+        arrays['strain'][index],
+        arrays['stress'][index],
+        arrays['volumetric_strain'][index],
+        series_id=group,
+        confining_pressure=arrays['confining_pressure'][index],
+        sample_id=group // n_series,
+        p_ref=p_ref,
+        v_ur=v_ur,
+    )
+    return pd.DataFrame({name: parameters[name] for name in REPORTED_PARAMETERS})
+
+
+class BootstrapAnalysis:
+    """
+    Cuantificación de incertidumbre de los parámetros calibrados por bootstrap.
+
+    Cada remuestreo repite la cadena de calibración completa (phi y c, E50ref, qa,
+    Rf, psi, m) mediante `BatchCalibrator`, de modo que miles de remuestreos se
+    calibran como operaciones sobre arrays apilados.
+    """
+
+    MODES = ('series', 'points', 'both')
+
+    @staticmethod
+    def bootstrap(data, n_resamples=1000, mode='series', confidence=0.95, seed=None,
+                  workers=1, chunk_size=1000, p_ref=100, v_ur=0.2):
+        """
+        Remuestrea los ensayos y recalibra para obtener distribuciones de los parámetros.
+
+        Parámetros:
+        - data: dict {presión de confinamiento: DataFrame} como el de `DataLoader.load_data`,
+          o un `TestSet`
+        - n_resamples: Número de remuestreos
+        - mode: 'series' (ensayos completos con reemplazo), 'points' (puntos con reemplazo
+          dentro de cada ensayo, en orden de deformación y con los duplicados) o 'both'
+        - confidence: Nivel de los intervalos de confianza por percentiles
+        - seed: Semilla; el resultado no depende del número de procesos
+        - workers: Procesos de trabajo (1 = en el proceso actual)
+        - chunk_size: Remuestreos calibrados por bloque (acota la memoria)
+        - p_ref, v_ur: Igual que en la calibración
+
+        Retorna:
+        - samples: DataFrame con los parámetros de cada remuestreo
+        - summary: DataFrame por parámetro con la estimación original, media, desviación
+          estándar, límites del intervalo de confianza y fracción de remuestreos válidos
+
+        Raises:
+        - ValueError: Si el modo o el nivel de confianza no son válidos
+        """
+        if mode not in BootstrapAnalysis.MODES:
+            raise ValueError(f"Modo de remuestreo no válido: '{mode}' (use {BootstrapAnalysis.MODES})")
+        if not 0 < confidence < 1:
+            raise ValueError("El nivel de confianza debe estar entre 0 y 1")
+
+        arrays = _stack_tests(data)
+        sizes = [min(chunk_size, n_resamples - start) for start in range(0, n_resamples, chunk_size)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        jobs = [(arrays, size, mode, chunk_seed, p_ref, v_ur) for size, chunk_seed in zip(sizes, seeds)]
+
+        if workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+                chunks = list(executor.map(_bootstrap_chunk, *zip(*jobs)))
+        else:
+            chunks = [_bootstrap_chunk(*job) for job in jobs]
+        samples = pd.concat(chunks, ignore_index=True)
+
+        # Estimación puntual con los datos originales
+        n_points = arrays['offsets'][-1]
+        series = np.repeat(np.arange(arrays['offsets'].size - 1), np.diff(arrays['offsets']))
+        _, estimate = BatchCalibrator.calibrate(
+            arrays['strain'], arrays['stress'], arrays['volumetric_strain'], series,
+            arrays['confining_pressure'], sample_id=np.zeros(n_points, dtype=int),
+            p_ref=p_ref, v_ur=v_ur)
+
+        alpha = (1 - confidence) / 2
+        values = samples.to_numpy()
+        with np.errstate(invalid='ignore'):
+            summary = pd.DataFrame({
+                'estimate': [float(estimate[name][0]) for name in REPORTED_PARAMETERS],
+                'mean': np.nanmean(values, axis=0),
+                'std': np.nanstd(values, axis=0, ddof=1),
+                'ci_low': np.nanquantile(values, alpha, axis=0),
+                'ci_high': np.nanquantile(values, 1 - alpha, axis=0),
+                'valid_fraction': np.isfinite(values).mean(axis=0),
+            }, index=pd.Index(REPORTED_PARAMETERS, name='parameter'))
+        return samples, summary
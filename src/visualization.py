@@ -1,18 +1,220 @@
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 from matplotlib import rc
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from .parameters import HardeningSoilParameters
+from .downsampling import lttb_indices, downsample
+
+# Estilo común de las figuras
+_RC_PARAMS = {
+    "mathtext.fontset": "stix",
+    "font.family": "STIXGeneral",
+    "figure.dpi": 300,
+}
+
+_STRESS_STRAIN_NOTE = ('Nota: Las líneas continuas representan la predicción del modelo\n'
+                       'Los puntos representan datos experimentales')
+_STRESS_PATH_NOTE = ('Nota: Los cuadrados representan los estados iniciales de confinamiento\n'
+                     'Las líneas muestran la evolución del estado de esfuerzos')
+
+# Plantillas de figura del modo rápido por tipo y número de series (por proceso), en
+# una caché LRU de como máximo `_MAX_TEMPLATES` figuras
+_TEMPLATES = OrderedDict()
+_MAX_TEMPLATES = 4
+
+
+def _prediction_curves(tests, prediction_pressures):
+    """Deformaciones y curvas del modelo para presiones sin ensayo."""
+    strain_pred = np.linspace(0, max([max(test['strain']) for test in tests.values()]), 100)
+    if not len(prediction_pressures):
+        return strain_pred, []
+
+    first_test = next(iter(tests.values()))
+    stress_pred = HardeningSoilParameters.model_hyperbolic_grid(
+        epsilon_1=strain_pred,
+        sigma_3=np.asarray(prediction_pressures, dtype=float),
+        E50_ref=first_test['E50ref'],
+        c=first_test['c'],
+        phi=first_test['phi'],
+        m=first_test['m'],
+        Rf=first_test['Rf']
+    )
+    return strain_pred, stress_pred
+
+
+class _FigureTemplate:
+    """
+    Figura construida una sola vez (estilo, ejes, etiquetas, leyenda y nota); cada
+    nueva muestra solo actualiza los datos de los artistas existentes y los textos de
+    la leyenda antes de guardar.
+
+    La figura se crea con `Figure` y un lienzo Agg propio, sin registrarla en pyplot:
+    al salir de la caché se libera como cualquier otro objeto.
+    """
+
+    def __init__(self, kind, n_series, n_predictions=0):
+        self.kind = kind
+        colors = sns.color_palette("deep")
+        with plt.rc_context(_RC_PARAMS), sns.axes_style("darkgrid"):
+            self.fig = Figure(figsize=(12, 8))
+            FigureCanvasAgg(self.fig)
+            self.ax = ax = self.fig.add_subplot()
+            self.series = []
+            self.predictions = []
+
+            if kind == 'stress_strain':
+                for i in range(n_series):
+                    color = colors[i % len(colors)]
+                    points = ax.scatter([], [], color=color, marker='o', s=50, alpha=0.6, label=' ')
+                    line, = ax.plot([], [], color=color, linestyle='-', linewidth=2, label=' ')
+                    self.series.append((points, line))
+                for _ in range(n_predictions):
+                    line, = ax.plot([], [], color='k', linestyle='--', linewidth=2, label=' ')
+                    self.predictions.append(line)
+                xlabel, ylabel = r'Deformación Axial ($\epsilon_1$) [%]', r'Esfuerzo Desviador ($q$) [kPa]'
+                title, note = 'Curvas de Esfuerzo-Deformación\nEnsayos Triaxiales', _STRESS_STRAIN_NOTE
+            else:
+                for i in range(n_series):
+                    color = colors[i % len(colors)]
+                    line, = ax.plot([], [], color=color, linewidth=2.5, label=' ')
+                    start = ax.scatter([], [], color=color, s=100, zorder=5, marker='s', label=' ')
+                    self.series.append((line, start))
+                xlabel, ylabel = r'Esfuerzo Normal Medio ($p$) [kPa]', r'Esfuerzo Desviador ($q$) [kPa]'
+                title, note = 'Trayectorias de Esfuerzos\nEnsayos Triaxiales', _STRESS_PATH_NOTE
+
+            ax.set_xlabel(xlabel, fontsize=12, fontweight='bold')
+            ax.set_ylabel(ylabel, fontsize=12, fontweight='bold')
+            ax.tick_params(axis='both', which='major', labelsize=10)
+            ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
+            self.legend = ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left',
+                                    fontsize=10, frameon=True, fancybox=True, shadow=True)
+            ax.grid(True, linestyle='--', alpha=0.7)
+            self.fig.text(0.98, 0.02, note, fontsize=8, style='italic', ha='right')
+            self.fig.tight_layout()
+
+    @classmethod
+    def get(cls, kind, n_series, n_predictions=0):
+        key = (kind, n_series, n_predictions)
+        if key in _TEMPLATES:
+            _TEMPLATES.move_to_end(key)
+        else:
+            _TEMPLATES[key] = cls(kind, n_series, n_predictions)
+            while len(_TEMPLATES) > _MAX_TEMPLATES:
+                _TEMPLATES.popitem(last=False)
+        return _TEMPLATES[key]
+
+    def _finish(self, labels, x_max, y_max, save_path, dpi):
+        for text, label in zip(self.legend.get_texts(), labels):
+            text.set_text(label)
+        self.ax.set_xlim(0, 1.05 * x_max)
+        self.ax.set_ylim(0, 1.05 * y_max)
+        with plt.rc_context(_RC_PARAMS):
+            self.fig.savefig(save_path, bbox_inches='tight', dpi=dpi)
+
+    def stress_strain(self, tests, prediction_pressures, max_points, save_path, dpi):
+        labels, x_max, y_max = [], 0.0, 0.0
+        for (points, line), (name, test) in zip(self.series, tests.items()):
+            strain, stress = np.asarray(test['strain'], dtype=float), np.asarray(test['stress'], dtype=float)
+            keep = lttb_indices(strain, stress, max_points)
+            points.set_offsets(np.column_stack([strain[keep], stress[keep]]))
+            line.set_data(test['strain_model'], test['stress_model'])
+            labels += [f'Experimental ($\\sigma_3$={name} kPa)',
+                       f'Modelo ($E_{{50}}^{{ref}}$={test["E50ref"]:.0f} kPa)']
+            x_max = max(x_max, strain.max(), np.max(test['strain_model']))
+            y_max = max(y_max, stress.max(), np.max(test['stress_model']))
+
+        strain_pred, stress_pred = _prediction_curves(tests, prediction_pressures)
+        for line, sigma3_pred, stress in zip(self.predictions, prediction_pressures, stress_pred):
+            line.set_data(strain_pred, stress)
+            labels.append(f'Predicción ($\\sigma_3$={sigma3_pred} kPa)')
+            y_max = max(y_max, stress.max())
+
+        self._finish(labels, x_max, y_max, save_path, dpi)
+
+    def stress_path(self, tests, max_points, save_path, dpi):
+        labels, x_max, y_max = [], 0.0, 0.0
+        for (line, start), (name, test) in zip(self.series, tests.items()):
+            q = np.asarray(test['stress'], dtype=float)
+            p = name + q / 3
+            keep = lttb_indices(p, q, max_points)
+            line.set_data(p[keep], q[keep])
+            start.set_offsets([[name, 0]])
+            labels += [f'$\\sigma_3$={name} kPa', f'Estado inicial ($\\sigma_3$={name} kPa)']
+            x_max, y_max = max(x_max, p.max()), max(y_max, q.max())
+
+        self._finish(labels, x_max, y_max, save_path, dpi)
+
+
+def _render_job(tests, paths, fast, max_points, dpi):
+    """Dibuja las dos figuras de una muestra (ejecutable en otro proceso)."""
+    Visualizer.plot_stress_strain(tests, save_path=paths['stress_strain'], fast=fast,
+                                  max_points=max_points, dpi=dpi)
+    Visualizer.plot_stress_path(tests, save_path=paths['stress_path'], fast=fast,
+                                max_points=max_points, dpi=dpi)
+    return paths
+
+
+def _init_render_worker():
+    plt.switch_backend('Agg')
+
 
 class Visualizer:
     @staticmethod
-    def plot_stress_strain(tests, save_path='output/figures/stress_strain.png'):
+    def downsample(x, y, max_points=500):
+        """
+        Reduce una curva densa a `max_points` puntos conservando su forma (LTTB, ver
+        `downsampling.downsample`).
+
+        Retorna:
+        - x, y: Arrays con los puntos conservados, en el orden original
+        """
+        return downsample(x, y, max_points)
+
+    @staticmethod
+    def render_many(jobs, workers=None, fast=True, max_points=500, dpi=300):
+        """
+        Dibuja las figuras de muchas muestras, en paralelo si `workers` > 1.
+
+        Parámetros:
+        - jobs: Iterable de (tests, paths), con paths un dict con las rutas
+          'stress_strain' y 'stress_path' (como `CalibrationPipeline.output_paths`)
+        - workers: Procesos de trabajo (None o 1 = en el proceso actual)
+        - fast, max_points, dpi: Igual que en `plot_stress_strain`
+
+        Retorna:
+        - list: Los dict de rutas, en el orden de `jobs`
+        """
+        jobs = list(jobs)
+        if workers and workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs)),
+                                     initializer=_init_render_worker) as executor:
+                futures = [executor.submit(_render_job, tests, paths, fast, max_points, dpi)
+                           for tests, paths in jobs]
+                return [future.result() for future in futures]
+        return [_render_job(tests, paths, fast, max_points, dpi) for tests, paths in jobs]
+
+    @staticmethod
+    def plot_stress_strain(tests, save_path='output/figures/stress_strain.png', prediction_pressures=(600,),
+                           fast=False, max_points=500, dpi=300):
+        """
+        Curvas esfuerzo-deformación experimentales, del modelo y predicciones.
+
+        Con `fast=True` se reutiliza una plantilla de figura ya construida (solo se
+        actualizan los datos) y los puntos experimentales se reducen a `max_points`
+        por curva con LTTB; no se modifican los rcParams globales.
+        """
+        if fast:
+            template = _FigureTemplate.get('stress_strain', len(tests), len(prediction_pressures))
+            template.stress_strain(tests, prediction_pressures, max_points, save_path, dpi)
+            return
+
         # Configuración para usar mathtext
-        plt.rcParams.update({
-            "mathtext.fontset": "stix",
-            "font.family": "STIXGeneral",
-            "figure.dpi": 300,
-        })
+        plt.rcParams.update(_RC_PARAMS)
         sns.set_style("darkgrid")
         fig, ax = plt.subplots(figsize=(12, 8))
         
@@ -29,33 +231,15 @@ class Visualizer:
                    color=colors[i], linestyle='-', linewidth=2,
                    label=f'Modelo ($E_{{50}}^{{ref}}$={test["E50ref"]:.0f} kPa)')
 
-        # Agregar predicción para 600 kPa
-        sigma3_pred = 600  # Presión de confinamiento para predicción
-        strain_pred = np.linspace(0, max([max(test['strain']) for test in tests.values()]), 100)
-        
-        # Obtener los parámetros del modelo del primer ensayo (deberían ser los mismos para todos)
-        first_test = next(iter(tests.values()))
-        E50ref = first_test['E50ref']
-        c = first_test['c']
-        phi = first_test['phi']
-        m = first_test['m']
-        Rf = first_test['Rf']
-        
-        # Calcular la predicción
-        stress_pred = HardeningSoilParameters.model_hyperbolic_curve(
-            epsilon_1=strain_pred,
-            sigma_3=sigma3_pred,
-            E50_ref=E50ref,
-            c=c,
-            phi=phi,
-            m=m,
-            Rf=Rf
-        )
-        
-        # Plotear la predicción con línea punteada
-        ax.plot(strain_pred, stress_pred, 
-               color='k', linestyle='--', linewidth=2,
-               label=f'Predicción ($\sigma_3$=600 kPa)')
+        # Agregar predicciones para presiones sin ensayo (600 kPa por defecto), con los
+        # parámetros del primer ensayo en una sola evaluación vectorizada
+        strain_pred, stress_pred = _prediction_curves(tests, prediction_pressures)
+
+        # Plotear las predicciones con línea punteada
+        for sigma3_pred, stress in zip(prediction_pressures, stress_pred):
+            ax.plot(strain_pred, stress, 
+                   color='k', linestyle='--', linewidth=2,
+                   label=f'Predicción ($\\sigma_3$={sigma3_pred} kPa)')
 
         # Etiquetas con mathtext
         ax.set_xlabel(r'Deformación Axial ($\epsilon_1$) [%]', fontsize=12, fontweight='bold')
@@ -75,22 +259,23 @@ class Visualizer:
         ax.set_ylim(bottom=0)
         
         # Nota a la derecha
-        plt.figtext(0.98, 0.02, 
-                   'Nota: Las líneas continuas representan la predicción del modelo\n'
-                   'Los puntos representan datos experimentales', 
-                   fontsize=8, style='italic', ha='right')
+        plt.figtext(0.98, 0.02, _STRESS_STRAIN_NOTE, fontsize=8, style='italic', ha='right')
         
         plt.tight_layout()
-        plt.savefig(save_path, bbox_inches='tight', dpi=300)
+        plt.savefig(save_path, bbox_inches='tight', dpi=dpi)
         plt.close()
 
     @staticmethod
-    def plot_stress_path(tests, save_path='output/figures/stress_path.png'):
-        plt.rcParams.update({
-            "mathtext.fontset": "stix",
-            "font.family": "STIXGeneral",
-            "figure.dpi": 300,
-        })
+    def plot_stress_path(tests, save_path='output/figures/stress_path.png', fast=False, max_points=500, dpi=300):
+        """
+        Trayectorias de esfuerzos p-q. `fast`, `max_points` y `dpi` como en
+        `plot_stress_strain`.
+        """
+        if fast:
+            _FigureTemplate.get('stress_path', len(tests)).stress_path(tests, max_points, save_path, dpi)
+            return
+
+        plt.rcParams.update(_RC_PARAMS)
         sns.set_style("darkgrid")
         fig, ax = plt.subplots(figsize=(12, 8))
         
@@ -120,11 +305,8 @@ class Visualizer:
         ax.set_xlim(left=0)
         ax.set_ylim(bottom=0)
         
-        plt.figtext(0.98, 0.02,
-                   'Nota: Los cuadrados representan los estados iniciales de confinamiento\n'
-                   'Las líneas muestran la evolución del estado de esfuerzos', 
-                   fontsize=8, style='italic', ha='right')
+        plt.figtext(0.98, 0.02, _STRESS_PATH_NOTE, fontsize=8, style='italic', ha='right')
         
         plt.tight_layout()
-        plt.savefig(save_path, bbox_inches='tight', dpi=300)
+        plt.savefig(save_path, bbox_inches='tight', dpi=dpi)
         plt.close()
\ No newline at end of file
@@ -0,0 +1,40 @@
+import argparse
+import json
+from pathlib import Path
+
+from src.sweep import ParameterSweep
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Barrido del modelo Hardening Soil sobre un espacio de parámetros (ábacos y sensibilidad)")
+    parser.add_argument('spec', help="Archivo JSON con 'space' y 'strains' (y opcionalmente 'method', 'n_samples', "
+                                     "'quantiles', 'p_ref')")
+    parser.add_argument('-o', '--output', default='output/sweep', help="Directorio de salida")
+    parser.add_argument('-w', '--workers', type=int, default=1, help="Número de procesos de trabajo")
+    parser.add_argument('--chunk-size', type=int, default=100_000, help="Combinaciones evaluadas por bloque")
+    parser.add_argument('--seed', type=int, default=None, help="Semilla de los métodos por muestreo")
+    parser.add_argument('--no-sensitivity', action='store_true', help="No calcular índices de sensibilidad")
+    args = parser.parse_args()
+
+    spec = json.loads(Path(args.spec).read_text(encoding='utf-8'))
+    statistics, sensitivity = ParameterSweep.run(
+        spec['space'], spec['strains'],
+        method=spec.get('method', 'grid'),
+        n_samples=spec.get('n_samples', 1024),
+        sensitivity=not args.no_sensitivity,
+        quantiles=spec.get('quantiles', ParameterSweep.QUANTILES),
+        output_dir=args.output,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        seed=args.seed,
+        p_ref=spec.get('p_ref', 100),
+    )
+    print(statistics.to_string())
+    if sensitivity is not None:
+        print()
+        print(sensitivity.unstack('parameter').to_string())
+    print(f"\nResultados en {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.batch_calibration import BatchCalibrator
+from src.data_loader import DataLoader
+from src.parameters import HardeningSoilParameters
+
+WORKBOOK = Path(__file__).parent.parent / 'data' / 'data_ensayos_triaxiales.xlsx'
+
+
+def _samples():
+    """Tres juegos de ensayos: el libro, el libro con otra resistencia y otro con menos dilatancia."""
+    data = {cp: {name: df[name].to_numpy(dtype=float) for name in ('strain', 'stress', 'volumetric_strain')}
+            for cp, df in DataLoader.load_data(WORKBOOK).items()}
+    stronger = {cp: dict(test, stress=test['stress'] * (1.1 + cp / 2000)) for cp, test in data.items()}
+    flatter = {cp: dict(test, volumetric_strain=0.5 * test['volumetric_strain']) for cp, test in data.items()}
+    return [data, stronger, flatter]
+
+
+def _concatenate(samples):
+    columns = {name: [] for name in ('strain', 'stress', 'volumetric_strain', 'series_id',
+                                     'confining_pressure', 'sample_id')}
+    series = 0
+    for sample, tests in enumerate(samples):
+        for cp, test in tests.items():
+            n = test['strain'].size
+            for name in ('strain', 'stress', 'volumetric_strain'):
+                columns[name].append(test[name])
+            columns['series_id'].append(np.full(n, series))
+            columns['confining_pressure'].append(np.full(n, cp, dtype=float))
+            columns['sample_id'].append(np.full(n, sample))
+            series += 1
+    return {name: np.concatenate(values) for name, values in columns.items()}
+
+
+def _calibrate(samples):
+    arrays = _concatenate(samples)
+    return BatchCalibrator.calibrate(
+        arrays['strain'], arrays['stress'], arrays['volumetric_strain'], arrays['series_id'],
+        arrays['confining_pressure'], sample_id=arrays['sample_id'])
+
+
+def test_matches_scalar_chain_for_each_sample():
+    samples = _samples()
+    tests, parameters = _calibrate(samples)
+    series = 0
+    for sample, data in enumerate(samples):
+        pressures = list(data)
+        peaks = [test['stress'].max() for test in data.values()]
+        phi, c = HardeningSoilParameters.calculate_phi_and_c(pressures, peaks)
+        np.testing.assert_allclose(parameters['phi'][sample], phi, rtol=1e-12)
+        np.testing.assert_allclose(parameters['c'][sample], c, rtol=1e-9)
+        for cp, test in data.items():
+            E50ref = HardeningSoilParameters.calculate_E50ref(test['strain'], test['stress'])
+            qa = HardeningSoilParameters.calculate_qa(test['strain'], test['stress'])
+            psi = HardeningSoilParameters.calculate_psi(test['strain'], test['volumetric_strain'])
+            assert tests['E50ref'][series] == E50ref
+            np.testing.assert_allclose(tests['qa'][series], qa, rtol=1e-12)
+            np.testing.assert_allclose(tests['psi'][series], psi, rtol=1e-12)
+            np.testing.assert_allclose(tests['Rf'][series], HardeningSoilParameters.calculate_qf(cp, c, phi) / qa,
+                                       rtol=1e-9)
+            series += 1
+        E50 = tests['E50ref'][tests['sample'] == sample]
+        m, E50ref_calculated = HardeningSoilParameters.calculate_m(pressures, E50, c, phi)
+        np.testing.assert_allclose(parameters['m'][sample], m, rtol=1e-9)
+        np.testing.assert_allclose(parameters['E50ref_calculated'][sample], E50ref_calculated, rtol=1e-9)
+        assert parameters['E50ref'][sample] == pytest.approx(np.mean(E50), rel=1e-12)
+
+
+def test_invalid_hyperbolic_transformation_gives_nan_qa():
+    samples = _samples()
+    # Curva convexa: ε/q decrece con ε y la pendiente de la transformación es negativa
+    cp = list(samples[1])[1]
+    strain, stress = samples[1][cp]['strain'], samples[1][cp]['stress']
+    convex = dict(samples[1][cp], stress=stress.max() * (strain / strain.max()) ** 2 + 1)
+    samples[1][cp] = convex
+    with pytest.raises(ValueError):
+        HardeningSoilParameters.calculate_qa(convex['strain'], convex['stress'])
+
+    tests, parameters = _calibrate(samples)
+    invalid = (tests['sample'] == 1) & (tests['confining_pressure'] == cp)
+    assert np.isnan(tests['qa'][invalid]).all() and np.isnan(tests['Rf'][invalid]).all()
+    # El Rf del juego promedia solo los ensayos válidos; los demás juegos no se ven afectados
+    valid = (tests['sample'] == 1) & ~invalid
+    assert parameters['Rf'][1] == pytest.approx(tests['Rf'][valid].mean(), rel=1e-12)
+    assert np.isfinite(parameters['Rf']).all()
+    reference, _ = _calibrate(_samples())
+    np.testing.assert_array_equal(tests['qa'][tests['sample'] != 1], reference['qa'][reference['sample'] != 1])
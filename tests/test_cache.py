@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.cache import DataCache
+from src.data_loader import DataLoader
+
+WORKBOOK = Path(__file__).parent.parent / 'data' / 'data_ensayos_triaxiales.xlsx'
+
+
+def test_entry_larger_than_budget_is_loaded_and_kept(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    expected = DataLoader.load_data(WORKBOOK)
+    for _ in range(2):  # en frío y en caliente
+        data = DataLoader.load_data(WORKBOOK, cache_dir=cache_dir, cache_max_bytes=1000)
+        assert list(data) == list(expected)
+        for cp, df in expected.items():
+            np.testing.assert_array_equal(data[cp]['stress'], df['stress'])
+
+        test_set = DataLoader.load_test_set(WORKBOOK, cache_dir=tmp_path / 'set_cache', cache_max_bytes=1000)
+        assert list(test_set) == list(expected)
+    assert len(list(cache_dir.iterdir())) == 1
+
+
+def test_store_evicts_older_entries_first(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    frame = pd.concat(DataLoader.load_data(WORKBOOK).values())
+    sources = []
+    for i in range(2):
+        source = tmp_path / f'ensayos_{i}.csv'
+        frame.assign(stress=frame['stress'] + i).to_csv(source, index=False)
+        sources.append(source)
+
+    for source in sources:
+        DataLoader.load_data(source, cache_dir=cache_dir, cache_max_bytes=1000)
+    entries = list(cache_dir.iterdir())
+    assert len(entries) == 1
+    assert entries[0].name == DataCache(cache_dir, version=DataLoader.CACHE_VERSION).key(sources[1])
+
+
+def _entry_bytes(cache_dir):
+    return sum(f.stat().st_size for f in Path(cache_dir).rglob('*') if f.is_file())
+
+
+def test_total_size_stays_within_budget(tmp_path):
+    cache = DataCache(tmp_path / 'cache', max_bytes=1_000_000)
+    rng = np.random.default_rng(0)
+    for i in range(3):
+        frame = pd.DataFrame({'strain': rng.random(40_000), 'stress': rng.random(40_000)})
+        cache.store(f'entry_{i}', {100.0: frame})
+        # Cada entrada (~640 KB) cabe sola en el presupuesto: el total nunca lo supera
+        assert _entry_bytes(cache.cache_dir) <= cache.max_bytes
+    assert [entry.name for entry in cache.cache_dir.iterdir()] == ['entry_2']
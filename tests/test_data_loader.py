@@ -0,0 +1,29 @@
+from pathlib import Path
+
+import pandas as pd
+
+from src.data_loader import DataLoader
+
+WORKBOOK = Path(__file__).parent.parent / 'data' / 'data_ensayos_triaxiales.xlsx'
+
+
+def _split_sources(tmp_path):
+    """Un libro Excel por presión de confinamiento y un CSV con el resto."""
+    expected = DataLoader.load_data(WORKBOOK)
+    pressures = list(expected)
+    for cp in pressures[:-1]:
+        expected[cp].to_excel(tmp_path / f'ensayo_{cp}.xlsx', index=False)
+    expected[pressures[-1]].to_csv(tmp_path / f'ensayo_{pressures[-1]}.csv', index=False)
+    return expected
+
+
+def test_load_sources_matches_load_data(tmp_path, monkeypatch):
+    expected = _split_sources(tmp_path)
+    # Con un procesador los libros se leen en el hilo principal; con dos, en procesos
+    for cpus in (1, 2):
+        monkeypatch.setattr('os.cpu_count', lambda: cpus)
+        data, provenance = DataLoader.load_sources([tmp_path])
+        assert list(data) == list(expected)
+        for cp, df in expected.items():
+            pd.testing.assert_frame_equal(data[cp].reset_index(drop=True), df.reset_index(drop=True))
+        assert provenance['format'].tolist() == ['xlsx'] * (len(expected) - 1) + ['csv']
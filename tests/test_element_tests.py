@@ -0,0 +1,39 @@
+import numpy as np
+
+from src.element_tests import HardeningSoilIntegrator
+from src.parameters import HardeningSoilParameters
+
+STRAINS = np.linspace(0, 0.1, 201)
+
+
+def test_drained_volumetric_strain_decreases_with_dilatancy():
+    eps_v = [HardeningSoilIntegrator(30000, 1, 32, 0.5, 0.9, psi=psi)
+             .drained_triaxial(100, STRAINS, substeps=2)['eps_v'][-1, 0]
+             for psi in (0, 5, 10)]
+    assert eps_v[0] > eps_v[1] > eps_v[2]
+    # Con ψ > 0 la probeta termina dilatando (compresión positiva)
+    assert eps_v[2] < 0
+
+
+def test_undrained_dilatant_mean_stress_increases():
+    results = HardeningSoilIntegrator(30000, 1, 32, 0.5, 0.9, psi=5).undrained_triaxial(100, STRAINS, substeps=2)
+    p = results['p'][:, 0]
+    assert p[-1] > p[0] == 100
+    assert results['q'][-1, 0] > 0
+
+
+def test_drained_curve_matches_hyperbola_truncated_at_failure():
+    """Sin cap y con ψ = 0, la curva drenada es la hiperbólica hasta qf y luego qf (Mohr-Coulomb)."""
+    model = HardeningSoilIntegrator(30000, 1, 32, 0.5, 0.9, cap=False)
+    for sigma_3 in (50, 100, 200):
+        q = model.drained_triaxial(sigma_3, STRAINS, substeps=4)['q'][:, 0]
+        hyperbola = HardeningSoilParameters.model_hyperbolic_curve(STRAINS, sigma_3, 30000, 1, 32, 0.5, 0.9)
+        qf = HardeningSoilParameters.calculate_qf(sigma_3, 1, 32)
+        np.testing.assert_allclose(q, np.minimum(hyperbola, qf), atol=1e-3)
+
+
+def test_K0_state_starts_on_shear_yield_surface():
+    model = HardeningSoilIntegrator(30000, 1, 32, 0.5, 0.9)
+    sigma_1 = model.oedometer(100, np.linspace(0, 0.01, 11))['sigma_1'][:, 0]
+    assert sigma_1[0] == 100
+    assert np.all(np.diff(sigma_1) > 0)
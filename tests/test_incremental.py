@@ -0,0 +1,44 @@
+from pathlib import Path
+
+import pytest
+
+from src.data_loader import DataLoader
+from src.incremental import IncrementalCalibration
+from src.pipeline import CalibrationPipeline
+
+WORKBOOK = Path(__file__).parent.parent / 'data' / 'data_ensayos_triaxiales.xlsx'
+
+
+def _assert_same_parameters(state, data):
+    _, expected = CalibrationPipeline.calibrate(data)
+    parameters = state.parameters
+    assert parameters.keys() == expected.keys()
+    for name, value in expected.items():
+        assert parameters[name] == pytest.approx(value, rel=1e-9), name
+
+
+def test_matches_full_calibration():
+    data = DataLoader.load_data(WORKBOOK)
+    _assert_same_parameters(IncrementalCalibration.from_data(data), data)
+
+
+def test_remove_and_add_back_a_test():
+    data = DataLoader.load_data(WORKBOOK)
+    state = IncrementalCalibration.from_data(data)
+    removed = list(data)[1]
+    state.remove_test(removed)
+    _assert_same_parameters(state, {cp: df for cp, df in data.items() if cp != removed})
+
+    state.add_frame(removed, data[removed])
+    _assert_same_parameters(state, data)
+
+
+def test_duplicate_and_missing_tests_are_rejected():
+    data = DataLoader.load_data(WORKBOOK)
+    state = IncrementalCalibration.from_data(data)
+    cp = next(iter(data))
+    with pytest.raises(ValueError):
+        state.add_frame(cp, data[cp])
+    state.remove_test(cp)
+    with pytest.raises(KeyError):
+        state.remove_test(cp)
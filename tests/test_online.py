@@ -0,0 +1,58 @@
+import io
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.data_loader import DataLoader
+from src.online import OnlineCalibrator
+from src.parameters import HardeningSoilParameters
+
+WORKBOOK = Path(__file__).parent.parent / 'data' / 'data_ensayos_triaxiales.xlsx'
+
+
+def _tests():
+    return [(cp, df['strain'].to_numpy(), df['stress'].to_numpy(), df['volumetric_strain'].to_numpy())
+            for cp, df in DataLoader.load_data(WORKBOOK).items()]
+
+
+def _scalar_qa(strain, stress):
+    try:
+        return HardeningSoilParameters.calculate_qa(strain, stress)
+    except ValueError:
+        return np.nan
+
+
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+def test_matches_scalar_estimates_after_every_sample():
+    for _, strain, stress, volumetric_strain in _tests():
+        online = OnlineCalibrator()
+        for k in range(strain.size):
+            estimates = online.update(strain[k], stress[k], volumetric_strain[k])
+            prefix = slice(0, k + 1)
+            if k >= 3:
+                np.testing.assert_allclose(estimates['qa'], _scalar_qa(strain[prefix], stress[prefix]), rtol=1e-9)
+            np.testing.assert_allclose(
+                estimates['psi'], HardeningSoilParameters.calculate_psi(strain[prefix], volumetric_strain[prefix]),
+                rtol=1e-9)
+        assert np.isfinite(estimates['qa']) and np.isfinite(estimates['psi'])
+
+
+def test_repeated_readings_do_not_change_psi():
+    _, strain, stress, volumetric_strain = _tests()[0]
+    repeated = np.repeat(np.arange(strain.size), 2)
+    online = OnlineCalibrator()
+    estimates = online.update_batch(strain[repeated], stress[repeated], volumetric_strain[repeated])
+    assert estimates['psi'] == pytest.approx(HardeningSoilParameters.calculate_psi(strain, volumetric_strain),
+                                             rel=1e-9)
+
+
+def test_follow_stops_when_qa_converges():
+    # Curva hiperbólica exacta hasta mucho después del pico: qa converge antes del final
+    strain = np.linspace(1e-4, 0.2, 2000)
+    stress = strain / (strain / 500 + 1 / 40000)
+    stream = io.StringIO('strain,stress,volumetric_strain\n'
+                         + ''.join(f'{e},{q},0.0\n' for e, q in zip(strain, stress)))
+    history = list(OnlineCalibrator(window=20).follow(OnlineCalibrator.read_samples(stream)))
+    assert history[-1]['converged'] and len(history) < strain.size
+    assert history[-1]['qa'] == pytest.approx(500, rel=1e-6)
@@ -0,0 +1,42 @@
+import numpy as np
+
+from src.parameters import HardeningSoilParameters
+
+TRUE = {'E50_ref': 30000, 'c': 0.9, 'phi': 32, 'm': 0.5, 'Rf': 0.9}
+
+
+def _pre_peak_curves(noise=0.002, seed=0):
+    """Curvas sintéticas truncadas en qf, hasta el pico (como en el ajuste global del pipeline)."""
+    rng = np.random.default_rng(seed)
+    strain, stress, pressure = [], [], []
+    for sigma_3 in (50.0, 100.0, 200.0, 400.0):
+        eps = np.linspace(0, 0.15, 300)
+        q = np.minimum(HardeningSoilParameters.model_hyperbolic_curve(eps, sigma_3, **TRUE),
+                       HardeningSoilParameters.calculate_qf(sigma_3, TRUE['c'], TRUE['phi']))
+        k = np.argmax(q) + 1
+        strain.append(eps[:k])
+        stress.append(q[:k] * (1 + noise * rng.standard_normal(k)))
+        pressure.append(np.full(k, sigma_3))
+    return np.concatenate(strain), np.concatenate(stress), np.concatenate(pressure)
+
+
+def test_global_fit_with_strength_recovers_parameters():
+    strain, stress, pressure = _pre_peak_curves()
+    fitted, pcov = HardeningSoilParameters.fit_hyperbolic_global(
+        strain, stress, pressure, E50_ref=25000, m=0.6, Rf=0.85, c=0.5, phi=30, fit_strength=True)
+    assert abs(fitted['E50ref'] / TRUE['E50_ref'] - 1) < 0.01
+    assert abs(fitted['m'] - TRUE['m']) < 0.01
+    assert abs(fitted['Rf'] - TRUE['Rf']) < 0.01
+    assert abs(fitted['c'] - TRUE['c']) < 0.1
+    assert abs(fitted['phi'] - TRUE['phi']) < 0.1
+    errors = np.sqrt(np.diag(pcov))
+    assert np.all(np.isfinite(errors)) and errors[4] < 0.5
+
+
+def test_psi_ignores_repeated_readings():
+    strain = np.linspace(0, 0.1, 50)
+    volumetric_strain = 0.002 - 0.1 * strain
+    psi = HardeningSoilParameters.calculate_psi(strain, volumetric_strain)
+    repeated = np.repeat(np.arange(strain.size), 2)
+    assert np.isfinite(psi)
+    assert np.isclose(HardeningSoilParameters.calculate_psi(strain[repeated], volumetric_strain[repeated]), psi)
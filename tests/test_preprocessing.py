@@ -0,0 +1,28 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.data_loader import DataLoader
+from src.pipeline import CalibrationPipeline
+from src.preprocessing import SignalPreprocessor
+
+WORKBOOK = Path(__file__).parent.parent / 'data' / 'data_ensayos_triaxiales.xlsx'
+
+
+def test_short_curves_are_not_upsampled():
+    data = DataLoader.load_data(WORKBOOK)
+    _, reference = CalibrationPipeline.calibrate(data)
+    for n_points in (50, 200, 1000):
+        preprocessed = SignalPreprocessor.preprocess(data, n_points=n_points)
+        assert all(len(df) == len(data[cp]) for cp, df in preprocessed.items())
+        _, parameters = CalibrationPipeline.calibrate(preprocessed)
+        assert parameters['E50ref'] == reference['E50ref']
+
+
+def test_long_curves_are_resampled_to_grid():
+    strain = np.linspace(0, 0.1, 1001)
+    df = pd.DataFrame({'strain': strain, 'stress': 300 * strain / (strain + 0.01)})
+    curve = SignalPreprocessor.preprocess_curve(df, n_points=100)
+    assert len(curve) == 100
+    np.testing.assert_allclose(np.diff(curve['strain']), 0.1 / 99)
@@ -0,0 +1,24 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from src.data_loader import DataLoader
+from src.pipeline import CalibrationPipeline
+from src.report_generator import ReportGenerator
+
+ROOT = Path(__file__).parent.parent
+
+
+def test_report_import_does_not_load_plotting_libraries():
+    code = "import sys, src.report_generator; print('matplotlib' in sys.modules, 'seaborn' in sys.modules)"
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert output.stdout.split() == ['False', 'False']
+
+
+def test_combined_report_escapes_sample_names(tmp_path):
+    tests, parameters = CalibrationPipeline.calibrate(
+        DataLoader.load_data(ROOT / 'data' / 'data_ensayos_triaxiales.xlsx'))
+    output_file = tmp_path / 'combined.pdf'
+    ReportGenerator.generate_combined_report({'Obra A & B <sondeo 1': {'parameters': parameters, 'tests': tests}},
+                                             str(output_file))
+    assert output_file.stat().st_size > 0
@@ -0,0 +1,80 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.data_loader import DataLoader
+from src.pipeline import CalibrationPipeline
+from src.results_store import PARAMETER_COLUMNS, ResultsStore
+
+WORKBOOK = Path(__file__).parent.parent / 'data' / 'data_ensayos_triaxiales.xlsx'
+
+
+def _records(n):
+    """Calibraciones con phi, Rf y presiones de confinamiento conocidas."""
+    records = []
+    for i in range(n):
+        parameters = dict.fromkeys(PARAMETER_COLUMNS, 1.0)
+        parameters.update(phi=28.0 + i, Rf=0.80 + 0.01 * i)
+        tests = [{'confining_pressure': cp, 'E50ref': 1000.0 * (i + 1), 'qa': 100.0 + i}
+                 for cp in (50.0 * (i + 1), 100.0 * (i + 1))]
+        records.append({'parameters': parameters, 'tests': tests, 'project': 'A' if i % 2 else 'B',
+                        'specimen': f'S{i}'})
+    return records
+
+
+def test_insert_and_find_by_source_and_options(tmp_path):
+    tests, parameters = CalibrationPipeline.calibrate(DataLoader.load_data(WORKBOOK))
+    with ResultsStore(tmp_path / 'results.db') as store:
+        first = store.insert(parameters, tests, project='Obra', source=WORKBOOK, options={'global_fit': False})
+        source_hash = ResultsStore.file_hash(WORKBOOK)
+        stored = store.find(source_hash, {'global_fit': False})
+        assert stored['id'] == first
+        for name in PARAMETER_COLUMNS:
+            assert stored['parameters'][name] == pytest.approx(float(parameters[name]))
+        assert [test['confining_pressure'] for test in stored['tests']] == sorted(tests)
+        for row in stored['tests']:
+            assert row['qa'] == pytest.approx(tests[row['confining_pressure']]['qa'])
+
+        assert store.find(source_hash, {'global_fit': True}) is None
+        assert store.find('0' * 64, {'global_fit': False}) is None
+        # Se recupera la calibración más reciente
+        second = store.insert(dict(parameters, psi=np.nan), tests, source=WORKBOOK, options={'global_fit': False})
+        stored = store.find(source_hash, {'global_fit': False})
+        assert stored['id'] == second and stored['parameters']['psi'] is None
+
+
+def test_query_ranges(tmp_path):
+    with ResultsStore(tmp_path / 'results.db') as store:
+        ids = store.insert_many(_records(10))
+        assert ids == list(range(1, 11))
+
+        # Rangos cerrados en ambos extremos y extremos abiertos
+        assert store.query(phi=(30, 33))['phi'].tolist() == [30.0, 31.0, 32.0, 33.0]
+        assert store.query(phi=(None, 29))['phi'].tolist() == [28.0, 29.0]
+        assert store.query(phi=(36, None), Rf=(None, 0.885))['phi'].tolist() == [36.0]
+        assert store.query(project='A', phi=(30, 34))['specimen'].tolist() == ['S3', 'S5']
+        assert len(store.query(project=['A', 'B'])) == 10
+        assert len(store.query(limit=3)) == 3
+
+        # Calibraciones con algún ensayo en el rango de σ3: 50·(i+1) o 100·(i+1) en [300, 400]
+        selected = store.query(confining_pressure=(300, 400))['specimen'].tolist()
+        assert selected == ['S2', 'S3', 'S5', 'S6', 'S7']
+
+        rows = store.query(tests=True, confining_pressure=(300, 400), qa=(None, 105))
+        assert rows[['specimen', 'confining_pressure']].values.tolist() == [['S2', 300.0], ['S3', 400.0],
+                                                                          ['S5', 300.0]]
+
+        with pytest.raises(ValueError):
+            store.query(qa=(0, 1))
+        with pytest.raises(ValueError):
+            store.query(tests=True, phi=(0, 1))
+
+
+def test_bulk_insert_rebuilds_indexes(tmp_path):
+    with ResultsStore(tmp_path / 'results.db') as store:
+        store.insert_many(_records(10_000))
+        assert store.count() == {'calibrations': 10_000, 'tests': 20_000}
+        indexes = {name for name, in store.connection.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        assert {'idx_calibrations_phi', 'idx_tests_confining_pressure'} <= indexes
+        assert len(store.query(phi=(100, 102))) == 3
@@ -0,0 +1,72 @@
+import asyncio
+import json
+import os
+import signal
+
+from src.service import CalibrationService, _ready
+
+
+async def _request(port, raw):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(raw)
+    await writer.drain()
+    # El servicio responde con 'Connection: close': la respuesta termina con el fin de la conexión
+    response = await asyncio.wait_for(reader.read(), timeout=10)
+    writer.close()
+    return response
+
+
+async def _with_service(requests):
+    service = CalibrationService(workers=1)
+    server = await service.start('127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        return [await _request(port, raw) for raw in requests]
+    finally:
+        server.close()
+        await server.wait_closed()
+        service.close()
+
+
+def _post(body, length=None):
+    length = len(body) if length is None else length
+    return (f"POST /calibrate HTTP/1.1\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {length}\r\n\r\n").encode() + body
+
+
+def test_first_connection_is_closed_after_worker_job():
+    responses = asyncio.run(_with_service([_post(b'{"tests": []}'), _post(b'{"tests": []}')]))
+    for response in responses:
+        assert response.startswith(b'HTTP/1.1 422')
+
+
+def test_negative_content_length_is_rejected():
+    response, = asyncio.run(_with_service([_post(b'', length=-5)]))
+    assert response.startswith(b'HTTP/1.1 400')
+
+
+def test_pool_is_replaced_after_a_worker_dies():
+    async def scenario():
+        service = CalibrationService(workers=1)
+        server = await service.start('127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            # Simular un proceso terminado por el sistema (p. ej. por falta de memoria)
+            pid = await asyncio.get_running_loop().run_in_executor(service._executor, _ready)
+            os.kill(pid, signal.SIGKILL)
+            broken = await _request(port, _post(b'{"tests": []}'))
+            health = await _request(port, b'GET /health HTTP/1.1\r\n\r\n')
+            after = await _request(port, _post(b'{"tests": []}'))
+            return broken, health, after
+        finally:
+            server.close()
+            await server.wait_closed()
+            service.close()
+
+    broken, health, after = asyncio.run(scenario())
+    assert broken.startswith(b'HTTP/1.1 503')
+    assert b'Retry-After: 1' in broken
+    assert health.startswith(b'HTTP/1.1 200')
+    assert json.loads(health.split(b'\r\n\r\n', 1)[1])['stats']['restarts'] == 1
+    # El pool nuevo atiende las solicitudes siguientes
+    assert after.startswith(b'HTTP/1.1 422')
@@ -0,0 +1,87 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from src import pipeline
+from src.pipeline import CalibrationPipeline
+from src.stages import StageTracker
+
+WORKBOOK = Path(__file__).parent.parent / 'data' / 'data_ensayos_triaxiales.xlsx'
+STAGES = ['calibrate', 'stress_strain', 'stress_path', 'report']
+
+
+def test_stage_is_stale_after_fingerprint_or_artifact_change(tmp_path):
+    artifact = tmp_path / 'figure.png'
+    artifact.write_bytes(b'a')
+    key = StageTracker.digest({'phi': 32.0}, [1, 2], 'opciones')
+    StageTracker(tmp_path / 'stages').record('figure', key, [artifact])
+
+    tracker = StageTracker(tmp_path / 'stages')
+    assert tracker.fresh('figure', key, [artifact])
+    assert not tracker.fresh('figure', StageTracker.digest({'phi': 33.0}, [1, 2], 'opciones'), [artifact])
+    artifact.write_bytes(b'b')
+    assert not tracker.fresh('figure', key, [artifact])
+    assert tracker.skipped == ['figure']
+
+
+@pytest.fixture
+def run(tmp_path, monkeypatch):
+    """Ejecuta el flujo en `tmp_path` y retorna el `StageTracker` usado (None sin `incremental`)."""
+    trackers = []
+
+    class RecordingTracker(StageTracker):
+        def __init__(self, directory):
+            super().__init__(directory)
+            trackers.append(self)
+
+    monkeypatch.setattr(pipeline, 'StageTracker', RecordingTracker)
+
+    def run(incremental=True, **options):
+        trackers.clear()
+        CalibrationPipeline.run(WORKBOOK, tmp_path, fast_plots=True, incremental=incremental, **options)
+        return trackers[0] if trackers else None
+    return run
+
+
+def _artifacts(tmp_path):
+    paths = CalibrationPipeline.output_paths(tmp_path)
+    return {name: Path(paths[name]) for name in STAGES[1:]}
+
+
+def _mtimes(tmp_path):
+    return {name: os.stat(path).st_mtime_ns for name, path in _artifacts(tmp_path).items()}
+
+
+def test_second_run_skips_every_stage(run):
+    assert run().built == STAGES
+    tracker = run()
+    assert tracker.skipped == STAGES and tracker.built == []
+
+
+def test_deleted_artifact_reruns_only_its_stage(run, tmp_path):
+    run()
+    _artifacts(tmp_path)['stress_path'].unlink()
+    tracker = run()
+    assert tracker.built == ['stress_path']
+    assert tracker.skipped == ['calibrate', 'stress_strain', 'report']
+    assert _artifacts(tmp_path)['stress_path'].exists()
+
+
+def test_force_reruns_everything(run, tmp_path):
+    run()
+    before = _mtimes(tmp_path)
+    # --force en main.py y batch.py: ejecución sin `incremental`
+    assert run(incremental=False) is None
+    after = _mtimes(tmp_path)
+    assert all(after[name] > before[name] for name in before)
+    # Los artefactos reescritos ya no coinciden con el manifiesto: se rehacen una vez más
+    tracker = run()
+    assert tracker.skipped == ['calibrate'] and tracker.built == STAGES[1:]
+
+
+def test_options_change_invalidates_calibration(run):
+    run()
+    tracker = run(global_fit=True)
+    assert 'calibrate' in tracker.built
+    assert run(global_fit=True).skipped == STAGES
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from src.material import HardeningSoilMaterial
+from src.surrogate import HardeningSurrogate
+
+MATERIALS = (
+    HardeningSoilMaterial(E50_ref=30000, c=1, phi=32, m=0.5, Rf=0.9),
+    HardeningSoilMaterial(E50_ref=12000, c=15, phi=24, m=0.9, Rf=0.75),
+)
+
+
+@pytest.mark.parametrize('material', MATERIALS)
+def test_error_bound_and_round_trip(material, tmp_path):
+    surrogate = material.surrogate((20, 800), tolerance=0.01)
+    assert surrogate.error_bound <= surrogate.tolerance == 0.01
+    assert surrogate.max_error(n_samples=200_000, seed=1) <= surrogate.error_bound
+
+    path = tmp_path / 'surrogate.npz'
+    surrogate.save(path)
+    loaded = HardeningSurrogate.load(path)
+    assert loaded.material == material
+    assert (loaded.sigma_3_min, loaded.sigma_3_max, loaded.error_bound) == (20, 800, surrogate.error_bound)
+    np.testing.assert_array_equal(loaded.table, surrogate.table)
+
+    rng = np.random.default_rng(2)
+    epsilon_1, sigma_3 = rng.uniform(0, 0.3, 10_000), rng.uniform(20, 800, 10_000)
+    np.testing.assert_array_equal(loaded.q(epsilon_1, sigma_3), surrogate.q(epsilon_1, sigma_3))
+
+
+def test_sigma_3_outside_domain_raises():
+    surrogate = MATERIALS[0].surrogate((50, 400), tolerance=0.05)
+    surrogate.q(0.01, [50, 400])
+    for sigma_3 in (49.9, 400.1):
+        with pytest.raises(ValueError):
+            surrogate.q([0.01, 0.02], [100, sigma_3])
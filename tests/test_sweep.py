@@ -0,0 +1,62 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.parameters import HardeningSoilParameters
+from src.sweep import SWEEP_PARAMETERS, ParameterSweep
+
+STRAINS = (0.001, 0.01, 0.05)
+RANGES = {'E50_ref': (20000, 60000), 'c': (0, 10), 'phi': (28, 38), 'm': 0.7, 'Rf': (0.8, 0.95),
+          'sigma_3': (50, 400)}
+GRID = {'E50_ref': [20000, 40000, 60000], 'c': [0, 5], 'phi': [28, 33, 38], 'm': 0.7, 'Rf': [0.8, 0.9],
+        'sigma_3': [50, 100, 200, 400]}
+
+
+def _assert_same(a, b):
+    for left, right in zip(a, b):
+        pd.testing.assert_frame_equal(left, right, rtol=1e-10, atol=1e-9)
+
+
+@pytest.mark.parametrize('method, space', [('grid', GRID), ('sobol', RANGES), ('random', RANGES)])
+def test_results_do_not_depend_on_workers_or_chunk_size(method, space):
+    reference = ParameterSweep.run(space, STRAINS, method=method, n_samples=256, seed=3, chunk_size=10_000)
+    for workers, chunk_size in ((1, 300), (2, 300), (2, 97)):
+        _assert_same(ParameterSweep.run(space, STRAINS, method=method, n_samples=256, seed=3,
+                                        workers=workers, chunk_size=chunk_size), reference)
+
+
+def test_lhs_does_not_depend_on_workers():
+    kwargs = dict(method='lhs', n_samples=256, seed=3, chunk_size=300)
+    _assert_same(ParameterSweep.run(RANGES, STRAINS, workers=2, **kwargs),
+                 ParameterSweep.run(RANGES, STRAINS, **kwargs))
+
+
+def test_grid_statistics_match_brute_force():
+    statistics, _ = ParameterSweep.run(GRID, STRAINS, method='grid', chunk_size=7)
+    combinations = np.array(list(itertools.product(*(np.atleast_1d(GRID[name]) for name in SWEEP_PARAMETERS))))
+    arguments = dict(zip(SWEEP_PARAMETERS, combinations[:, :, np.newaxis].transpose(1, 0, 2)))
+    q = HardeningSoilParameters.model_hyperbolic_grid(
+        np.asarray(STRAINS)[np.newaxis, :], arguments['sigma_3'], arguments['E50_ref'], arguments['c'],
+        arguments['phi'], arguments['m'], arguments['Rf'], outer=False)
+    np.testing.assert_allclose(statistics['mean'], q.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(statistics['std'], q.std(axis=0, ddof=1), rtol=1e-10)
+    np.testing.assert_allclose(statistics['min'], q.min(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(statistics['max'], q.max(axis=0), rtol=1e-12)
+
+
+@pytest.mark.parametrize('method', ['grid', 'sobol'])
+def test_parameter_without_effect_has_zero_sensitivity(method):
+    # Con σ3 = p_ref el factor de la ley potencial vale 1 y m no influye en q
+    if method == 'sobol':
+        space = dict(RANGES, m=(0.4, 1.0), sigma_3=100)
+    else:
+        space = dict(GRID, m=[0.4, 0.7, 1.0], sigma_3=100)
+    _, sensitivity = ParameterSweep.run(space, STRAINS, method=method, n_samples=1024, seed=0)
+    m = sensitivity.xs('m', level='parameter')
+    others = sensitivity.drop('m', level='parameter')
+    np.testing.assert_allclose(m['S1'], 0, atol=1e-12)
+    if method == 'sobol':
+        np.testing.assert_allclose(m['ST'], 0, atol=1e-12)
+    assert (others.groupby(level='strain')['S1'].max() > 0.1).all()
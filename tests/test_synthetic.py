@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from src.synthetic import SyntheticTriaxialData
+
+
+def _concat_blocks(block_samples):
+    blocks = list(SyntheticTriaxialData.iter_blocks(12, block_samples=block_samples, seed=7, n_points=50,
+                                                    noise=0.01))
+    arrays = {name: np.concatenate([block[name] for block, _ in blocks]) for name in blocks[0][0]}
+    return arrays, pd.concat([parameters for _, parameters in blocks])
+
+
+def test_iter_blocks_does_not_depend_on_block_size():
+    arrays, parameters = _concat_blocks(12)
+    for block_samples in (1, 5, 10):
+        other_arrays, other_parameters = _concat_blocks(block_samples)
+        pd.testing.assert_frame_equal(other_parameters, parameters)
+        for name, values in arrays.items():
+            np.testing.assert_array_equal(other_arrays[name], values)
+    assert parameters.index.tolist() == list(range(12))
+    assert np.array_equal(np.unique(arrays['series_id']), np.arange(36))
+
+
+def test_iter_blocks_sample_matches_single_sample_generate():
+    arrays, parameters = _concat_blocks(5)
+    seed = np.random.SeedSequence(7).spawn(12)[8]
+    single_arrays, single_parameters = SyntheticTriaxialData.generate(n_samples=1, seed=seed, n_points=50,
+                                                                      noise=0.01)
+    np.testing.assert_array_equal(single_parameters.iloc[0], parameters.loc[8])
+    mask = arrays['sample_id'] == 8
+    for name in ('strain', 'stress', 'volumetric_strain', 'confining_pressure'):
+        np.testing.assert_array_equal(single_arrays[name], arrays[name][mask])
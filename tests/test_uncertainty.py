@@ -0,0 +1,14 @@
+import numpy as np
+
+from src.uncertainty import _resample_indices
+
+
+def test_point_resampling_draws_with_replacement():
+    offsets = np.array([0, 30, 60, 90])
+    index, group = _resample_indices(np.random.default_rng(0), offsets, 200, 'points')
+    # Cada serie remuestreada tiene tantos puntos como la original, en orden de deformación
+    assert np.array_equal(np.bincount(group), np.full(600, 30))
+    same = group[1:] == group[:-1]
+    assert np.all(np.diff(index)[same] >= 0)
+    # Con reemplazo: hay puntos repetidos (un submuestreo no los tendría)
+    assert np.any(np.diff(index)[same] == 0)
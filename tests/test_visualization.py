@@ -0,0 +1,23 @@
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+
+from src import visualization
+from src.data_loader import DataLoader
+from src.pipeline import CalibrationPipeline
+from src.visualization import Visualizer
+
+WORKBOOK = Path(__file__).parent.parent / 'data' / 'data_ensayos_triaxiales.xlsx'
+
+
+def test_fast_templates_stay_out_of_pyplot_and_are_bounded(tmp_path):
+    tests, _ = CalibrationPipeline.calibrate(DataLoader.load_data(WORKBOOK))
+    names = list(tests)
+    for n_series in range(1, len(names) + 1):
+        subset = {name: tests[name] for name in names[:n_series]}
+        for predictions in ((), (600,)):
+            Visualizer.plot_stress_strain(subset, save_path=tmp_path / 'stress_strain.png',
+                                          prediction_pressures=predictions, fast=True, dpi=20)
+        Visualizer.plot_stress_path(subset, save_path=tmp_path / 'stress_path.png', fast=True, dpi=20)
+    assert plt.get_fignums() == []
+    assert len(visualization._TEMPLATES) == visualization._MAX_TEMPLATES